@@ -7,6 +7,8 @@ from worlds.AutoWorld import World, WebWorld
 from worlds.LauncherComponents import Component, Type, components, launch_subprocess
 
 from .options import TaskipelagoOptions
+from .profiling import profiled
+from .validation import CYCLE_MESSAGE, MAX_TASKS, find_cycle, parse_index_list, too_many_tasks_message
 
 print("Loading Taskipelago world module...")
 
@@ -21,8 +23,6 @@ BASE_COMPLETE_LOC_ID = 920_000
 BASE_ITEM_ID = 911_000
 BASE_TOKEN_ID = 912_000
 
-MAX_TASKS = 1000
-
 
 class TaskipelagoWeb(WebWorld):
     game = "Taskipelago"
@@ -57,6 +57,7 @@ class TaskipelagoWorld(World):
         {f"Task Complete {i}": int(BASE_TOKEN_ID + (i - 1)) for i in range(1, MAX_TASKS + 1)}
     )
 
+    @profiled("generate_early")
     def generate_early(self) -> None:
         tasks = [str(t).strip() for t in self.options.tasks.value if str(t).strip()]
         rewards = [str(r).strip() for r in self.options.rewards.value if str(r).strip()]
@@ -119,8 +120,9 @@ class TaskipelagoWorld(World):
             self._death_link_amnest = int(getattr(self.options, "death_link_amnesty").value or 0)
 
         n = len(tasks)
-        if n > MAX_TASKS:
-            raise Exception(f"Taskipelago: too many tasks ({n}). Max supported is {MAX_TASKS}.")
+        too_many = too_many_tasks_message(n)
+        if too_many:
+            raise Exception(f"Taskipelago: {too_many}")
 
         # --- task prereqs parse/normalize ---
         raw_prereqs = list(getattr(self.options, "task_prereqs").value or [])
@@ -129,30 +131,12 @@ class TaskipelagoWorld(World):
         raw_prereqs = raw_prereqs[:n]
         raw_prereqs = [str(x).strip() for x in raw_prereqs]
 
+        # same checks (and messages) the YAML Generator shows while editing
         parsed_prereqs: List[List[int]] = []
         for i, txt in enumerate(raw_prereqs):
-            if not txt:
-                parsed_prereqs.append([])
-                continue
-            parts = [p.strip() for p in txt.split(",") if p.strip()]
-            reqs: List[int] = []
-            for p in parts:
-                try:
-                    idx_1 = int(p)
-                except ValueError:
-                    raise Exception(
-                        f"Taskipelago: invalid prereq '{p}' on task {i+1}. "
-                        f"Use comma-separated integers like '1,2'."
-                    )
-                if idx_1 < 1 or idx_1 > n:
-                    raise Exception(f"Taskipelago: prereq '{idx_1}' on task {i+1} is out of range (1..{n}).")
-                if idx_1 == (i + 1):
-                    raise Exception(f"Taskipelago: task {i+1} cannot require itself.")
-                reqs.append(idx_1 - 1)
-
-            # de-dupe while preserving order
-            seen = set()
-            reqs = [x for x in reqs if not (x in seen or seen.add(x))]
+            reqs, err = parse_index_list(txt, i, n, "prereq")
+            if err:
+                raise Exception(f"Taskipelago: {err}")
             parsed_prereqs.append(reqs)
 
         # --- reward prereqs parse/normalize ---
@@ -164,24 +148,9 @@ class TaskipelagoWorld(World):
 
         parsed_reward_prereqs: List[List[int]] = []
         for i, txt in enumerate(raw_reward_prereqs):
-            if not txt:
-                parsed_reward_prereqs.append([])
-                continue
-            parts = [p.strip() for p in txt.split(",") if p.strip()]
-            reqs: List[int] = []
-            for p in parts:
-                try:
-                    idx_1 = int(p)
-                except ValueError:
-                    raise Exception(
-                        f"Taskipelago: invalid reward prereq '{p}' on task {i+1}. "
-                        f"Use comma-separated integers like '1,2'."
-                    )
-                if idx_1 < 1 or idx_1 > n:
-                    raise Exception(
-                        f"Taskipelago: reward prereq '{idx_1}' on task {i+1} is out of range (1..{n})."
-                    )
-                reqs.append(idx_1 - 1)  # store 0-based like task_prereqs
+            reqs, err = parse_index_list(txt, i, n, "reward prereq")  # 0-based like task_prereqs
+            if err:
+                raise Exception(f"Taskipelago: {err}")
             parsed_reward_prereqs.append(reqs)
 
         self._raw_reward_prereqs = raw_reward_prereqs
@@ -199,22 +168,8 @@ class TaskipelagoWorld(World):
         lock = bool(getattr(self.options, "lock_prereqs"))
         if lock:
             # cycle detect in prereq graph
-            visiting = set()
-            visited = set()
-
-            def dfs(v: int):
-                if v in visiting:
-                    raise Exception("Taskipelago: prereq graph contains a cycle. Fix your prereqs.")
-                if v in visited:
-                    return
-                visiting.add(v)
-                for u in parsed_prereqs[v]:
-                    dfs(u)
-                visiting.remove(v)
-                visited.add(v)
-
-            for i in range(n):
-                dfs(i)
+            if find_cycle(parsed_prereqs) is not None:
+                raise Exception(f"Taskipelago: {CYCLE_MESSAGE}")
 
         # store
         self._tasks = tasks
@@ -336,6 +291,7 @@ class TaskipelagoWorld(World):
                 )
             )
 
+    @profiled("set_rules")
     def set_rules(self) -> None:
         if not self._lock_prereqs:
             return
@@ -428,6 +384,7 @@ class TaskipelagoWorld(World):
             "base_reward_location_id": BASE_REWARD_LOC_ID,
             "base_complete_location_id": BASE_COMPLETE_LOC_ID,
             "base_item_id": BASE_ITEM_ID,
+            "base_token_id": BASE_TOKEN_ID,
         }
 
 
@@ -436,6 +393,11 @@ def launch_client(*args):
     launch_subprocess(launch, name="TaskipelagoClient", args=args)
 
 
+def launch_headless_client(*args):
+    from .headless import launch
+    launch_subprocess(launch, name="TaskipelagoHeadless", args=args)
+
+
 components.append(
     Component(
         "Taskipelago Client",
@@ -443,3 +405,11 @@ components.append(
         component_type=Type.CLIENT,
     )
 )
+components.append(
+    Component(
+        "Taskipelago Headless Client",
+        func=launch_headless_client,
+        component_type=Type.CLIENT,
+        cli=True,
+    )
+)
@@ -0,0 +1,119 @@
+"""
+"What should I do next": how much of the prereq graph each task opens up, without Tk.
+
+    analysis = PrereqAnalysis.for_slot(ctx)
+    analysis.sync(done)             # indices of completed (or pending) tasks
+    analysis.best_next(available)   # most unlocks first
+
+Two numbers per task, both counting only tasks that aren't done yet:
+
+  unlocks  how many tasks are downstream of it (directly or through other tasks)
+  chain    how many tasks the longest prereq chain starting at it still has, itself included
+
+Descendant sets are Python ints used as bitsets, filled in one reverse-topological pass
+(desc[v] = OR of each child's bit and desc), so building is O(E * n/64) word operations and a
+count is one popcount against the open-tasks mask. Completing a task only touches its
+ancestors: their unlocks drop by one and their chains are recomputed bottom-up.
+
+Edges are the same ones the Prereq Graph tab draws (task and reward prereqs). If the slot has
+a cycle, the edge that closes it is left out here rather than counted both ways.
+"""
+from typing import Iterable, List, Sequence, Tuple
+
+from .graph_layout import acyclic, prereq_edges
+
+
+class PrereqAnalysis:
+    def __init__(self, n: int, edges: Sequence[Tuple[int, int, str]]):
+        self.n = n
+        self._children: List[List[int]] = [[] for _ in range(n)]
+        indeg = [0] * n
+        seen = set()
+        for src, dst, _kind, rev in acyclic(n, list(edges)):
+            if rev or (src, dst) in seen:
+                continue  # closes a cycle / task and reward prereq on the same pair
+            seen.add((src, dst))
+            self._children[src].append(dst)
+            indeg[dst] += 1
+
+        # Kahn's order; acyclic left no cycles, so every task makes it in
+        order = [v for v in range(n) if indeg[v] == 0]
+        head = 0
+        while head < len(order):
+            v = order[head]
+            head += 1
+            for w in self._children[v]:
+                indeg[w] -= 1
+                if indeg[w] == 0:
+                    order.append(w)
+        self._topo = order
+        self._rank = [0] * n  # position in the topological order
+        for pos, v in enumerate(order):
+            self._rank[v] = pos
+
+        self._desc = [0] * n
+        for v in reversed(order):
+            d = 0
+            for w in self._children[v]:
+                d |= self._desc[w] | (1 << w)
+            self._desc[v] = d
+
+        self._done = set()
+        self._open = (1 << n) - 1
+        self._unlocks = [d.bit_count() for d in self._desc]
+        self._chain = [0] * n
+        for v in reversed(order):
+            self._update_chain(v)
+
+    @classmethod
+    def for_slot(cls, ctx) -> "PrereqAnalysis":
+        n = len(ctx.tasks or [])
+        return cls(n, prereq_edges(ctx.task_prereqs, ctx.reward_prereqs, n))
+
+    # ---------- queries ----------
+    def unlocks(self, i: int) -> int:
+        return self._unlocks[i] if 0 <= i < self.n else 0
+
+    def chain(self, i: int) -> int:
+        return self._chain[i] if 0 <= i < self.n else 0
+
+    def rank_key(self, i: int) -> Tuple[int, int, int]:
+        """Sort key: most unlocks, then longest chain, then YAML order."""
+        return -self.unlocks(i), -self.chain(i), i
+
+    def best_next(self, candidates: Iterable[int]) -> List[int]:
+        return sorted(candidates, key=self.rank_key)
+
+    # ---------- completion ----------
+    def sync(self, done: Iterable[int]) -> bool:
+        """Catch up with the slot's done tasks. Returns True if any number changed."""
+        done = {i for i in done if 0 <= i < self.n}
+        if not self._done <= done:
+            # something came back (a pending check we gave up on): start from scratch
+            self._done = set()
+            self._open = (1 << self.n) - 1
+            self._unlocks = [d.bit_count() for d in self._desc]
+            for v in reversed(self._topo):
+                self._update_chain(v)
+        new = done - self._done
+        for i in sorted(new, key=self._rank.__getitem__, reverse=True):
+            self.complete(i)
+        return bool(new)
+
+    def complete(self, i: int):
+        if i in self._done or not 0 <= i < self.n:
+            return
+        self._done.add(i)
+        bit = 1 << i
+        self._open &= ~bit
+        ancestors = [v for v in range(self.n) if self._desc[v] & bit]
+        for v in ancestors:
+            self._unlocks[v] -= 1
+        # children before parents, so each chain reads finished ones
+        self._update_chain(i)
+        for v in sorted(ancestors, key=self._rank.__getitem__, reverse=True):
+            self._update_chain(v)
+
+    def _update_chain(self, v: int):
+        below = max((self._chain[w] for w in self._children[v]), default=0)
+        self._chain[v] = below + (1 if (self._open >> v) & 1 else 0)
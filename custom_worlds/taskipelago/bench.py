@@ -0,0 +1,201 @@
+"""
+Benchmarks for the Tk-free play logic (PlayModel + context), no window and no sockets.
+
+    python -m worlds.taskipelago.bench [--sizes 10,100,1000,10000] [--rounds 50] [--json]
+
+For every slot size a MockRoom (see mockserver.py) generates the slot, and its commands are
+fed straight into process_server_cmd; PlayModel.pump() handles the resulting events just like
+the UI does. Each operation is timed and its memory measured with tracemalloc:
+
+    connect       RoomInfo/Connected/DataPackage/ReceivedItems until the model is connected
+    items         one ReceivedItems packet of --batch new items, handled + notifications built
+    task_states   full lock/available/pending recompute over every task
+    status        the per-state counts and best next task the headless API reports
+    complete      complete() on an available task through the server's RoomUpdate echo
+    deathlink     one Bounced DeathLink received and its burst flushed
+    graph_layout  the Prereq Graph tab's layered layout of the slot (once, after connect)
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from .metrics import percentiles
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+
+class OpStats:
+    def __init__(self):
+        self.times: List[float] = []
+        self.alloc: List[int] = []
+        self.peak: List[int] = []
+
+    def to_dict(self) -> dict:
+        out = percentiles(self.times)
+        if self.alloc:
+            out["alloc_kb_mean"] = sum(self.alloc) / len(self.alloc) / 1024
+            out["peak_kb_max"] = max(self.peak) / 1024
+        return out
+
+
+class _Bench:
+    def __init__(self, tasks: int, batch: int, seed: int, state_dir: Path):
+        from NetUtils import Endpoint
+
+        from .context import TaskipelagoContext, spawn
+        from .mockserver import MockConfig, MockRoom, _DirectConnection, _DirectSocket
+        from .play_model import PlayModel
+
+        self.room = MockRoom(MockConfig(tasks=tasks, item_batch=batch, seed=seed))
+        self.ctx = TaskipelagoContext("mock", None)
+        self.ctx.auth = "Bencher"
+        self.ctx.server_address = "mock"
+        self.ctx._notify_state_path = state_dir / "notify_state.json"
+        self.conn = _DirectConnection(self.room, self.ctx)
+        self.ctx.server = Endpoint(_DirectSocket(self.conn))
+
+        self.model = PlayModel(self.ctx, send=lambda msgs: spawn(self.ctx.send_msgs(msgs)),
+                               history_path=state_dir / "notify_history.jsonl")
+        self.ops: Dict[str, OpStats] = {}
+
+    async def settle(self):
+        """Deliver everything the room has queued (and whatever the replies trigger)."""
+        import CommonClient
+        from NetUtils import decode
+
+        idle = 0
+        while idle < 3:
+            await asyncio.sleep(0)
+            if self.conn._queue.empty():
+                idle += 1
+                continue
+            idle = 0
+            cmds = self.conn._queue.get_nowait()
+            if cmds is None:
+                return
+            for msg in decode(json.dumps(cmds)):
+                await CommonClient.process_server_cmd(self.ctx, msg)
+        self.model.pump()
+
+    async def measure(self, name: str, coro_fn):
+        stats = self.ops.setdefault(name, OpStats())
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        await coro_fn()
+        stats.times.append(time.perf_counter() - t0)
+        after, peak = tracemalloc.get_traced_memory()
+        stats.alloc.append(after - before)
+        stats.peak.append(peak - before)
+
+    # ---------- operations ----------
+    async def connect(self):
+        self.model.connecting()
+        await self.conn.send([self.room.room_info()])
+        await self.ctx.send_connect()
+        for _ in range(100):
+            await self.settle()
+            if self.model.connection_state == "connected":
+                return
+        raise RuntimeError("mock room never connected")
+
+    async def items(self):
+        await self.conn.send([self.room.item_flood(self.conn)])
+        await self.settle()
+
+    async def task_states(self):
+        self.model.task_states()
+
+    async def status(self):
+        self.model.status()
+
+    def pick_available(self):
+        return next((st.index for st in self.model.task_states() if st.status == "available"), None)
+
+    async def complete(self, i):
+        if i is not None:
+            self.model.complete(i)
+            await self.settle()
+
+    async def deathlink(self):
+        self.ctx.deathlink.receive({"time": time.time(), "source": "Other1", "cause": "bench"}, time.monotonic())
+        burst = self.ctx.deathlink.flush(time.monotonic(), force=True)
+        if burst:
+            from .notifications import deathlink_notification
+
+            self.model.notify([deathlink_notification(burst)])
+
+    async def graph_layout(self):
+        from .graph_layout import layered_layout, prereq_edges
+
+        n = len(self.ctx.tasks)
+        layered_layout(n, prereq_edges(self.ctx.task_prereqs, self.ctx.reward_prereqs, n))
+
+
+async def bench_size(tasks: int, rounds: int = 50, batch: int = 25, seed: int = 0) -> dict:
+    state_dir = Path(tempfile.mkdtemp(prefix="taskipelago_bench_"))
+    try:
+        b = _Bench(tasks, batch, seed, state_dir)
+        await b.measure("connect", b.connect)
+        await b.measure("graph_layout", b.graph_layout)
+        for _ in range(rounds):
+            await b.measure("items", b.items)
+            await b.measure("task_states", b.task_states)
+            await b.measure("status", b.status)
+            i = b.pick_available()  # outside the timing: it's a full task_states pass
+            await b.measure("complete", lambda: b.complete(i))
+            await b.measure("deathlink", b.deathlink)
+        return {"tasks": tasks, "rounds": rounds, "batch": batch,
+                "ops": {name: stats.to_dict() for name, stats in b.ops.items()},
+                "notifications": len(b.model.notifications)}
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+
+async def run(sizes=DEFAULT_SIZES, rounds: int = 50, batch: int = 25, seed: int = 0) -> List[dict]:
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        return [await bench_size(n, rounds, batch, seed) for n in sizes]
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def _print_report(reports: List[dict]):
+    print(f"{'tasks':>7} {'op':<12}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'alloc KiB':>11}{'peak KiB':>10}")
+    for rep in reports:
+        for op, p in rep["ops"].items():
+            if not p.get("n"):
+                continue
+            print(f"{rep['tasks']:>7} {op:<12}{p['n']:>6}{p['p50_ms']:>10.3f}{p['p95_ms']:>10.3f}{p['max_ms']:>10.3f}"
+                  f"{p.get('alloc_kb_mean', 0):>11.1f}{p.get('peak_kb_max', 0):>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="TaskipelagoBench", description="Benchmark the Taskipelago play model.")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in DEFAULT_SIZES),
+                        help="comma-separated task counts")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=25, help="items per ReceivedItems packet")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    reports = asyncio.run(run(sizes, args.rounds, args.batch, args.seed))
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        _print_report(reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import ttk
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+TASK_TITLE_FONT = ("Segoe UI", 12)
+NOTIFY_TITLE_FONT = ("Segoe UI", 11, "bold")
+META_FONT = ("Segoe UI", 9)
+BODY_FONT = ("Segoe UI", 10)
+BUTTON_FONT = ("Segoe UI", 9)
+
+
+@dataclass
+class CardSpec:
+    """Everything a renderer needs to draw one card. Renderers never look at app state."""
+    key: Any
+    title: str
+    title_font: Tuple = TASK_TITLE_FONT
+    muted: bool = False           # draw the title in the muted color (completed tasks)
+    meta: str = ""                # small muted line under the title
+    body: str = ""
+    hints: Tuple[str, ...] = ()   # muted lines at the bottom (lock hints)
+    button: Optional[str] = None  # "Complete" / "Dismiss" / None
+    button_enabled: bool = True
+    toggle: Optional[str] = None  # small link at the bottom; clicking it reports action "toggle"
+
+
+# ----------------------------
+# Text measurement (cached)
+# ----------------------------
+class TextMeasurer:
+    """
+    Wraps text the same way every time without asking Tk more than once per word.
+    Shared between card lists so a redraw of N cards is mostly dict lookups.
+    """
+
+    MAX_CACHED_WRAPS = 20000
+
+    def __init__(self, root: tk.Misc):
+        self._root = root
+        self._fonts: Dict[Tuple, tkfont.Font] = {}
+        self._widths: Dict[Tuple, int] = {}
+        self._linespace: Dict[Tuple, int] = {}
+        self._wraps: Dict[Tuple, Tuple[str, ...]] = {}
+
+    def font(self, spec: Tuple) -> tkfont.Font:
+        f = self._fonts.get(spec)
+        if f is None:
+            f = tkfont.Font(root=self._root, font=spec)
+            self._fonts[spec] = f
+        return f
+
+    def width(self, text: str, spec: Tuple) -> int:
+        key = (spec, text)
+        w = self._widths.get(key)
+        if w is None:
+            w = self.font(spec).measure(text)
+            self._widths[key] = w
+        return w
+
+    def linespace(self, spec: Tuple) -> int:
+        ls = self._linespace.get(spec)
+        if ls is None:
+            ls = self.font(spec).metrics("linespace")
+            self._linespace[spec] = ls
+        return ls
+
+    def wrap(self, text: str, spec: Tuple, max_width: int) -> Tuple[str, ...]:
+        key = (spec, max_width, text)
+        cached = self._wraps.get(key)
+        if cached is not None:
+            return cached
+
+        space = self.width(" ", spec)
+        lines: List[str] = []
+        for para in text.split("\n"):
+            line = ""
+            line_w = 0
+            for word in para.split(" "):
+                ww = self.width(word, spec)
+                if line and line_w + space + ww > max_width:
+                    lines.append(line)
+                    line, line_w = "", 0
+                if not line and ww > max_width:
+                    # single word wider than the card: hard break it
+                    chunk = ""
+                    for ch in word:
+                        if chunk and self.width(chunk + ch, spec) > max_width:
+                            lines.append(chunk)
+                            chunk = ""
+                        chunk += ch
+                    line, line_w = chunk, self.width(chunk, spec)
+                    continue
+                if line:
+                    line += " " + word
+                    line_w += space + ww
+                else:
+                    line, line_w = word, ww
+            lines.append(line)
+
+        out = tuple(lines)
+        if len(self._wraps) > self.MAX_CACHED_WRAPS:
+            self._wraps.clear()
+        self._wraps[key] = out
+        return out
+
+
+# ----------------------------
+# Canvas card list
+# ----------------------------
+class _CanvasCard:
+    __slots__ = ("spec", "tag", "top", "height", "button_box", "toggle_box", "hidden")
+
+    def __init__(self, spec: CardSpec, tag: str):
+        self.spec = spec
+        self.tag = tag
+        self.top = 0
+        self.height = 0
+        self.button_box = None  # (x1, y1, x2, y2) relative to card top
+        self.toggle_box = None
+        self.hidden = False  # filtered out: still drawn, takes no space
+
+
+class CanvasCardList(ttk.Frame):
+    """
+    Draws every card as items on a single tk.Canvas instead of a Frame+Labels per card.
+    Clicks are hit-tested against the card layout; on_action(key, button_text) is called for
+    enabled buttons.
+
+    set_filter() hides cards without redrawing them: hidden cards keep their items (state
+    hidden) and take up no space, so the next card's top is always prev.top + _span(prev).
+    """
+
+    PAD_X = 10
+    PAD_Y = 8
+    GAP = 12
+    BUTTON_PAD = (10, 4)
+
+    def __init__(self, parent, colors: dict, measurer: TextMeasurer, on_action: Optional[Callable] = None):
+        super().__init__(parent)
+        self.colors = colors
+        self.measurer = measurer
+        self.on_action = on_action
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, bg=colors.get("bg", "#1e1e1e"))
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        self.vsb.grid_remove()
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # mousewheel dispatch walks masters looking for this
+        self._scroll_owner = self
+        self.canvas._scroll_owner = self
+
+        self._cards: List[_CanvasCard] = []
+        self._by_key: Dict[Any, _CanvasCard] = {}
+        self._tops: List[int] = []
+        self._tops_dirty = False
+        self._next_tag = 0
+        self._width = 1
+        self._filter: Optional[set] = None  # keys allowed to show; None = all
+
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        self.canvas.bind("<Button-1>", self._on_click)
+
+    # ---------- public API ----------
+    def set_cards(self, specs: List[CardSpec]):
+        self.canvas.delete("all")
+        self._cards = []
+        self._by_key = {}
+        y = self.GAP // 2
+        for spec in specs:
+            card = self._new_card(spec)
+            self._cards.append(card)
+            self._by_key[spec.key] = card
+            self._draw(card, y)
+            y += self._span(card)
+        self._tops_dirty = True
+        self._update_region()
+
+    def append_card(self, spec: CardSpec):
+        """Add a card below all others (used by chunked rebuilds)."""
+        if spec.key in self._by_key:
+            self.update_card(spec)
+            return
+        card = self._new_card(spec)
+        last = self._cards[-1] if self._cards else None
+        top = (last.top + self._span(last)) if last else self.GAP // 2
+        self._cards.append(card)
+        self._by_key[spec.key] = card
+        self._draw(card, top)
+        self._update_region()
+
+    def update_card(self, spec: CardSpec):
+        card = self._by_key.get(spec.key)
+        if card is None:
+            return
+        old_h = card.height
+        self.canvas.delete(card.tag)
+        card.spec = spec
+        self._draw(card, card.top)
+        dh = card.height - old_h
+        if dh and not card.hidden:
+            self._shift_after(card, dh)
+        self._update_region()
+
+    def prepend_card(self, spec: CardSpec):
+        """Add a card above all others without touching the existing ones."""
+        if spec.key in self._by_key:
+            self.update_card(spec)
+            return
+        at_top = self.canvas.yview()[0] <= 0.0
+        card = self._new_card(spec)
+        self._draw(card, 0)
+        if self._cards:
+            top = self._cards[0].top - self._span(card)
+            self.canvas.move(card.tag, 0, top)
+            card.top = top
+        self._cards.insert(0, card)
+        self._by_key[spec.key] = card
+        self._tops_dirty = True
+        self._update_region()
+        if at_top:
+            self.canvas.yview_moveto(0.0)
+
+    def remove_card(self, key):
+        card = self._by_key.pop(key, None)
+        if card is None:
+            return
+        self.canvas.delete(card.tag)
+        dy = self._span(card)
+        idx = self._cards.index(card)
+        del self._cards[idx]
+        # close the gap from whichever side has fewer cards to move
+        if idx < len(self._cards) - idx:
+            for c in self._cards[:idx]:
+                self.canvas.move(c.tag, 0, dy)
+                c.top += dy
+        else:
+            for c in self._cards[idx:]:
+                self.canvas.move(c.tag, 0, -dy)
+                c.top -= dy
+        self._tops_dirty = True
+        self._update_region()
+
+    def clear(self):
+        self.set_cards([])
+
+    def set_filter(self, keys: Optional[set]):
+        """Show only cards whose key is in keys (None shows everything). Moves, never redraws."""
+        self._filter = None if keys is None else set(keys)
+        self._restack(self._cards[0].top if self._cards else 0)
+
+    def set_order(self, keys):
+        """Put cards in this key order; unlisted cards keep theirs, after the rest. Moves, never redraws."""
+        if not self._cards:
+            return
+        top = min(c.top for c in self._cards)
+        pos = {key: n for n, key in enumerate(keys)}
+        last = len(pos)
+        self._cards.sort(key=lambda c: pos.get(c.spec.key, last))
+        self._restack(top)
+
+    def set_visible(self, key, visible: bool):
+        """Re-check one card against the filter after its state changed."""
+        card = self._by_key.get(key)
+        if card is None or card.hidden != visible:
+            return
+        if self._filter is not None:
+            if visible:
+                self._filter.add(key)
+            else:
+                self._filter.discard(key)
+        card.hidden = not visible
+        self.canvas.itemconfigure(card.tag, state="normal" if visible else "hidden")
+        dy = card.height + self.GAP
+        self._shift_after(card, dy if visible else -dy)
+        self._update_region()
+
+    def visible_count(self) -> int:
+        return sum(1 for c in self._cards if not c.hidden)
+
+    def keys(self):
+        return [c.spec.key for c in self._cards]
+
+    def has_card(self, key) -> bool:
+        return key in self._by_key
+
+    def scroll_to(self, key):
+        card = self._by_key.get(key)
+        region = self.canvas.bbox("all")
+        if card is None or card.hidden or not region:
+            return
+        total = max(1, region[3] - region[1])
+        self.canvas.yview_moveto(max(0.0, (card.top - region[1] - self.GAP) / total))
+
+    def yview_scroll(self, amount: int, what: str = "units"):
+        self.canvas.yview_scroll(amount, what)
+
+    # ---------- layout / drawing ----------
+    def _new_card(self, spec: CardSpec) -> _CanvasCard:
+        self._next_tag += 1
+        card = _CanvasCard(spec, f"c{self._next_tag}")
+        card.hidden = not self._passes(spec.key)
+        return card
+
+    def _passes(self, key) -> bool:
+        return self._filter is None or key in self._filter
+
+    def _span(self, card: _CanvasCard) -> int:
+        return 0 if card.hidden else card.height + self.GAP
+
+    def _restack(self, y: int):
+        """Re-check the filter and stack the cards from y down in list order."""
+        for card in self._cards:
+            hidden = not self._passes(card.spec.key)
+            if hidden != card.hidden:
+                card.hidden = hidden
+                self.canvas.itemconfigure(card.tag, state="hidden" if hidden else "normal")
+            if card.top != y:
+                self.canvas.move(card.tag, 0, y - card.top)
+                card.top = y
+            y += self._span(card)
+        self._tops_dirty = True
+        self._update_region()
+
+    def _shift_after(self, card: _CanvasCard, dy: int):
+        hit = False
+        for c in self._cards:
+            if hit:
+                self.canvas.move(c.tag, 0, dy)
+                c.top += dy
+            elif c is card:
+                hit = True
+        self._tops_dirty = True
+
+    def _draw(self, card: _CanvasCard, top: int):
+        m = self.measurer
+        cv = self.canvas
+        spec = card.spec
+        panel = self.colors.get("panel", "#252526")
+        border = self.colors.get("border", "#3a3a3a")
+        fg = self.colors.get("fg", "#e6e6e6")
+        muted = self.colors.get("muted", "#bdbdbd")
+        tags = (card.tag, "card")
+
+        left = 4 + self.PAD_X
+        right = self._width - 4 - self.PAD_X
+        inner_w = max(40, right - left)
+
+        # button goes top-right; title wraps in what's left
+        btn_w = btn_h = 0
+        if spec.button:
+            btn_w = m.width(spec.button, BUTTON_FONT) + 2 * self.BUTTON_PAD[0]
+            btn_h = m.linespace(BUTTON_FONT) + 2 * self.BUTTON_PAD[1]
+
+        y = top + self.PAD_Y
+        title_w = max(40, inner_w - (btn_w + 10 if btn_w else 0))
+        title_lines = m.wrap(spec.title, spec.title_font, title_w)
+        cv.create_text(left, y, text="\n".join(title_lines), anchor="nw", font=spec.title_font,
+                       fill=muted if spec.muted else fg, tags=tags)
+        title_h = len(title_lines) * m.linespace(spec.title_font)
+
+        card.button_box = None
+        if spec.button:
+            bx2 = right
+            bx1 = right - btn_w
+            by1 = y
+            by2 = y + btn_h
+            btn_bg = "#303030" if spec.button_enabled else panel
+            cv.create_rectangle(bx1, by1, bx2, by2, fill=btn_bg, outline=border, tags=tags)
+            cv.create_text((bx1 + bx2) // 2, (by1 + by2) // 2, text=spec.button, font=BUTTON_FONT,
+                           fill=fg if spec.button_enabled else border, tags=tags)
+            card.button_box = (bx1, by1 - top, bx2, by2 - top)
+
+        y += max(title_h, btn_h) + 2
+
+        if spec.meta:
+            cv.create_text(left, y, text=spec.meta, anchor="nw", font=META_FONT, fill=muted, tags=tags)
+            y += m.linespace(META_FONT)
+
+        if spec.body:
+            body_lines = m.wrap(spec.body, BODY_FONT, inner_w)
+            cv.create_text(left, y + 4, text="\n".join(body_lines), anchor="nw", font=BODY_FONT, fill=fg, tags=tags)
+            y += 4 + len(body_lines) * m.linespace(BODY_FONT)
+
+        for hint in spec.hints:
+            hint_lines = m.wrap(hint, BODY_FONT, max(40, inner_w - 18))
+            cv.create_text(left + 18, y, text="\n".join(hint_lines), anchor="nw", font=BODY_FONT, fill=muted, tags=tags)
+            y += len(hint_lines) * m.linespace(BODY_FONT)
+
+        card.toggle_box = None
+        if spec.toggle:
+            y += 4
+            tw = m.width(spec.toggle, META_FONT)
+            lh = m.linespace(META_FONT)
+            cv.create_text(left, y, text=spec.toggle, anchor="nw", font=META_FONT, fill=muted, tags=tags)
+            card.toggle_box = (left, y - top, left + tw, y - top + lh)
+            y += lh
+
+        y += self.PAD_Y
+        rect = cv.create_rectangle(4, top, self._width - 4, y, fill=panel, outline=border, tags=tags)
+        cv.tag_lower(rect, card.tag)
+
+        card.top = top
+        card.height = y - top
+        if card.hidden:
+            cv.itemconfigure(card.tag, state="hidden")
+
+    def _relayout(self):
+        y = self.GAP // 2
+        self.canvas.delete("all")
+        for card in self._cards:
+            self._draw(card, y)
+            y += self._span(card)
+        self._tops_dirty = True
+        self._update_region()
+
+    def _update_region(self):
+        region = self.canvas.bbox("all")
+        if region:
+            self.canvas.configure(scrollregion=(0, region[1] - self.GAP // 2, self._width, region[3] + self.GAP // 2))
+        else:
+            self.canvas.configure(scrollregion=(0, 0, self._width, 0))
+
+    def _on_canvas_configure(self, event):
+        if event.width != self._width:
+            self._width = event.width
+            self._relayout()
+
+    def _on_scroll(self, first, last):
+        self.vsb.set(first, last)
+        if float(first) <= 0.0 and float(last) >= 1.0:
+            self.vsb.grid_remove()
+        else:
+            self.vsb.grid()
+
+    # ---------- hit testing ----------
+    def card_at(self, y: float) -> Optional[_CanvasCard]:
+        if self._tops_dirty:
+            self._cards.sort(key=lambda c: c.top)
+            self._tops = [c.top for c in self._cards]
+            self._tops_dirty = False
+        i = bisect_right(self._tops, y) - 1
+        if i < 0:
+            return None
+        card = self._cards[i]
+        if card.hidden or y > card.top + card.height:
+            return None
+        return card
+
+    def _on_click(self, event):
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        card = self.card_at(y)
+        if card is None or not callable(self.on_action):
+            return
+        ry = y - card.top
+        if card.button_box is not None and card.spec.button_enabled:
+            x1, y1, x2, y2 = card.button_box
+            if x1 <= x <= x2 and y1 <= ry <= y2:
+                self.on_action(card.spec.key, card.spec.button)
+                return
+        if card.toggle_box is not None:
+            x1, y1, x2, y2 = card.toggle_box
+            if x1 <= x <= x2 and y1 <= ry <= y2:
+                self.on_action(card.spec.key, "toggle")
@@ -1,23 +1,104 @@
 import asyncio
-from dataclasses import dataclass
+from collections import deque
 from datetime import datetime
+import os
 from pathlib import Path
-import random
 import threading
 import time
+import traceback
 from tkinter import filedialog, messagebox
 import tkinter as tk
 from tkinter import ttk
 
 import json
-import yaml
 
-import CommonClient
-from NetUtils import Endpoint, decode
+from .events import UIEventBus
+from .metrics import METRICS
+from . import profiling
+from .profiling import profiled
+from .play_model import (
+    CONNECTED, FAILED, LOST_CONNECTION, NOTIFICATION, STATE_CHANGED, TASK_CHANGED, PlayModel,
+)
+from .play_state import TaskState, received_item_ids, slot_ready
+from .scheduler import RenderScheduler
+from .notifications import Notification
+from .graph_layout import layered_layout, prereq_edges
+from .graph_view import PrereqGraphView
+from .cards import BODY_FONT, META_FONT, NOTIFY_TITLE_FONT, CanvasCardList, CardSpec, TextMeasurer
+from .search import STATE_FILTERS, TaskSearchIndex, filter_active, filter_keys, task_matches
+from .task_table import (
+    DEFAULT_REWARD_TYPE, FILLER_TOKEN, REWARD_TYPE_VALUES, TaskRecord, TaskTable, label_key, ref_number,
+)
+from .validation import GeneratorValidator
+from . import ingest, yaml_io
+
+# how often the Tk thread drains network events
+EVENT_PUMP_MS = 30
+
+# how often the diagnostics window re-reads the metrics
+DIAGNOSTICS_REFRESH_MS = 1000
+
+# how often the Tk thread checks on a file import/export running on the worker
+FILE_JOB_POLL_MS = 50
+
+# validation problems listed when an export is refused
+EXPORT_PROBLEMS_SHOWN = 10
+
+# Play tab card orders; "Best next" ranks by prereq fan-out (see analysis.py)
+SORT_MODES = ("YAML order", "Best next")
+# available tasks that get the "Best next" badge
+BEST_NEXT_BADGES = 3
+
+# "canvas" draws all cards on one tk.Canvas, "widgets" is the old Frame-per-card renderer
+CARD_RENDERER = os.environ.get("TASKIPELAGO_RENDERER", "canvas").strip().lower()
+
+
+def count_widgets(root) -> int:
+    n = 0
+    stack = [root]
+    while stack:
+        w = stack.pop()
+        n += 1
+        stack.extend(w.winfo_children())
+    return n
 
-FILLER_TOKEN = "nothing here, get pranked nerd"
-REWARD_TYPE_VALUES = ("junk", "useful", "progression", "trap")
-DEFAULT_REWARD_TYPE = "useful"
+
+# ----------------------------
+# Startup timing
+# ----------------------------
+class StartupTimer:
+    """
+    Marks how long the window took to come up. "first paint" is the first idle after the
+    window is drawn; "interactive" is once the network context exists too (CommonClient is
+    imported on the loop thread, so that part runs alongside the first paint).
+    """
+
+    def __init__(self, t0: float = None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = []  # (name, seconds since t0)
+        self.done = False
+
+    def mark(self, name: str):
+        self.marks.append((name, time.perf_counter() - self.t0))
+
+    def get(self, name: str):
+        for n, t in self.marks:
+            if n == name:
+                return t
+        return None
+
+    def report(self) -> str:
+        parts = []
+        last = 0.0
+        for name, t in self.marks:
+            if name in ("first paint", "interactive"):
+                continue
+            parts.append(f"{name} {(t - last) * 1000:.0f}")
+            last = t
+        first_paint = self.get("first paint") or 0.0
+        interactive = self.get("interactive") or 0.0
+        return (f"[Taskipelago] Startup: first paint {first_paint * 1000:.0f} ms, "
+                f"interactive {interactive * 1000:.0f} ms ({', '.join(parts)} ms)")
 
 # ----------------------------
 # Dark theme helpers (ttk)
@@ -32,6 +113,7 @@ def apply_dark_theme(root: tk.Tk):
     fg = "#e6e6e6"
     muted = "#bdbdbd"
     border = "#3a3a3a"
+    error = "#f48771"
 
     root.configure(bg=bg)
 
@@ -41,11 +123,14 @@ def apply_dark_theme(root: tk.Tk):
     style.configure("TLabelframe.Label", background=bg, foreground=fg)
     style.configure("TLabel", background=bg, foreground=fg)
     style.configure("Muted.TLabel", background=bg, foreground=muted)
+    style.configure("Error.TLabel", background=bg, foreground=error)
 
     style.configure("TButton", background=panel, foreground=fg, bordercolor=border)
     style.map("TButton", background=[("active", "#303030")])
 
     style.configure("TEntry", fieldbackground=field, background=field, foreground=fg, insertcolor=fg)
+    # the YAML Generator marks fields generate_early would reject
+    style.map("TEntry", fieldbackground=[("invalid", "#4a2626")])
     style.configure("TSpinbox", fieldbackground=field, background=field, foreground=fg, insertcolor=fg)
 
     style.configure(
@@ -73,7 +158,7 @@ def apply_dark_theme(root: tk.Tk):
     style.configure("TNotebook.Tab", padding=(14, 6), background="#3a3a3a", foreground="#dddddd", borderwidth=0)
     style.map("TNotebook.Tab", background=[("selected", "#4a4a4a")], foreground=[("selected", "#ffffff")])
 
-    return {"bg": bg, "panel": panel, "border": border, "fg": fg, "muted": muted}
+    return {"bg": bg, "panel": panel, "border": border, "fg": fg, "muted": muted, "error": error}
 
 
 # ----------------------------
@@ -132,6 +217,9 @@ class ScrollableFrame(ttk.Frame):
         else:
             self.vsb.grid_remove()
 
+    def yview_scroll(self, amount: int, what: str = "units"):
+        self.canvas.yview_scroll(amount, what)
+
     # ---------- Mousewheel plumbing ----------
     @classmethod
     def bind_mousewheel_to_root(cls, root: tk.Misc):
@@ -158,35 +246,183 @@ class ScrollableFrame(ttk.Frame):
 
         delta = int(-1 * (event.delta / 120)) if getattr(event, "delta", 0) else 0
         if delta:
-            owner.canvas.yview_scroll(delta, "units")
+            owner.yview_scroll(delta, "units")
 
     @classmethod
     def _dispatch_mousewheel_linux(cls, event, root: tk.Misc, direction: int):
         owner = cls._find_scroll_owner_under_pointer(root, event.x_root, event.y_root)
         if owner is None:
             return
-        owner.canvas.yview_scroll(direction, "units")
+        owner.yview_scroll(direction, "units")
+
+
+class WidgetCardList(ScrollableFrame):
+    """
+    The original Frame+Label card renderer, kept behind the same interface as CanvasCardList.
+    Select it with TASKIPELAGO_RENDERER=widgets.
+    """
+
+    def __init__(self, parent, colors, on_action=None):
+        super().__init__(parent, colors=colors)
+        self.on_action = on_action
+        self._frames = {}
+        self._filter = None
+
+    def set_cards(self, specs):
+        for child in self.inner.winfo_children():
+            child.destroy()
+        self._frames = {}
+        for spec in specs:
+            self._frames[spec.key] = self._build(spec)
+
+    def update_card(self, spec):
+        old = self._frames.get(spec.key)
+        if old is None:
+            return
+        card = self._build(spec)
+        if card.winfo_manager() and old.winfo_manager():
+            card.pack_configure(before=old)
+        old.destroy()
+        self._frames[spec.key] = card
+
+    def append_card(self, spec):
+        if spec.key in self._frames:
+            self.update_card(spec)
+            return
+        self._frames[spec.key] = self._build(spec)
+
+    def prepend_card(self, spec):
+        old = self._frames.get(spec.key)
+        if old is not None:
+            self.update_card(spec)
+            return
+        card = self._build(spec)
+        siblings = self.inner.pack_slaves()
+        # _build only packs cards the filter lets through; pack_configure would show a hidden one
+        if card.winfo_manager() and len(siblings) > 1:
+            card.pack_configure(before=siblings[0])
+        self._frames = {spec.key: card, **self._frames}
+
+    def remove_card(self, key):
+        card = self._frames.pop(key, None)
+        if card is not None:
+            card.destroy()
+
+    def clear(self):
+        self.set_cards([])
+
+    def set_filter(self, keys):
+        self._filter = None if keys is None else set(keys)
+        for card in self._frames.values():
+            card.pack_forget()
+        for key, card in self._frames.items():
+            if self._filter is None or key in self._filter:
+                card.pack(fill="x", pady=6, padx=4)
+
+    def set_visible(self, key, visible: bool):
+        if self._filter is None or (key in self._filter) == visible:
+            return
+        if visible:
+            self._filter.add(key)
+        else:
+            self._filter.discard(key)
+        self.set_filter(self._filter)
+
+    def set_order(self, keys):
+        pos = {key: n for n, key in enumerate(keys)}
+        last = len(pos)
+        self._frames = dict(sorted(self._frames.items(), key=lambda kv: pos.get(kv[0], last)))
+        self.set_filter(self._filter)
+
+    def visible_count(self) -> int:
+        if self._filter is None:
+            return len(self._frames)
+        return sum(1 for key in self._frames if key in self._filter)
+
+    def keys(self):
+        return list(self._frames.keys())
+
+    def has_card(self, key) -> bool:
+        return key in self._frames
+
+    def scroll_to(self, key):
+        card = self._frames.get(key)
+        if card is None:
+            return
+        self.update_idletasks()
+        total = max(1, self.inner.winfo_height())
+        self.canvas.yview_moveto(card.winfo_y() / total)
+
+    def _build(self, spec):
+        panel = self.colors.get("panel", "#252526")
+        border = self.colors.get("border", "#3a3a3a")
+        fg = self.colors.get("fg", "#e6e6e6")
+        muted = self.colors.get("muted", "#bdbdbd")
+
+        card = tk.Frame(self.inner, bg=panel, highlightbackground=border, highlightthickness=1)
+        if self._filter is None or spec.key in self._filter:
+            card.pack(fill="x", pady=6, padx=4)
+
+        top = tk.Frame(card, bg=panel)
+        top.pack(fill="x", padx=10, pady=(8, 2))
+
+        tk.Label(top, text=spec.title, bg=panel, fg=muted if spec.muted else fg, font=spec.title_font,
+                 wraplength=720, justify="left", anchor="w").pack(side="left", fill="x", expand=True)
+
+        if spec.button:
+            btn = ttk.Button(top, text=spec.button,
+                             command=lambda k=spec.key, b=spec.button: self.on_action and self.on_action(k, b))
+            if not spec.button_enabled:
+                btn.state(["disabled"])
+            btn.pack(side="right", padx=(10, 0))
+
+        if spec.meta:
+            tk.Label(card, text=spec.meta, bg=panel, fg=muted, font=META_FONT, anchor="w").pack(fill="x", padx=10)
+
+        if spec.body:
+            tk.Label(card, text=spec.body, bg=panel, fg=fg, font=BODY_FONT, anchor="w", justify="left",
+                     wraplength=300).pack(fill="x", padx=10, pady=(4, 8))
+
+        for hint in spec.hints:
+            tk.Label(card, text=hint, bg=panel, fg=muted, font=BODY_FONT, anchor="w", justify="left",
+                     wraplength=740).pack(fill="x", padx=28, pady=(0, 2))
+
+        if spec.toggle:
+            link = tk.Label(card, text=spec.toggle, bg=panel, fg=muted, font=META_FONT, anchor="w", cursor="hand2")
+            link.pack(fill="x", padx=10, pady=(0, 8))
+            link.bind("<Button-1>", lambda _e, k=spec.key: self.on_action and self.on_action(k, "toggle"))
+
+        if not spec.body and not spec.hints:
+            tk.Frame(card, bg=panel, height=6).pack(fill="x")
+        return card
 
 
 # ----------------------------
 # Rows (YAML Generator)
 # ----------------------------
-class TaskRow:
-    def __init__(self, parent, index: int, filler_token: str, on_remove):
-        self.parent = parent
-        self.index = index
-        self.filler_token = filler_token
-        self._on_remove = on_remove
+class _GridRow:
+    """One pooled row of editor widgets. Gets re-bound to whatever record is scrolled under it."""
+
+    def __init__(self, grid: "VirtualTaskGrid", slot: int):
+        self.grid = grid
+        self.index = None  # record index currently shown, None when hidden
+        self._binding = False
 
+        parent = grid.body
+        self.label_var = tk.StringVar()
         self.task_var = tk.StringVar()
         self.reward_var = tk.StringVar()
         self.prereq_var = tk.StringVar()
-        self.reward_prereq_var = tk.StringVar(value="")
-        self.reward_prereq_entry = ttk.Entry(parent, textvariable=self.reward_prereq_var, width = 10)
+        self.reward_prereq_var = tk.StringVar()
         self.filler_var = tk.BooleanVar()
-
         self.reward_type_var = tk.StringVar(value=DEFAULT_REWARD_TYPE)
-        self._saved_reward_type = DEFAULT_REWARD_TYPE
+
+        self.num_label = ttk.Label(parent, text="", width=4)
+        self.label_entry = ttk.Entry(parent, textvariable=self.label_var, width=10)
+        self.task_entry = ttk.Entry(parent, textvariable=self.task_var)
+        self.reward_entry = ttk.Entry(parent, textvariable=self.reward_var)
+        self.prereq_entry = ttk.Entry(parent, textvariable=self.prereq_var)
+        self.reward_prereq_entry = ttk.Entry(parent, textvariable=self.reward_prereq_var, width=10)
         self.reward_type_cb = ttk.Combobox(
             parent,
             textvariable=self.reward_type_var,
@@ -194,65 +430,385 @@ class TaskRow:
             state="readonly",
             width=12
         )
+        self.filler_cb = ttk.Checkbutton(parent, text="Filler", variable=self.filler_var, command=self._on_filler_toggle)
+        self.up_btn = ttk.Button(parent, text="▲", width=2, command=lambda: self.grid.move_record(self.index, -1))
+        self.down_btn = ttk.Button(parent, text="▼", width=2, command=lambda: self.grid.move_record(self.index, 1))
+        self.remove_btn = ttk.Button(parent, text="Remove", width=8, command=lambda: self.grid.remove_record(self.index))
+
+        self.widgets = (
+            self.num_label, self.label_entry, self.task_entry, self.reward_entry, self.prereq_entry, self.reward_prereq_entry,
+            self.reward_type_cb, self.filler_cb, self.up_btn, self.down_btn, self.remove_btn,
+        )
 
-        self._saved_reward = ""
-
-        self.num_label = ttk.Label(parent, text=str(index), width=3)
-        self.task_entry = ttk.Entry(parent, textvariable=self.task_var)
-        self.reward_entry = ttk.Entry(parent, textvariable=self.reward_var)
-        self.prereq_entry = ttk.Entry(parent, textvariable=self.prereq_var)
-        self.filler_cb = ttk.Checkbutton(parent, text="Filler", variable=self.filler_var, command=self.on_filler_toggle)
-        self.remove_btn = ttk.Button(parent, text="Remove", width=8, command=self.remove)
-
-        self._grid()
+        # edits flow straight into the record; no per-row state beyond the pool
+        for var, field in (
+            (self.label_var, "label"),
+            (self.task_var, "task"),
+            (self.reward_var, "reward"),
+            (self.prereq_var, "prereqs"),
+            (self.reward_prereq_var, "reward_prereqs"),
+            (self.reward_type_var, "reward_type"),
+        ):
+            var.trace_add("write", lambda *_a, v=var, f=field: self._on_edit(f, v))
 
-    def _grid(self):
-        r = self.index  # NOTE: header is row 0, so tasks start at row 1
+        r = slot + 1  # header is row 0
         self.num_label.grid(row=r, column=0, padx=(0, 8), sticky="w", pady=4)
-        self.task_entry.grid(row=r, column=1, padx=(0, 8), sticky="ew", pady=4)
-        self.reward_entry.grid(row=r, column=2, padx=(0, 8), sticky="ew", pady=4)
-        self.prereq_entry.grid(row=r, column=3, sticky="ew", padx=(0, 8), pady=4)
-        self.reward_prereq_entry.grid(row=r, column=4, sticky="ew", padx=(0, 8), pady=4)
+        self.label_entry.grid(row=r, column=1, padx=(0, 8), sticky="ew", pady=4)
+        self.task_entry.grid(row=r, column=2, padx=(0, 8), sticky="ew", pady=4)
+        self.reward_entry.grid(row=r, column=3, padx=(0, 8), sticky="ew", pady=4)
+        self.prereq_entry.grid(row=r, column=4, sticky="ew", padx=(0, 8), pady=4)
+        self.reward_prereq_entry.grid(row=r, column=5, sticky="ew", padx=(0, 8), pady=4)
+        self.reward_type_cb.grid(row=r, column=6, sticky="w", padx=(0, 8), pady=4)
+        self.filler_cb.grid(row=r, column=7, padx=(0, 8), sticky="w", pady=4)
+        self.up_btn.grid(row=r, column=8, pady=4)
+        self.down_btn.grid(row=r, column=9, padx=(0, 8), pady=4)
+        self.remove_btn.grid(row=r, column=10, padx=(0, 0), pady=4)
+
+        if grid.completer is not None:
+            grid.completer.attach(self.prereq_entry, self.prereq_var, lambda: self.index)
+            grid.completer.attach(self.reward_prereq_entry, self.reward_prereq_var, lambda: self.index)
+
+    def bind(self, index: int, rec: TaskRecord):
+        self.index = index
+        self._binding = True
+        try:
+            self.num_label.config(text=str(index + 1))
+            self.label_var.set(rec.label)
+            self.task_var.set(rec.task)
+            self.reward_var.set(rec.reward)
+            self.prereq_var.set(rec.prereqs)
+            self.reward_prereq_var.set(rec.reward_prereqs)
+            self.reward_type_var.set(rec.reward_type)
+            self.filler_var.set(rec.filler)
+        finally:
+            self._binding = False
+
+        state = ["disabled"] if rec.filler else ["!disabled"]
+        self.reward_entry.state(state)
+        self.reward_type_cb.state(state + (["readonly"] if not rec.filler else []))
+        validator = self.grid.validator
+        self.show_errors(validator.row_errors(index) if validator is not None else {})
+
+        for w in self.widgets:
+            w.grid()
+
+    def show_errors(self, errors: dict):
+        for entry, field in (
+            (self.label_entry, "label"),
+            (self.task_entry, "task"),
+            (self.reward_entry, "reward"),
+            (self.prereq_entry, "prereqs"),
+            (self.reward_prereq_entry, "reward_prereqs"),
+        ):
+            entry.state(["invalid"] if field in errors else ["!invalid"])
+        self.num_label.configure(style="Error.TLabel" if errors else "TLabel")
 
-        self.reward_type_cb.grid(row=r, column=5, sticky="w", padx=(0, 8), pady=4)
-        self.filler_cb.grid(row=r, column=6, padx=(0, 8), sticky="w", pady=4)
-        self.remove_btn.grid(row=r, column=7, padx=(0, 0), pady=4)
+    def hide(self):
+        self.index = None
+        for w in self.widgets:
+            w.grid_remove()
 
-    def remove(self):
-        for w in (self.num_label, self.task_entry, self.reward_entry, self.prereq_entry, self.reward_prereq_entry, self.reward_type_cb, self.filler_cb, self.remove_btn):
-            self._on_remove(self)
+    def _on_edit(self, field: str, var: tk.Variable):
+        if self._binding or self.index is None:
+            return
+        rec = self.grid.model[self.index]
+        value = var.get()
+        if field == "reward_type":
+            value = str(value).strip().lower()
+        setattr(rec, field, value)
+        self.grid.model.updated(self.index)
+
+    def _on_filler_toggle(self):
+        if self.index is None:
+            return
+        rec = self.grid.model[self.index]
+        rec.set_filler(bool(self.filler_var.get()))
+        self.bind(self.index, rec)
+        self.grid.model.updated(self.index)
+
+
+class VirtualTaskGrid(ttk.Frame):
+    """
+    Editable task table that only materializes the rows that fit on screen.
+    Data lives in a TaskTable; scrolling/insert/remove just re-binds the small widget pool.
+    """
+
+    def __init__(self, parent, model: TaskTable, validator: GeneratorValidator = None,
+                 completer: "PrereqCompleter" = None):
+        super().__init__(parent, height=200)
+        self.model = model
+        self.validator = validator
+        self.completer = completer
+        self.first = 0
+        self._rows: list = []
+        self._visible = 1
+        self._row_height = 0
+
+        # mousewheel dispatch walks masters looking for this
+        self._scroll_owner = self
+
+        self.body = ttk.Frame(self)
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        self.vsb.grid_remove()
 
-    def on_filler_toggle(self):
-        if self.filler_var.get():
-            current = self.reward_var.get().strip()
-            if current and current != self.filler_token:
-                self._saved_reward = current
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        # size comes from the layout, never from how many rows happen to be materialized
+        self.grid_propagate(False)
 
-            current_type = self.reward_type_var.get().strip().lower()
-            if current_type:
-                self._saved_reward_type = current_type
+        tbl = self.body
+        ttk.Label(tbl, text="#").grid(row=0, column=0, sticky="w", padx=(0, 8))
+        ttk.Label(tbl, text="Label").grid(row=0, column=1, sticky="w", padx=(0, 8))
+        ttk.Label(tbl, text="Task").grid(row=0, column=2, sticky="w", padx=(0, 8))
+        ttk.Label(tbl, text="Reward / Challenge").grid(row=0, column=3, sticky="w", padx=(0, 8))
+        ttk.Label(tbl, text="Task prereqs").grid(row=0, column=4, sticky="w", padx=(0, 8))
+        ttk.Label(tbl, text="Reward prereqs").grid(row=0, column=5, sticky="w", padx=(0, 8))
+        ttk.Label(tbl, text="Type").grid(row=0, column=6, sticky="w", padx=(0, 8))
 
-            self.reward_var.set(self.filler_token)
-            self.reward_entry.state(["disabled"])
+        tbl.grid_columnconfigure(0, weight=0)  # #
+        tbl.grid_columnconfigure(1, weight=1)  # Label
+        tbl.grid_columnconfigure(2, weight=3)  # Task
+        tbl.grid_columnconfigure(3, weight=3)  # Reward
+        tbl.grid_columnconfigure(4, weight=2)  # Task prereqs
+        tbl.grid_columnconfigure(5, weight=2)  # Reward prereqs
+        tbl.grid_columnconfigure(6, weight=1)  # Type
+        for col in (7, 8, 9, 10):  # Filler, up, down, remove
+            tbl.grid_columnconfigure(col, weight=0)
+
+        self._ensure_pool(1)
+        self.bind("<Configure>", self._on_configure)
+        model.add_listener(self._on_model_change)
+        if validator is not None:
+            validator.add_listener(self._on_validation_change)
+
+    # ---------- pool management ----------
+    def _ensure_pool(self, count: int):
+        while len(self._rows) < count:
+            self._rows.append(_GridRow(self, len(self._rows)))
+
+    def _on_configure(self, event):
+        if not self._row_height:
+            self._row_height = max(1, self._rows[0].task_entry.winfo_reqheight() + 8)
+        header_h = 28
+        visible = max(1, (event.height - header_h) // self._row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._ensure_pool(visible)
+            self.refresh()
+
+    # ---------- scrolling ----------
+    def _clamp_first(self):
+        self.first = max(0, min(self.first, len(self.model) - self._visible))
+
+    def yview_scroll(self, amount: int, what: str = "units"):
+        step = self._visible if what == "pages" else 1
+        self.first += int(amount) * step
+        self.refresh()
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.model))
+            self.refresh()
+        elif args[0] == "scroll":
+            self.yview_scroll(int(args[1]), args[2])
+
+    def see(self, index: int):
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self._visible:
+            self.first = index - self._visible + 1
+        self.refresh()
+
+    # ---------- model plumbing ----------
+    def _on_model_change(self, kind: str, index: int):
+        if kind == "update":
+            return  # rows already show what the user typed
+        if kind == "insert" and index == len(self.model) - 1 and index >= self.first + self._visible:
+            # appended off screen; anywhere else may have renumbered prereqs we're showing
+            self._update_scrollbar()
+            return
+        self.refresh()
+
+    def _on_validation_change(self, rows):
+        # only the rows on screen have anything to redraw
+        for row in self._rows:
+            if row.index is not None and (rows is None or row.index in rows):
+                row.show_errors(self.validator.row_errors(row.index))
+
+    def refresh(self):
+        self._clamp_first()
+        n = len(self.model)
+        for k, row in enumerate(self._rows):
+            idx = self.first + k
+            if k < self._visible and idx < n:
+                row.bind(idx, self.model[idx])
+            else:
+                row.hide()
+        self._update_scrollbar()
 
-            self.reward_type_var.set("junk")
-            self.reward_type_cb.state(["disabled"])
-        else:
-            self.reward_entry.state(["!disabled"])
-            self.reward_var.set(self._saved_reward)
+    def _update_scrollbar(self):
+        n = len(self.model)
+        if n <= self._visible:
+            self.vsb.set(0.0, 1.0)
+            self.vsb.grid_remove()
+            return
+        self.vsb.set(self.first / n, min(1.0, (self.first + self._visible) / n))
+        self.vsb.grid()
 
-            self.reward_type_cb.state(["!disabled"])
-            self.reward_type_var.set(self._saved_reward_type or "useful")
+    def remove_record(self, index):
+        if index is not None:
+            self.model.remove(index)
 
-    def get_data(self):
-        return (
-            self.task_var.get().strip(),
-            self.reward_var.get().strip(),
-            self.prereq_var.get().strip(),
-            self.reward_prereq_var.get().strip(),
-            self.filler_var.get(),
-            self.reward_type_var.get().strip().lower() or "useful",
+    def move_record(self, index, delta: int):
+        if index is None:
+            return
+        self.model.move(index, index + delta)
+        self.see(max(0, min(index + delta, len(self.model) - 1)))
+
+
+class PrereqCompleter:
+    """
+    Suggestions under a prereq field. The word being typed is looked up in a prefix index over
+    task labels and titles; picking one puts in the task's label, or its row number if it has none.
+    """
+
+    MAX_SHOWN = 8
+
+    def __init__(self, root, model: TaskTable, colors: dict):
+        self.model = model
+        self.index = TaskSearchIndex()  # record uid -> label + task words
+        self._dirty = True
+        self._target = None  # (entry, var, row_fn) the popup is showing for
+        self._uids: list = []
+
+        self.popup = tk.Toplevel(root)
+        self.popup.withdraw()
+        self.popup.overrideredirect(True)
+        self.listbox = tk.Listbox(
+            self.popup, height=self.MAX_SHOWN, activestyle="none", exportselection=False,
+            bg=colors.get("panel", "#252526"), fg=colors.get("fg", "#e6e6e6"),
+            selectbackground="#3a3d41", highlightthickness=1,
+            highlightbackground=colors.get("border", "#3a3a3a"), borderwidth=0,
         )
+        self.listbox.pack(fill="both", expand=True)
+        self.listbox.bind("<ButtonPress-1>", self._on_click)
+        model.add_listener(self._on_model_change)
+
+    def _on_model_change(self, kind: str, index: int):
+        if kind != "update":
+            self._dirty = True
+        elif not self._dirty and 0 <= index < len(self.model):
+            rec = self.model[index]
+            self.index.set(rec.uid, rec.label, rec.task)
+
+    def _ensure_index(self):
+        if self._dirty:
+            self.index.clear()
+            for rec in self.model:
+                self.index.set(rec.uid, rec.label, rec.task)
+            self._dirty = False
+
+    def attach(self, entry: ttk.Entry, var: tk.StringVar, row_fn):
+        target = (entry, var, row_fn)
+        entry.bind("<KeyRelease>", lambda e: self._on_key(e, target), add="+")
+        entry.bind("<Down>", lambda _e: self._step(target, 1))
+        entry.bind("<Up>", lambda _e: self._step(target, -1))
+        entry.bind("<Return>", lambda _e: self._accept(target))
+        entry.bind("<Tab>", lambda _e: self._accept(target))
+        entry.bind("<Escape>", lambda _e: self.hide())
+        entry.bind("<FocusOut>", lambda _e: self.hide(), add="+")
+
+    # ---------- lookup ----------
+    @staticmethod
+    def _word(entry: ttk.Entry, var: tk.StringVar):
+        """(start, end, text) of the ref under the cursor."""
+        text = var.get()
+        end = entry.index("insert")
+        start = text.rfind(",", 0, end) + 1
+        while start < end and text[start] == " ":
+            start += 1
+        return start, end, text[start:end]
+
+    def _on_key(self, event, target):
+        if event.keysym in ("Up", "Down", "Return", "Tab", "Escape"):
+            return
+        entry, var, row_fn = target
+        _start, _end, word = self._word(entry, var)
+        if not word.strip() or ref_number(word) is not None:
+            self.hide()
+            return
+
+        self._ensure_index()
+        hits = self.index.search(word) or set()
+        row = row_fn()
+        key = label_key(word)
+        rows = [(self.model.row_of(uid), uid) for uid in hits]
+        rows = [(r, uid) for r, uid in rows if r is not None and r != row]
+        # label matches first, then in table order
+        rows.sort(key=lambda ru: (not label_key(self.model[ru[0]].label).startswith(key), ru[0]))
+        rows = rows[:self.MAX_SHOWN]
+        if not rows:
+            self.hide()
+            return
+
+        self._uids = [uid for _r, uid in rows]
+        self.listbox.delete(0, "end")
+        for r, _uid in rows:
+            rec = self.model[r]
+            ref = rec.label.strip() or str(r + 1)
+            self.listbox.insert("end", f"{ref}  —  {rec.task.strip()}")
+        self.listbox.configure(height=len(rows), width=max(30, entry.winfo_width() // 7))
+        self.listbox.selection_clear(0, "end")
+        self.listbox.selection_set(0)
+
+        self._target = target
+        self.popup.geometry(f"+{entry.winfo_rootx()}+{entry.winfo_rooty() + entry.winfo_height()}")
+        self.popup.deiconify()
+        self.popup.lift()
+
+    def hide(self):
+        self._target = None
+        self.popup.withdraw()
+
+    # ---------- picking ----------
+    def _step(self, target, delta: int):
+        if self._target is not target:
+            return None
+        sel = self.listbox.curselection()
+        i = max(0, min((sel[0] if sel else 0) + delta, self.listbox.size() - 1))
+        self.listbox.selection_clear(0, "end")
+        self.listbox.selection_set(i)
+        return "break"
+
+    def _on_click(self, event):
+        if self._target is None:
+            return "break"
+        self.listbox.selection_clear(0, "end")
+        self.listbox.selection_set(self.listbox.nearest(event.y))
+        return self._accept(self._target)
+
+    def _accept(self, target):
+        if self._target is not target:
+            return None
+        sel = self.listbox.curselection()
+        row = self.model.row_of(self._uids[sel[0]]) if sel else None
+        self.hide()
+        if row is None:
+            return "break"
+
+        entry, var, _row_fn = target
+        rec = self.model[row]
+        ref = rec.label.strip() or str(row + 1)
+        start, end, _word = self._word(entry, var)
+        text = var.get()
+        var.set(text[:start] + ref + text[end:])
+        entry.icursor(start + len(ref))
+        entry.focus_set()
+        return "break"
 
 
 class DeathLinkRow:
@@ -286,319 +842,14 @@ class DeathLinkRow:
 
 
 
-# ----------------------------
-# Networking
-# ----------------------------
-class TaskipelagoContext(CommonClient.CommonContext):
-    game = "Taskipelago"
-    items_handling = 0b111
-
-    def __init__(self, server_address=None, password=None):
-        super().__init__(server_address, password)
-        self.slot_data = {}
-
-        self.tasks = []
-        self.rewards = []
-        self.task_prereqs = []
-        self.reward_prereqs = []
-        self.lock_prereqs = False
-
-        self.base_reward_location_id = None
-        self.base_complete_location_id = None
-        self.base_item_id = None
-
-        self.death_link_pool = []
-        self.death_link_enabled = False
-
-        self.checked_locations_set = set()
-
-        self.on_disconnected = None
-        self.on_state_changed = None
-
-        self.on_deathlink = None
-        self._deathlink_tag_enabled = False
-        self.death_link_weights = []
-        self.death_link_amnesty = 0
-        self._deathlink_amnesty_left = 0
-
-        self.on_item_received = None
-        self._last_item_index = 0
-
-        # persist received notification state
-        self._notify_state_path = Path.cwd() / "taskipelago_notify_state.json"
-        self._notify_key = None
-        self._loaded_notify_index = False
-        self._pending_notify_index = None  # type: int | None
-
-    def apply_slot_data(self, slot_data: dict):
-        self.slot_data = slot_data or {}
-        self.tasks = list(self.slot_data.get("tasks", []))
-        self.rewards = list(self.slot_data.get("rewards", []))
-        self.task_prereqs = list(self.slot_data.get("task_prereqs", []))
-        self.reward_prereqs = list(self.slot_data.get("reward_prereqs", []))
-        self.lock_prereqs = bool(self.slot_data.get("lock_prereqs", False))
-
-        self.base_reward_location_id = self.slot_data.get("base_reward_location_id")
-        self.base_complete_location_id = self.slot_data.get("base_complete_location_id")
-        self.base_item_id = self.slot_data.get("base_item_id")
-
-        self.death_link_pool = list(self.slot_data.get("death_link_pool", []))
-        self.death_link_weights = list(self.slot_data.get("death_link_weights", []))
-        self.death_link_amnesty = int(self.slot_data.get("death_link_amnesty", 0) or 0)
-        self.death_link_enabled = bool(self.slot_data.get("death_link_enabled", False))
-
-        if callable(self.on_state_changed):
-            self.on_state_changed()
-
-    def on_package(self, cmd: str, args: dict):
-        super().on_package(cmd, args)
-
-        if "checked_locations" in args and isinstance(args["checked_locations"], (list, set, tuple)):
-            self.checked_locations_set.update(args["checked_locations"])
-
-        base_checked = getattr(self, "locations_checked", None)
-        if isinstance(base_checked, set):
-            self.checked_locations_set.update(base_checked)
-
-        if cmd == "Connected":
-            # Apply slot data on connection
-            self.apply_slot_data(args.get("slot_data", {}))
-            if self.slot_data.get("death_link_enabled"):
-                asyncio.create_task(self.enable_deathlink_tag())
-
-            # Load persisted "already notified" index for this server+slot.
-            # Apply it when we see the first ReceivedItems after connect.
-            self._loaded_notify_index = False
-            self._pending_notify_index = self.load_last_notified_index()
-
-            async def _double_sync():
-                await self.send_msgs([{"cmd": "Sync"}])
-                await asyncio.sleep(0.25)
-                await self.send_msgs([{"cmd": "Sync"}])
-
-            asyncio.create_task(_double_sync())
-
-        if cmd in ("Connected", "RoomUpdate", "Sync", "ReceivedItems"):
-            if callable(self.on_state_changed):
-                self.on_state_changed()
-
-        if cmd == "Bounced":
-            tags = args.get("tags") or []
-            if "DeathLink" in tags:
-                data = args.get("data") or {}
-                if callable(self.on_deathlink):
-                    self.on_deathlink(data)
-
-        if cmd == "ReceivedItems":
-            # Archipelago sends deltas as: {"index": <start>, "items": [ ... ]}
-            try:
-                packet_index = int(args.get("index", 0) or 0)
-            except Exception:
-                packet_index = 0
-
-            packet_items = list(args.get("items") or [])
-            packet_end = packet_index + len(packet_items)
-
-            # First ReceivedItems after connect: establish baseline using absolute server index.
-            if not self._loaded_notify_index:
-                self._loaded_notify_index = True
-
-                if isinstance(self._pending_notify_index, int):
-                    # Resume from previously-notified absolute index
-                    self._last_item_index = max(0, int(self._pending_notify_index))
-                else:
-                    # First time on this machine: skip ALL history by setting baseline to end of this packet.
-                    self._last_item_index = packet_end
-
-                # Persist immediately so reconnect/crash doesn't replay history
-                self.save_last_notified_index(self._last_item_index)
-
-            # Detect server restart
-            if packet_end < self._last_item_index:
-                # reset local cursor to the start of this packet so we process it
-                self._last_item_index = packet_index
-                self.save_last_notified_index(self._last_item_index, force=True)
-
-            # If this packet ends at/before what we've already shown, nothing new
-            if packet_end <= self._last_item_index:
-                return
-
-            # Compute overlap: how many items in this packet have we already notified?
-            # If _last_item_index is inside this packet range, skip up to that point.
-            already_notified_in_packet = max(0, self._last_item_index - packet_index)
-
-            new_items = packet_items[already_notified_in_packet:]
-
-            # Advance last notified absolute index to end of packet
-            self._last_item_index = packet_end
-            self.save_last_notified_index(self._last_item_index)
-
-            if callable(self.on_item_received) and new_items:
-                self.on_item_received(new_items)
-
-
-    async def enable_deathlink_tag(self):
-        # If we aren't connected to a server endpoint yet, bail.
-        if not getattr(self, "server", None):
-            return
-
-        # Always try at least once per connection; guard only prevents spamming.
-        if self._deathlink_tag_enabled:
-            return
-
-        self._deathlink_tag_enabled = True
-        await self.send_msgs([{"cmd": "ConnectUpdate", "tags": ["DeathLink"]}])
-
-    def _make_notify_key(self) -> str:
-        # Slot name is stored in ctx.auth by your connect flow
-        server = (self.server_address or "").strip().lower()
-        slot = (getattr(self, "auth", None) or "").strip()
-        return f"v2::{server}::{slot}"
-
-    def _load_notify_state(self) -> dict:
-        try:
-            if self._notify_state_path.exists():
-                return json.loads(self._notify_state_path.read_text(encoding="utf-8") or "{}")
-        except Exception:
-            pass
-        return {}
-
-    def _save_notify_state(self, data: dict) -> None:
-        try:
-            self._notify_state_path.parent.mkdir(parents=True, exist_ok=True)
-            self._notify_state_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
-        except Exception:
-            # Don't crash the client for a persistence failure
-            pass
-
-    def load_last_notified_index(self) -> int | None:
-        self._notify_key = self._make_notify_key()
-        if not self._notify_key.strip(":"):
-            return None
-        data = self._load_notify_state()
-        val = data.get(self._notify_key)
-        if isinstance(val, int) and val >= 0:
-            return val
-        return None
-
-    def save_last_notified_index(self, idx: int, *, force: bool = False) -> None:
-        if idx is None:
-            return
-        if self._notify_key is None:
-            self._notify_key = self._make_notify_key()
-        if not self._notify_key.strip(":"):
-            return
-
-        data = self._load_notify_state()
-        prev = data.get(self._notify_key)
-
-        # Only move forward unless forced (used for server reset)
-        if not force and isinstance(prev, int) and prev > idx:
-            return
-
-        data[self._notify_key] = int(idx)
-        self._save_notify_state(data)
-
-    async def disconnect(self):
-        # Snapshot current endpoint so it can't be nulled out under us
-        endpoint = getattr(self, "server", None)
-        if not endpoint:
-            return
-
-        # Best-effort tell server we're disconnecting
-        try:
-            await self.send_msgs([{"cmd": "Disconnect"}])
-        except Exception:
-            pass
-
-        # Hard close the websocket so server_loop's "async for data in socket" exits
-        try:
-            sock = getattr(endpoint, "socket", None)
-            if sock is not None:
-                await sock.close()
-        except Exception:
-            pass
-
-        # Now clear local endpoint
-        self.server = None
-        self._deathlink_tag_enabled = False
-
-
-
-
-async def server_loop(ctx: TaskipelagoContext, address: str):
-    import websockets
-    import ssl
-    import traceback
-
-    raw = (address or "").strip()
-
-    # If user didn't provide scheme, try sensible defaults:
-    candidates = []
-    if "://" in raw:
-        candidates.append(raw)
-    else:
-        host = raw
-        # archipelago.gg is typically behind TLS; try wss first
-        if "archipelago.gg" in host.lower():
-            candidates.append(f"wss://{host}")
-        candidates.append(f"ws://{host}")
-
-    last_err = None
-
-    for url in candidates:
-        try:
-            ssl_ctx = ssl.create_default_context() if url.startswith("wss://") else None
-
-            socket = await websockets.connect(
-                url,
-                ssl=ssl_ctx,
-                ping_timeout=None,
-                ping_interval=None,
-                close_timeout=2,
-            )
-
-            ctx.server = Endpoint(socket)
-
-            # ensure every connection will send deathlink tag over
-            ctx._deathlink_tag_enabled = False
-
-            await ctx.send_connect()
-
-            async for data in socket:
-                for msg in decode(data):
-                    await CommonClient.process_server_cmd(ctx, msg)
-
-            # If the server loop exits cleanly, break
-            return
-
-        except Exception as e:
-            last_err = e
-            print(f"[Taskipelago] Connection failed for {url}: {e!r}")
-            traceback.print_exc()
-
-    # If we tried all candidates and failed, stash a human-readable reason for UI
-    try:
-        ctx._last_disconnect_reason = f"{type(last_err).__name__}: {last_err}" if last_err else "Unknown error"
-    except Exception:
-        pass
-    finally:
-        if hasattr(ctx, "on_disconnected") and callable(ctx.on_disconnected):
-            ctx.on_disconnected()
-
-@dataclass
-class Notification:
-    kind: str # "reward" | "deathlink" | "sent"
-    title: str
-    body: str
-    created_at: float # time.time()
-
 # ----------------------------
 # Main app
 # ----------------------------
 class TaskipelagoApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, startup: StartupTimer = None):
+        self._startup = startup or StartupTimer()
         super().__init__()
+        self._startup.mark("tk")
 
         self.title("Taskipelago")
         self.geometry("980x740")
@@ -606,38 +857,56 @@ class TaskipelagoApp(tk.Tk):
 
         self.colors = apply_dark_theme(self)
         ScrollableFrame.bind_mousewheel_to_root(self)
-
-        # Connection/UI state
-        self.connection_state = "disconnected"
-        self.sent_goal = False
-        self.pending_reward_locations = set()  # only track reward loc pending (UI completion)
-
-        # Dedupe popups
-        self._last_deathlink_key = None
-        self._last_deathlink_seen_at = 0.0
-        self._last_reward_key = None
-        self._last_reward_seen_at = 0.0
-        self._last_sent_key = None
-        self._last_sent_seen_at = 0.0
+        self._startup.mark("theme")
+
+        # connection, in-flight checks, goal and notification state; the UI just observes it
+        self.play = PlayModel(send=self._send_msgs, max_notifications=200,
+                              history_path=Path.cwd() / "taskipelago_notify_history.jsonl")
+        self.play.subscribe(self._on_play_event)
+
+        # what the play tab currently shows, so refreshes only redraw cards that changed
+        self._play_tasks_key = None
+        self._task_specs = []
+        self._task_status = []
+        self._search_index = TaskSearchIndex()
+        self._play_filter_job = None
+        self._graph_key = None  # the tasks tuple the prereq graph was laid out for
+        self._analysis = None  # PrereqAnalysis as of the last refresh
+        self._play_order = None  # task indices in "Best next" order
+        self._best_next = set()  # tasks wearing the badge
 
         # YAML generator state
-        self.task_rows = []
+        self.task_table = TaskTable()
+        # generate_early's checks, kept current as rows are edited
+        self.task_validator = GeneratorValidator(self.task_table)
+        self._validation_status_job = None
         self.deathlink_rows = []
+        self._file_job = None  # import/export running on the worker thread (see _run_file_job)
 
-        # Notifications state
-        self._notifications: list[Notification] = []
-        self._max_notifications = 200  # keep memory bounded
+        # Notifications state (the notifications themselves live in self.play)
+        self._expanded_notifications = set()  # ids of summary cards showing their details
+        self._pending_notification_cards = deque()  # (notification, evicted) waiting to be drawn
 
-        notebook = ttk.Notebook(self)
+        self.notebook = notebook = ttk.Notebook(self)
         notebook.pack(fill="both", expand=True)
 
         self.play_tab = ttk.Frame(notebook)
         notebook.add(self.play_tab, text="Connect and Play")
 
+        # built the first time they're selected (see _on_tab_changed)
+        self.graph_tab = ttk.Frame(notebook)
+        notebook.add(self.graph_tab, text="Prereq Graph")
+        self._graph_built = False
+
         self.editor_tab = ttk.Frame(notebook)
         notebook.add(self.editor_tab, text="YAML Generator")
+        self._editor_built = False
 
         notebook.select(self.play_tab)
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+        # network -> UI events, drained on the Tk thread by _pump_events
+        self.events = UIEventBus()
 
         # Async loop thread
         self.loop = asyncio.new_event_loop()
@@ -645,18 +914,60 @@ class TaskipelagoApp(tk.Tk):
         t.start()
 
         def _init_ctx():
-            self.ctx = TaskipelagoContext()
-            self.ctx.on_state_changed = self.on_network_update
-            self.ctx.on_disconnected = self.on_server_disconnected
-            self.ctx.on_deathlink = self.on_deathlink_received
-            self.ctx.on_item_received = self.on_items_received
+            # CommonClient (and everything it drags in) is imported here, on the loop
+            # thread, while Tk is busy putting the window up
+            from .context import TaskipelagoContext
+
+            ctx = TaskipelagoContext()
+            ctx.events = self.events
+            self.play.ctx = ctx
+            self.ctx = ctx
 
         self.loop.call_soon_threadsafe(_init_ctx)
 
+        # big redraws (play tab, notification bursts) run in frame-sized slices
+        self.scheduler = RenderScheduler(self)
+
         self.build_ui()
+        self._startup.mark("play tab")
+
+        self._diagnostics = None  # Toplevel while open
+        self._register_gauges()
+        self.bind("<F12>", lambda _e: self._toggle_diagnostics())
+        self.after_idle(self._on_first_idle)
+        self.after(EVENT_PUMP_MS, self._pump_events)
+
+    def _on_first_idle(self):
+        self.update_idletasks()
+        self._startup.mark("first paint")
+
+    def _check_startup(self):
+        # called from the pump until the context shows up
+        st = self._startup
+        if st.done or st.get("first paint") is None or not getattr(self, "ctx", None):
+            return
+        st.mark("context")
+        st.mark("interactive")
+        st.done = True
+        print(st.report())
+
+    def _on_tab_changed(self, _event=None):
+        selected = self.notebook.select()
+        if not self._editor_built and selected == str(self.editor_tab):
+            self._build_editor_tab()
+        if selected == str(self.graph_tab):
+            if not self._graph_built:
+                self._build_graph_tab()
+            self._refresh_graph()
 
     # ---------------- UI layout ----------------
     def build_ui(self):
+        self._build_play_tab()
+
+    def _build_editor_tab(self):
+        self._editor_built = True
+        t0 = time.perf_counter()
+
         # YAML tab layout
         self.editor_tab.grid_columnconfigure(0, weight=1)
         self.editor_tab.grid_rowconfigure(0, weight=0)
@@ -708,38 +1019,23 @@ class TaskipelagoApp(tk.Tk):
         tasks.grid_rowconfigure(1, weight=1)
         tasks.grid_rowconfigure(2, weight=0, minsize=44)
         
-        self.tasks_scroll = ScrollableFrame(tasks, colors=self.colors)
-        self.tasks_scroll.grid(row=1, column=0, sticky="nsew", padx=10, pady=0)
-
-        tbl = self.tasks_scroll.inner
-
-        for col, weight in [(1, 3), (2, 3), (3, 2), (4, 1)]:
-            tbl.grid_columnconfigure(col, weight=weight)
-
-        ttk.Label(tbl, text="#").grid(row=0, column=0, sticky="w", padx=(0, 8))
-        ttk.Label(tbl, text="Task").grid(row=0, column=1, sticky="w", padx=(0, 8))
-        ttk.Label(tbl, text="Reward / Challenge").grid(row=0, column=2, sticky="w", padx=(0, 8))
-        ttk.Label(tbl, text="Task prereqs").grid(row=0, column=3, sticky="w", padx=(0, 8))
-        ttk.Label(tbl, text="Reward prereqs").grid(row=0, column=4, sticky="w", padx=(0, 8))
-        ttk.Label(tbl, text="Type").grid(row=0, column=5, sticky="w", padx=(0, 8))
-
-        # filler + remove placeholders (no header text)
-        ttk.Label(tbl, text="").grid(row=0, column=6, sticky="w")
-        ttk.Label(tbl, text="").grid(row=0, column=7, sticky="w")
-
-        # Column stretch/weights (optional but recommended)
-        tbl.grid_columnconfigure(0, weight=0)  # #
-        tbl.grid_columnconfigure(1, weight=3)  # Task
-        tbl.grid_columnconfigure(2, weight=3)  # Reward
-        tbl.grid_columnconfigure(3, weight=2)  # Task prereqs
-        tbl.grid_columnconfigure(4, weight=2)  # Reward prereqs
-        tbl.grid_columnconfigure(5, weight=1)  # Type
-        tbl.grid_columnconfigure(6, weight=0)  # Filler
-        tbl.grid_columnconfigure(7, weight=0)  # Remove button
+        self.task_grid = VirtualTaskGrid(tasks, self.task_table, self.task_validator,
+                                         PrereqCompleter(self, self.task_table, self.colors))
+        self.task_grid.grid(row=1, column=0, sticky="nsew", padx=10, pady=0)
 
         btn_row = ttk.Frame(tasks)
         btn_row.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
         ttk.Button(btn_row, text="Add Task", command=self.add_task_row).pack(side="left")
+        ttk.Button(btn_row, text="Import Tasks...", command=self.import_task_list).pack(side="left", padx=(6, 0))
+        self.task_count_var = tk.StringVar(value="")
+        ttk.Label(btn_row, textvariable=self.task_count_var, style="Muted.TLabel").pack(side="right")
+        self.task_table.add_listener(lambda *_a: self._update_task_count())
+        self.validation_var = tk.StringVar(value="")
+        ttk.Label(btn_row, textvariable=self.validation_var, style="Error.TLabel").pack(side="left", padx=(12, 0))
+        self.task_validator.add_listener(lambda _rows: self._schedule_validation_status())
+        self.lock_prereqs_var.trace_add(
+            "write", lambda *_a: self.task_validator.set_lock_prereqs(bool(self.lock_prereqs_var.get()))
+        )
 
         dl = ttk.LabelFrame(self.editor_tab, text="DeathLink Task Pool")
         dl.grid(row=2, column=0, sticky="nsew")
@@ -767,16 +1063,41 @@ class TaskipelagoApp(tk.Tk):
         ttk.Button(bottom, text="Reset", command=self.reset_yaml_generator).grid(
             row=0, column=0, sticky="w", padx=(10, 0)
         )
+        # shown while a file is being read or written on the worker thread
+        self.file_progress_var = tk.StringVar(value="")
+        self.file_progress_label = ttk.Label(bottom, textvariable=self.file_progress_var, style="Muted.TLabel")
+        self.file_progress_label.grid(row=0, column=1, sticky="e", padx=(0, 6))
+        self.file_progress = ttk.Progressbar(bottom, mode="indeterminate", length=160)
+        self._file_progress_running = False  # indeterminate animation started
+        self.file_progress.grid(row=0, column=2, sticky="e", padx=(0, 10))
+        self.file_progress_label.grid_remove()
+        self.file_progress.grid_remove()
         ttk.Button(bottom, text="Import YAML", command=self.import_yaml).grid(
-            row=0, column=1, sticky="e", padx=(0, 6)
+            row=0, column=3, sticky="e", padx=(0, 6)
         )
         ttk.Button(bottom, text="Export YAML", command=self.export_yaml).grid(
-            row=0, column=2, sticky="e", padx=(0, 10)
+            row=0, column=4, sticky="e", padx=(0, 10)
         )
 
         self.add_task_row()
+        # built on first visit, usually well after the startup report; shows up in diagnostics
+        METRICS.observe("build.editor_tab", time.perf_counter() - t0)
+
+    def _build_graph_tab(self):
+        self._graph_built = True
+        graph_root = ttk.Frame(self.graph_tab)
+        graph_root.pack(fill="both", expand=True, padx=10, pady=10)
+
+        ttk.Label(
+            graph_root,
+            text="Solid arrows: task prereqs.  Dashed: reward prereqs.  Click a task to jump to its card.",
+            style="Muted.TLabel",
+        ).pack(anchor="w", pady=(0, 6))
+
+        self.graph_view = PrereqGraphView(graph_root, self.colors, on_select=self._on_graph_select)
+        self.graph_view.pack(fill="both", expand=True)
 
-        # Play tab
+    def _build_play_tab(self):
         play_root = ttk.Frame(self.play_tab)
         play_root.pack(fill="both", expand=True, padx=10, pady=10)
 
@@ -810,6 +1131,7 @@ class TaskipelagoApp(tk.Tk):
 
         self.connect_button = ttk.Button(btns, text="Connect", command=self.on_connect_toggle)
         self.connect_button.pack(side="left")
+        ttk.Button(btns, text="Diagnostics", command=self._toggle_diagnostics).pack(side="left", padx=(6, 0))
 
         self.connect_status = tk.StringVar(value="Not connected.")
         # ttk.Label(play_root, textvariable=self.connect_status).pack(anchor="w")
@@ -818,8 +1140,44 @@ class TaskipelagoApp(tk.Tk):
         tasks_frame = ttk.LabelFrame(play_root, text="Tasks")
         tasks_frame.grid(row=2, column=0, sticky="nsew", padx=(0, 10), pady=(10, 0))
 
-        self.play_tasks_scroll = ScrollableFrame(tasks_frame, colors=self.colors)
-        self.play_tasks_scroll.pack(fill="both", expand=True, padx=10, pady=10)
+        # ---- Search / state filter ----
+        search_row = ttk.Frame(tasks_frame)
+        search_row.pack(fill="x", padx=10, pady=(8, 0))
+
+        ttk.Label(search_row, text="Search:").pack(side="left")
+        self.play_search_var = tk.StringVar()
+        ttk.Entry(search_row, textvariable=self.play_search_var, width=30).pack(side="left", padx=(6, 10))
+
+        ttk.Label(search_row, text="Show:").pack(side="left")
+        self.play_state_var = tk.StringVar(value="All")
+        ttk.Combobox(
+            search_row,
+            textvariable=self.play_state_var,
+            values=list(STATE_FILTERS.keys()),
+            state="readonly",
+            width=14,
+        ).pack(side="left", padx=(6, 10))
+
+        ttk.Label(search_row, text="Sort:").pack(side="left")
+        self.play_sort_var = tk.StringVar(value=SORT_MODES[0])
+        ttk.Combobox(
+            search_row,
+            textvariable=self.play_sort_var,
+            values=list(SORT_MODES),
+            state="readonly",
+            width=11,
+        ).pack(side="left", padx=(6, 10))
+
+        self.play_showing_var = tk.StringVar(value="")
+        ttk.Label(search_row, textvariable=self.play_showing_var, style="Muted.TLabel").pack(side="left")
+
+        # typing only moves/hides existing cards; it never re-runs refresh_play_tab
+        self.play_search_var.trace_add("write", lambda *_a: self._schedule_play_filter())
+        self.play_state_var.trace_add("write", lambda *_a: self._schedule_play_filter())
+        self.play_sort_var.trace_add("write", lambda *_a: self._apply_play_sort())
+
+        self.play_cards = self._make_card_list(tasks_frame, self._on_task_card_action)
+        self.play_cards.pack(fill="both", expand=True, padx=10, pady=10)
 
         # ---- Notifications panel ----
         notif_frame = ttk.LabelFrame(play_root, text="Notifications")
@@ -830,35 +1188,42 @@ class TaskipelagoApp(tk.Tk):
         notif_btns = ttk.Frame(notif_frame)
         notif_btns.grid(row=0, column=0, sticky="ew", padx=10, pady=(0, 0))
         ttk.Button(notif_btns, text="Clear", command=self._clear_notifications).pack(side="left")
+        ttk.Button(notif_btns, text="History", command=self._open_notification_history).pack(side="left", padx=(6, 0))
 
-        self.notif_scroll = ScrollableFrame(notif_frame, colors=self.colors)
-        self.notif_scroll.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+        self.notif_cards = self._make_card_list(notif_frame, self._on_notification_card_action)
+        self.notif_cards.grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+
+    def _make_card_list(self, parent, on_action):
+        if CARD_RENDERER == "widgets":
+            return WidgetCardList(parent, self.colors, on_action=on_action)
+        if not hasattr(self, "_text_measurer"):
+            self._text_measurer = TextMeasurer(self)
+        return CanvasCardList(parent, self.colors, self._text_measurer, on_action=on_action)
 
 
     # ---------------- YAML generator actions ----------------
     def add_task_row(self):
-        # rows start at 1 because header is row 0
-        row = TaskRow(self.tasks_scroll.inner, len(self.task_rows) + 1, FILLER_TOKEN, self._remove_task_row)
-        self.task_rows.append(row)
-        return row
-
-    def _remove_task_row(self, row):
-        if row in self.task_rows:
-            self.task_rows.remove(row)
+        idx = self.task_table.append()
+        self.task_grid.see(idx)
+        return self.task_table[idx]
+
+    def _schedule_validation_status(self):
+        # a paste can touch many rows; summarize once when things settle
+        if self._validation_status_job is None:
+            self._validation_status_job = self.after_idle(self._update_validation_status)
+
+    def _update_validation_status(self):
+        self._validation_status_job = None
+        problems = self.task_validator.problems()
+        if not problems:
+            self.validation_var.set("")
+            return
+        more = f" (+{len(problems) - 1} more)" if len(problems) > 1 else ""
+        self.validation_var.set(f"{problems[0]}{more}")
 
-        for i, r in enumerate(self.task_rows, start=1):
-            r.index = i
-            r.num_label.config(text=str(i))
-            r._grid()  # re-place widgets on the correct grid row
-    
-    def _clear_task_rows(self):
-        # Destroy existing widgets for all task rows and forget them
-        for r in list(self.task_rows):
-            try:
-                r.remove()  # calls destroy + _on_remove
-            except Exception:
-                pass
-        self.task_rows = []
+    def _update_task_count(self):
+        n = len(self.task_table)
+        self.task_count_var.set(f"{n} task{'s' if n != 1 else ''}")
 
     def add_deathlink_row(self):
         # rows start at 1 because header is row 0
@@ -881,45 +1246,19 @@ class TaskipelagoApp(tk.Tk):
                 pass
         self.deathlink_rows = []
 
-    def _extract_taskipelago_block(self, doc: dict):
-        """
-        Supports:
-          A) Your generator format (root has 'name' + 'Taskipelago')
-          B) Common AP format-ish (root has a player name key; inside has 'Taskipelago')
-        Returns: (player_name: str|None, block: dict|None)
-        """
-        if not isinstance(doc, dict):
-            return None, None
-
-        # A) direct
-        if isinstance(doc.get("Taskipelago"), dict):
-            player_name = doc.get("name")
-            if isinstance(player_name, str):
-                player_name = player_name.strip()
-            else:
-                player_name = None
-            return player_name, doc["Taskipelago"]
-
-        # B) nested: find any mapping that contains a Taskipelago dict
-        # e.g. { "Barret": { "Taskipelago": {...}} }
-        for k, v in doc.items():
-            if isinstance(v, dict) and isinstance(v.get("Taskipelago"), dict):
-                player_name = k if isinstance(k, str) else None
-                return player_name, v["Taskipelago"]
-
-        return None, None
-
     def export_yaml(self):
+        if self._file_job is not None:
+            return
+
         player_name = self.player_name_var.get().strip()
         if not player_name:
             messagebox.showerror("Error", "Player name is required.")
             return
 
         tasks, rewards, prereqs, reward_prereqs, reward_types = [], [], [], [], []
-        for r in self.task_rows:
-            t, rw, pr, rpr, filler, rtype = r.get_data()
-            if not t:
-                continue
+        # labels and row numbers become positions in the exported lists
+        for r, pr, rpr in self.task_table.export_rows():
+            t, rw, _pr, _rpr, filler, rtype = r.get_data()
             if not rw:
                 messagebox.showerror("Error", "Each task must have a reward or be marked Filler.")
                 return
@@ -934,6 +1273,15 @@ class TaskipelagoApp(tk.Tk):
             messagebox.showerror("Error", "No tasks defined.")
             return
 
+        # the rest of generate_early's checks; better here than when the host generates
+        problems = self.task_validator.problems()
+        if problems:
+            shown = "\n".join(f"- {p}" for p in problems[:EXPORT_PROBLEMS_SHOWN])
+            if len(problems) > EXPORT_PROBLEMS_SHOWN:
+                shown += f"\n...and {len(problems) - EXPORT_PROBLEMS_SHOWN} more"
+            messagebox.showerror("Error", f"This YAML would fail generation:\n{shown}")
+            return
+
         deathlink_pool = []
         deathlink_weights = []
         for r in self.deathlink_rows:
@@ -983,37 +1331,43 @@ class TaskipelagoApp(tk.Tk):
         if not path:
             return
 
-        with open(path, "w", encoding="utf-8") as f:
-            yaml.dump(data, f, sort_keys=False, allow_unicode=True)
+        def work(progress):
+            progress.phase = f"Writing {os.path.basename(path)}"
+            yaml_io.dump(data, path)
 
-        messagebox.showinfo("Success", f"YAML exported to:\n{path}")
+        def done(_result, error):
+            if error is not None:
+                messagebox.showerror("Error", f"Failed to write YAML:\n{error}")
+            else:
+                messagebox.showinfo("Success", f"YAML exported to:\n{path}")
+
+        self._run_file_job(work, done)
 
     def import_yaml(self):
+        if self._file_job is not None:
+            return
+
         path = filedialog.askopenfilename(filetypes=[("YAML Files", "*.yaml *.yml"), ("All Files", "*.*")])
         if not path:
             return
 
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                doc = yaml.safe_load(f)
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to read YAML:\n{e}")
-            return
+        # parsing and row building happen off the Tk thread; only the swap-in runs here
+        def done(imported, error):
+            if error is not None:
+                messagebox.showerror("Error", str(error))
+                return
+            self._apply_import(imported)
+            messagebox.showinfo("Imported", f"Imported YAML from:\n{path}")
 
-        player_name, block = self._extract_taskipelago_block(doc)
-        if not isinstance(block, dict):
-            messagebox.showerror(
-                "Error",
-                "Could not find a 'Taskipelago' section in this YAML.\n"
-                "Expected either:\n"
-                "  - root: { name: ..., Taskipelago: {...} }\n"
-                "  - or a player entry: { <player>: { Taskipelago: {...} } }"
-            )
-            return
+        self._run_file_job(lambda progress: yaml_io.read_generator_yaml(path, progress), done)
+
+    @profiled("import_yaml")
+    def _apply_import(self, imported: "yaml_io.ImportedYaml"):
+        block = imported.block
 
         # --------- Populate global settings ---------
-        if player_name:
-            self.player_name_var.set(player_name)
+        if imported.player_name:
+            self.player_name_var.set(imported.player_name)
 
         pb = block.get("progression_balancing", self.progression_var.get())
         try:
@@ -1047,79 +1401,99 @@ class TaskipelagoApp(tk.Tk):
         self.lock_prereqs_var.set(bool(block.get("lock_prereqs", self.lock_prereqs_var.get())))
 
         # --------- Populate Tasks table ---------
-        tasks = list(block.get("tasks", []) or [])
-        rewards = list(block.get("rewards", []) or [])
-        prereqs = list(block.get("task_prereqs", []) or [])
-        reward_prereqs = list(block.get("reward_prereqs", []) or [])
-        reward_types = list(block.get("reward_types", []) or [])
-
-        # Normalize lengths
-        n = max(len(tasks), len(rewards), len(prereqs))
-        tasks += [""] * (n - len(tasks))
-        rewards += [""] * (n - len(rewards))
-        prereqs += [""] * (n - len(prereqs))
-        reward_prereqs += [""] * (n - len(reward_prereqs))
-        reward_types += ["useful"] * (n - len(reward_types))
-
-        # Wipe existing UI rows then rebuild
-        self._clear_task_rows()
-
-        for i in range(n):
-            t = str(tasks[i]).strip() if tasks[i] is not None else ""
-            rw = str(rewards[i]).strip() if rewards[i] is not None else ""
-            pr = str(prereqs[i]).strip() if prereqs[i] is not None else ""
-            rpr = str(reward_prereqs[i]).strip() if reward_prereqs[i] is not None else ""
-            rt = str(reward_types[i]).strip().lower() if reward_types[i] is not None else "useful"
-
-            row = self.add_task_row()
-            row.task_var.set(t)
-            row.prereq_var.set(pr)
-            row.reward_prereq_var.set(rpr)
-
-            # Clamp reward type
-            if rt not in ("trap", "junk", "useful", "progression"):
-                rt = "useful"
-            row.reward_type_var.set(rt)
-            row._saved_reward_type = rt
-
-            # Handle filler token exactly the same way your existing import does
-            if rw == FILLER_TOKEN:
-                row.filler_var.set(True)
-                row.on_filler_toggle()
-            else:
-                row.filler_var.set(False)
-                row.on_filler_toggle()
-                row.reward_var.set(rw)
-                # Ensure at least 1 row exists for UX
-                if not self.task_rows:
-                    self.add_task_row()
+        # one model swap; the grid only re-binds the rows on screen
+        self.task_table.replace_all(imported.records or [TaskRecord()])  # at least 1 row for UX
 
         # --------- Populate DeathLink pool ---------
-        deathlink_pool = list(block.get("death_link_pool", []) or [])
-        deathlink_weights = list(block.get("death_link_weights", []) or [])
+        self._clear_deathlink_rows()
+        for text, weight in imported.deathlink_rows:
+            row = DeathLinkRow(self.dl_scroll.inner, len(self.deathlink_rows) + 1, self._remove_deathlink_row)
+            self.deathlink_rows.append(row)
+            row.text_var.set(text)
+            row.weight_var.set(weight)
 
-        # Normalize weights to pool length (default "1")
-        if len(deathlink_weights) < len(deathlink_pool):
-            deathlink_weights += ["1"] * (len(deathlink_pool) - len(deathlink_weights))
-        deathlink_weights = deathlink_weights[:len(deathlink_pool)]
+    def import_task_list(self):
+        if self._file_job is not None:
+            return
 
-        self._clear_deathlink_rows()
+        path = filedialog.askopenfilename(filetypes=ingest.FILE_TYPES)
+        if not path:
+            return
 
-        for i, txt in enumerate(deathlink_pool):
-            s = str(txt).strip() if txt is not None else ""
-            if not s:
-                continue
-            w = deathlink_weights[i]
-            wtxt = str(w).strip() if w is not None else "1"
-            if not wtxt:
-                wtxt = "1"
+        existing = sum(1 for rec in self.task_table if rec.task.strip())
+        append = False
+        if existing:
+            answer = messagebox.askyesnocancel(
+                "Import Tasks",
+                f"Add the imported tasks after the {existing} already here?\n"
+                "Yes appends, No replaces the current tasks."
+            )
+            if answer is None:
+                return
+            append = answer
 
-            row = DeathLinkRow(self.dl_scroll.inner, len(self.deathlink_rows) + 1, self._remove_deathlink_row)
-            self.deathlink_rows.append(row)
-            row.text_var.set(s)
-            row.weight_var.set(wtxt)
+        def done(records, error):
+            if error is not None:
+                messagebox.showerror("Error", str(error))
+                return
+            # prereq numbers in the file count from its own first task; shift them past the rows
+            # the table has now, since rows can be added or deleted while the file is read
+            offset = len(self.task_table) if append else 0
+            if append:
+                records = self.task_table.records + ingest.shift_records(records, offset)
+            self.task_table.replace_all(records)
+            self.task_grid.see(offset)
+            messagebox.showinfo("Imported", f"Imported {len(records) - offset} tasks from:\n{path}")
+
+        self._run_file_job(lambda progress: ingest.read_task_file(path, progress=progress), done)
+
+    # ---------------- File worker ----------------
+    def _run_file_job(self, work, on_done):
+        """
+        Run work(progress) on a worker thread with the progress bar up, then
+        on_done(result, error) back on the Tk thread. One job at a time.
+        """
+        progress = yaml_io.Progress()
+        job = {"progress": progress, "result": None, "error": None, "finished": False, "cancelled": False}
+        self._file_job = job
 
-        messagebox.showinfo("Imported", f"Imported YAML from:\n{path}")
+        def run():
+            try:
+                job["result"] = work(progress)
+            except Exception as e:
+                job["error"] = e
+            job["finished"] = True
+
+        self.file_progress.grid()
+        self.file_progress_label.grid()
+        threading.Thread(target=run, name="taskipelago-yaml", daemon=True).start()
+        self._poll_file_job(job, on_done)
+
+    def _poll_file_job(self, job: dict, on_done):
+        progress = job["progress"]
+        if progress.total:
+            if self._file_progress_running:
+                self.file_progress.stop()
+                self._file_progress_running = False
+            self.file_progress.configure(mode="determinate", maximum=progress.total, value=progress.done)
+        elif not self._file_progress_running:
+            self.file_progress.configure(mode="indeterminate")
+            self.file_progress.start(15)
+            self._file_progress_running = True
+        self.file_progress_var.set(progress.phase + "...")
+
+        if not job["finished"]:
+            self.after(FILE_JOB_POLL_MS, lambda: self._poll_file_job(job, on_done))
+            return
+
+        self.file_progress.stop()
+        self._file_progress_running = False
+        self.file_progress.grid_remove()
+        self.file_progress_label.grid_remove()
+        if self._file_job is job:
+            self._file_job = None
+        if not job["cancelled"]:
+            on_done(job["result"], job["error"])
 
     def reset_yaml_generator(self):
         # reset to defaults
@@ -1130,24 +1504,24 @@ class TaskipelagoApp(tk.Tk):
         self.deathlink_amnesty_var.set(0)
         self.lock_prereqs_var.set(False)
 
-        # clear rows and recreate initial blank task row
-        self._clear_task_rows()
+        # clear rows and recreate initial blank task row; a running import is dropped when it lands
+        if self._file_job is not None:
+            self._file_job["cancelled"] = True
+            self._file_job = None
+        self.task_table.replace_all([TaskRecord()])
         self._clear_deathlink_rows()
-        self.add_task_row()
 
     # ---------------- Connection actions ----------------
     def on_connect_toggle(self):
-        if self.connection_state == "disconnected":
+        if self.play.connection_state == "disconnected":
             self._start_connect()
         else:
             self._start_disconnect()
 
     def _start_connect(self):
-        if self.connection_state != "disconnected":
+        if self.play.connection_state != "disconnected":
             return
 
-        self.sent_goal = False
-
         server = self.server_var.get().strip()
         slot = self.slot_var.get().strip()
         password = self.pass_var.get().strip() or None
@@ -1159,7 +1533,7 @@ class TaskipelagoApp(tk.Tk):
         # store last connection to restore next load
         self._save_last_connection(server, slot)
 
-        self.connection_state = "connecting"
+        self.play.connecting()
         self.connect_status.set(f"Connecting to {server} as {slot}...")
         self.connect_button.config(text="Disconnect")
 
@@ -1167,24 +1541,25 @@ class TaskipelagoApp(tk.Tk):
             self.ctx.server_address = server
             self.ctx.auth = slot
             self.ctx.password = password
-            asyncio.create_task(server_loop(self.ctx, server))
+            from .context import server_loop, spawn
+
+            spawn(server_loop(self.ctx, server))
 
         self.loop.call_soon_threadsafe(_start)
 
     def _start_disconnect(self):
-        if self.connection_state == "disconnected":
+        if self.play.connection_state == "disconnected":
             return
 
-        self.connection_state = "disconnected"
+        self.play.disconnected()
         self.connect_status.set("Disconnected.")
         self.connect_button.config(text="Connect")
-        self.sent_goal = False
 
         if getattr(self, "ctx", None) and self.ctx.server:
             async def _do_disconnect():
                 await self.ctx.disconnect()
 
-            self.loop.call_soon_threadsafe(lambda: asyncio.create_task(_do_disconnect()))
+            self._run_coro(_do_disconnect())
 
         if getattr(self, "ctx", None):
             self.ctx._deathlink_tag_enabled = False
@@ -1192,7 +1567,6 @@ class TaskipelagoApp(tk.Tk):
         self.after(0, self._clear_play_state)
 
     def _clear_play_state(self):
-        self.pending_reward_locations = set()
         if getattr(self, "ctx", None):
             self.ctx.tasks = []
             self.ctx.rewards = []
@@ -1206,65 +1580,117 @@ class TaskipelagoApp(tk.Tk):
             self.ctx.checked_locations_set = set()
             self.ctx._loaded_notify_index = False
             self.ctx._pending_notify_index = None
-            self._deathlink_amnesty_left = 0
             if hasattr(self.ctx, "locations_checked"):
                 self.ctx.locations_checked = set()
         self.refresh_play_tab()
 
     # ---------------- Notifications stuff ----------------
     def _clear_notifications(self):
-        self._notifications.clear()
-        self._render_notifications()
-
-    def _enqueue_notification(self, n: Notification):
-        self._notifications.append(n)
-        if len(self._notifications) > self._max_notifications:
-            self._notifications = self._notifications[-self._max_notifications:]
-        self._render_notifications()
-
-    def _dismiss_notification(self, idx: int):
-        if 0 <= idx < len(self._notifications):
-            self._notifications.pop(idx)
-            self._render_notifications()
-
-    def _render_notifications(self):
-        if not hasattr(self, "notif_scroll"):
+        self.play.notifications.clear()
+        self._expanded_notifications.clear()
+        self._pending_notification_cards.clear()
+        self.scheduler.cancel("notifications")
+        self.notif_cards.clear()
+
+    def _queue_notification_card(self, n: Notification, evicted):
+        """Cards get drawn by the scheduler in slices."""
+        self._pending_notification_cards.append((n, evicted))
+        if hasattr(self, "notif_cards") and not self.scheduler.busy("notifications"):
+            self.scheduler.schedule("notifications", self._notification_cards_job())
+
+    @profiled("render_notifications")
+    def _notification_cards_job(self):
+        pending = self._pending_notification_cards
+        while pending:
+            n, evicted = pending.popleft()
+            if evicted is not None:
+                self._expanded_notifications.discard(evicted.id)
+                self.notif_cards.remove_card(evicted.id)
+            # might have been dismissed/evicted before we got to draw it
+            if self.play.notifications.get(n.id) is n:
+                self.notif_cards.prepend_card(self._notification_card_spec(n.id, n))
+            yield
+
+    def _dismiss_notification(self, notif_id: int):
+        self._expanded_notifications.discard(notif_id)
+        if self.play.notifications.dismiss(notif_id):
+            self.notif_cards.remove_card(notif_id)
+
+    def _open_notification_history(self, page_size: int = 50):
+        win = getattr(self, "_history_win", None)
+        if win is not None and win.winfo_exists():
+            win.lift()
             return
 
-        inner = self.notif_scroll.inner
-        for child in inner.winfo_children():
-            child.destroy()
-
-        panel = self.colors.get("panel", "#252526")
-        border = self.colors.get("border", "#3a3a3a")
-        fg = self.colors.get("fg", "#e6e6e6")
-        muted = self.colors.get("muted", "#bdbdbd")
-
-        for i, n in enumerate(reversed(self._notifications)):
-            # reversed so newest on top
-            real_idx = len(self._notifications) - 1 - i
-
-            card = tk.Frame(inner, bg=panel, highlightbackground=border, highlightthickness=1)
-            card.pack(fill="x", pady=6, padx=2)
-
-            top = tk.Frame(card, bg=panel)
-            top.pack(fill="x", padx=8, pady=(8, 2))
-
-            title = tk.Label(top, text=n.title, bg=panel, fg=fg, font=("Segoe UI", 11, "bold"),
-                             anchor="w", justify="left", wraplength=260)
-            title.pack(side="left", fill="x", expand=True)
-
-            ttk.Button(top, text="Dismiss", command=lambda ix=real_idx: self._dismiss_notification(ix)).pack(side="right")
+        win = tk.Toplevel(self)
+        win.title("Notification History")
+        win.geometry("460x620")
+        win.configure(bg=self.colors["bg"])
+        self._history_win = win
+
+        nav = ttk.Frame(win)
+        nav.pack(fill="x", padx=10, pady=(10, 0))
+        page_var = tk.StringVar()
+        cards = self._make_card_list(win, None)
+        cards.pack(fill="both", expand=True, padx=10, pady=10)
+
+        state = {"page": 0}
+
+        def show(page):
+            pages = self.play.history.page_count(page_size)
+            page = max(0, min(page, pages - 1))
+            state["page"] = page
+            cards.set_cards([
+                CardSpec(
+                    key=i,
+                    title=n.title,
+                    title_font=NOTIFY_TITLE_FONT,
+                    meta=f"{n.kind.upper()} • {datetime.fromtimestamp(n.created_at).strftime('%Y-%m-%d %H:%M:%S')}",
+                    body=n.body + ("\n\n" + "\n".join(n.details) if n.details else ""),
+                )
+                for i, n in enumerate(self.play.history.page(page, page_size))
+            ])
+            page_var.set(f"Page {page + 1} / {pages}  ({len(self.play.history)} total)")
+
+        ttk.Button(nav, text="◀ Newer", command=lambda: show(state["page"] - 1)).pack(side="left")
+        ttk.Button(nav, text="Older ▶", command=lambda: show(state["page"] + 1)).pack(side="left", padx=(6, 0))
+        ttk.Label(nav, textvariable=page_var, style="Muted.TLabel").pack(side="right")
+        show(0)
+
+    def _notification_card_spec(self, key, n: Notification) -> CardSpec:
+        ts = datetime.fromtimestamp(n.created_at).strftime("%H:%M:%S")
+        body = n.body
+        toggle = None
+        if n.details:
+            what = "deaths" if n.kind == "deathlink" else "items"
+            if key in self._expanded_notifications:
+                body += "\n\n" + "\n".join(n.details)
+                toggle = f"Hide {what} ▴"
+            else:
+                toggle = f"Show all {len(n.details)} {what} ▾"
+        return CardSpec(
+            key=key,
+            title=n.title,
+            title_font=NOTIFY_TITLE_FONT,
+            meta=f"{n.kind.upper()} • {ts}",
+            body=body,
+            button="Dismiss",
+            toggle=toggle,
+        )
 
-            ts = datetime.fromtimestamp(n.created_at).strftime("%H:%M:%S")
-            meta = tk.Label(card, text=f"{n.kind.upper()} • {ts}", bg=panel, fg=muted,
-                            font=("Segoe UI", 9), anchor="w")
-            meta.pack(fill="x", padx=8)
+    def _on_notification_card_action(self, key, button):
+        if button == "toggle":
+            n = self.play.notifications.get(key)
+            if n is None:
+                return
+            if key in self._expanded_notifications:
+                self._expanded_notifications.discard(key)
+            else:
+                self._expanded_notifications.add(key)
+            self.notif_cards.update_card(self._notification_card_spec(key, n))
+            return
+        self._dismiss_notification(key)
 
-            body = tk.Label(card, text=n.body, bg=panel, fg=fg, font=("Segoe UI", 10),
-                            anchor="w", justify="left", wraplength=300)
-            body.pack(fill="x", padx=8, pady=(4, 8))
-        
     def _last_connection_path(self) -> Path:
         # keep it alongside other per-user state
         return Path.cwd() / "taskipelago_last_connection.json"
@@ -1280,254 +1706,275 @@ class TaskipelagoApp(tk.Tk):
 
     def _save_last_connection(self, server: str, slot: str) -> None:
         try:
-            p = self._last_connection_path()
-            p.parent.mkdir(parents=True, exist_ok=True)
-            p.write_text(json.dumps({"server": server, "slot": slot}, indent=2), encoding="utf-8")
+            with METRICS.timer("persist.last_connection"):
+                p = self._last_connection_path()
+                p.parent.mkdir(parents=True, exist_ok=True)
+                p.write_text(json.dumps({"server": server, "slot": slot}, indent=2), encoding="utf-8")
         except Exception:
             # don't crash the client for a persistence failure
             pass
 
+    # ---------------- Diagnostics ----------------
+    def _register_gauges(self):
+        METRICS.gauge_fn("ui.widgets", lambda: count_widgets(self))
+        METRICS.gauge_fn("ui.play_canvas_items", lambda: len(self.play_cards.canvas.find_all()))
+        METRICS.gauge_fn("ui.notif_canvas_items", lambda: len(self.notif_cards.canvas.find_all()))
+        METRICS.gauge_fn("ui.notification_queue", lambda: len(self._pending_notification_cards))
+        METRICS.gauge_fn("ui.notifications", lambda: len(self.play.notifications))
+        METRICS.gauge_fn("ui.render_jobs", self.scheduler.pending)
+        METRICS.gauge_fn("net.event_backlog", lambda: len(self.events))
+        METRICS.gauge_fn("net.events_dropped", lambda: self.events.dropped)
+        METRICS.gauge_fn("net.events_coalesced", lambda: self.events.coalesced)
+        METRICS.gauge_fn("play.inflight", lambda: len(self.play.inflight))
+        METRICS.gauge_fn("play.tasks", lambda: len(self._task_specs))
+
+    def _toggle_diagnostics(self):
+        if self._diagnostics is not None:
+            self._diagnostics.destroy()
+            self._diagnostics = None
+            return
+
+        win = tk.Toplevel(self)
+        win.title("Taskipelago Diagnostics")
+        win.geometry("620x560")
+        win.configure(bg=self.colors.get("bg", "#1e1e1e"))
+        win.protocol("WM_DELETE_WINDOW", self._toggle_diagnostics)
+        win.bind("<F12>", lambda _e: self._toggle_diagnostics())
+        self._diagnostics = win
+
+        btns = ttk.Frame(win)
+        btns.pack(fill="x", padx=10, pady=(10, 0))
+        ttk.Button(btns, text="Export JSONL…", command=self._export_metrics).pack(side="left")
+        ttk.Button(btns, text="Reset", command=METRICS.reset).pack(side="left", padx=(6, 0))
+        if profiling.ENABLED:
+            ttk.Button(btns, text="Write Profiles", command=profiling.dump_profiles).pack(side="left", padx=(6, 0))
+
+        text = tk.Text(win, bg=self.colors.get("panel", "#252526"), fg=self.colors.get("fg", "#e6e6e6"),
+                       font=("Consolas", 9), relief="flat", wrap="none")
+        text.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def refresh():
+            if self._diagnostics is not win:
+                return
+            snap = METRICS.snapshot()
+            y = text.yview()[0]
+            text.configure(state="normal")
+            text.delete("1.0", "end")
+            text.insert("1.0", METRICS.format_text(snap))
+            text.configure(state="disabled")
+            text.yview_moveto(y)
+            win.after(DIAGNOSTICS_REFRESH_MS, refresh)
+
+        refresh()
+
+    def _export_metrics(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".jsonl", initialfile="taskipelago_metrics.jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("All Files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            # appends, so several exports of one session end up side by side
+            METRICS.export_jsonl(Path(path), {"connection": self.play.connection_state})
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to write metrics:\n{e}")
+
     # ---------------- Async loop plumbing ----------------
     def _run_async_loop(self):
         asyncio.set_event_loop(self.loop)
         self.loop.run_forever()
 
+    def _run_coro(self, coro):
+        # hand a coroutine to the network loop; safe to call from the Tk thread
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
     # ---------------- Network -> UI updates ----------------
-    def on_network_update(self):
-        if self.connection_state == "connecting":
-            self.connection_state = "connected"
+    def _pump_events(self):
+        t0 = time.perf_counter()
+        events = ()
+        try:
+            events = self.events.drain()
+            self.play.pump(events)
+            if not self._startup.done:
+                self._check_startup()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            if events:
+                METRICS.inc("ui.events", len(events))
+                METRICS.observe("pump.ui", time.perf_counter() - t0)
+            self.after(EVENT_PUMP_MS, self._pump_events)
+
+    def _on_play_event(self, kind: str, payload):
+        if kind == CONNECTED:
             self.connect_status.set("Connected.")
             self.connect_button.config(text="Disconnect")
-
-        if not getattr(self, "ctx", None):
-            return
-        
-        self._deathlink_amnesty_left = int(getattr(self.ctx, "death_link_amnesty", 0) or 0)
-
-        checked = getattr(self.ctx, "checked_locations_set", set()) or set()
-        self.pending_reward_locations.difference_update(checked)
-
-        self._maybe_send_goal_complete()
-        self.after(0, self.refresh_play_tab)
-
+        elif kind == STATE_CHANGED:
+            with METRICS.timer("refresh.network_update"):
+                self.refresh_play_tab()
+        elif kind in (TASK_CHANGED, FAILED):
+            self._update_task_card(payload)
+        elif kind == NOTIFICATION:
+            self._queue_notification_card(*payload)
+        elif kind == LOST_CONNECTION:
+            self.connect_status.set("Disconnected (server closed connection).")
+            self.connect_button.config(text="Connect")
+            self._clear_play_state()
+
+    @profiled("refresh_play_tab")
     def refresh_play_tab(self):
-        for child in self.play_tasks_scroll.inner.winfo_children():
-            child.destroy()
-
-        if (
-            not getattr(self, "ctx", None)
-            or not self.ctx.tasks
-            or self.ctx.base_reward_location_id is None
-            or self.ctx.base_complete_location_id is None
-        ):
+        if not slot_ready(getattr(self, "ctx", None)):
+            self.scheduler.cancel("play")
+            self._play_tasks_key = None
+            self._task_specs = []
+            self._task_status = []
+            self._analysis = None
+            self._play_order = None
+            self._best_next = set()
+            self._search_index.clear()
+            self.play_cards.clear()
+            self._update_play_showing()
+            self._refresh_graph()
             return
 
-        panel = self.colors.get("panel", "#252526")
-        border = self.colors.get("border", "#3a3a3a")
-        fg = self.colors.get("fg", "#e6e6e6")
-        muted = self.colors.get("muted", "#bdbdbd")
+        self.scheduler.schedule("play", self._play_tab_job())
 
+    @profiled("play_tab_job")
+    def _play_tab_job(self):
         checked = set(getattr(self.ctx, "checked_locations_set", set()) or set())
+        have_items = received_item_ids(self.ctx)
+
+        tasks = tuple(self.ctx.tasks)
+        # a rebuild replaced mid-way leaves the key set but cards missing: start it over
+        rebuild = tasks != self._play_tasks_key or len(self._task_specs) != len(tasks)
+        query, state = self.play_search_var.get(), self.play_state_var.get()
+        filtering = filter_active(query, state)
+        if rebuild:
+            # new slot (or first draw): cards get appended a slice at a time
+            self.play_cards.clear()
+            self.play_cards.set_filter(set() if filtering else None)
+            self._task_specs = []
+            self._task_status = []
+            self._search_index.clear()
+            self._play_tasks_key = tasks
+            # the old slot's numbers mean nothing here; the cards get theirs once ranked below
+            self._analysis = None
+            self._play_order = None
+            self._best_next = set()
+
+        # states a slice at a time; the cards use the last ranking until this one is done
+        states = []
+        for i in range(len(tasks)):
+            st = self._task_state(i, checked, have_items)
+            states.append(st)
+            spec = self._task_card_spec(st)
+            if rebuild:
+                self._search_index.set(i, st.name, st.reward)
+                self._task_specs.append(spec)
+                self._task_status.append(st.status)
+                self.play_cards.append_card(spec)
+                if filtering:
+                    self.play_cards.set_visible(i, task_matches(self._search_index, i, query, st.status, state))
+            else:
+                if spec != self._task_specs[i]:
+                    self._task_specs[i] = spec
+                    self.play_cards.update_card(spec)
+                self._set_task_status(i, st.status)
+            yield
+
+        # badges and the best-next order need every state; only cards whose meta moved redraw
+        self._rank_tasks(states)
+        yield
+        for i, st in enumerate(states):
+            spec = self._task_card_spec(st)
+            if spec != self._task_specs[i]:
+                self._task_specs[i] = spec
+                self.play_cards.update_card(spec)
+            yield
+        self._update_play_showing()
+        self._apply_play_sort()
+        self._refresh_graph()
+
+    def _task_state(self, i, checked, have_items) -> TaskState:
+        return self.play.task_state(i, checked, have_items)
+
+    def _rank_tasks(self, states):
+        """Unlock counts for the cards, who gets the badge, and the order "Best next" shows."""
+        analysis = self.play.analysis(states)
+        self._analysis = analysis
+        if analysis is None:
+            self._play_order = None
+            self._best_next = set()
+            return
 
-        prereq_list = list(getattr(self.ctx, "task_prereqs", []) or [])
-        reward_prereq_list = list(getattr(self.ctx, "reward_prereqs", []) or [])
-        lock_prereqs = bool(getattr(self.ctx, "lock_prereqs", False))
-
-        for i, task_name in enumerate(self.ctx.tasks):
-            reward_loc_id = self.ctx.base_reward_location_id + i
-            complete_loc_id = self.ctx.base_complete_location_id + i
-
-            # Consider "completed" when reward location is checked (the one that sends items)
-            completed = (complete_loc_id in checked) or (reward_loc_id in checked)
-
-            # task prereqs satisfied based on COMPLETE locations (completion tokens)
-            task_prereq_ok = True
-            task_prereq_text = ""
-            if i < len(prereq_list):
-                raw = prereq_list[i]
-                task_prereq_text = ("" if raw is None else str(raw)).strip()
-                if task_prereq_text:
-                    task_prereq_ok = self._prereqs_satisfied(task_prereq_text, checked)
-
-            reward_prereq_list = list(getattr(self.ctx, "reward_prereqs", []) or [])
-            reward_prereq_ok = True
-            reward_prereq_text = ""
-            if i < len(reward_prereq_list):
-                raw = reward_prereq_list[i]
-                reward_prereq_text = ("" if raw is None else str(raw)).strip()
-                if reward_prereq_text:
-                    reward_prereq_ok = self._reward_prereqs_satisfied(reward_prereq_text, checked)
-
-            card = tk.Frame(self.play_tasks_scroll.inner, bg=panel, highlightbackground=border, highlightthickness=1)
-            card.pack(fill="x", pady=6, padx=4)
-
-            top = tk.Frame(card, bg=panel)
-            top.pack(fill="x", padx=10, pady=(8, 2))
-
-            display_text = f"{i+1}. {task_name}"
-            task_color = fg
-            if completed:
-                display_text = "✔ " + display_text
-                task_color = muted
-
-            task_label = tk.Label(
-                top,
-                text=display_text,
-                bg=panel,
-                fg=task_color,
-                font=("Segoe UI", 12),
-                wraplength=720,
-                justify="left",
-                anchor="w",
-            )
-            task_label.pack(side="left", fill="x", expand=True)
-
-            if not completed:
-                can_complete = True
-                if lock_prereqs and (not task_prereq_ok or not reward_prereq_ok):
-                    can_complete = False
-
-                btn = ttk.Button(
-                    top,
-                    text="Complete",
-                    command=lambda idx=i: self.complete_task(idx)
-                )
-
-                if not can_complete:
-                    btn.state(["disabled"])
-
-                btn.pack(side="right", padx=(10, 0))
-
-            # Hints: show task line if locked behind tasks; reward line if locked behind rewards
-            showed_hint = False
-
-            if (not completed) and lock_prereqs and task_prereq_text and not task_prereq_ok:
-                hint = tk.Label(
-                    card,
-                    text=f"Locked behind task(s): {task_prereq_text}",
-                    bg=panel,
-                    fg=muted,
-                    font=("Segoe UI", 10),
-                    anchor="w",
-                    justify="left",
-                    wraplength=740
-                )
-                hint.pack(fill="x", padx=28, pady=(0, 2))
-                showed_hint = True
-
-            if (not completed) and lock_prereqs and reward_prereq_text and not reward_prereq_ok:
-                hint2 = tk.Label(
-                    card,
-                    text=f"Locked behind reward(s): {self._reward_prereq_display(reward_prereq_text)}",
-                    bg=panel,
-                    fg=muted,
-                    font=("Segoe UI", 10),
-                    anchor="w",
-                    justify="left",
-                    wraplength=740
-                )
-                hint2.pack(fill="x", padx=28, pady=(0, 8))
-                showed_hint = True
-
-            if not showed_hint:
-                spacer = tk.Frame(card, bg=panel, height=6)
-                spacer.pack(fill="x")
-
-    def _prereqs_satisfied(self, prereq_text: str, checked_locations: set) -> bool:
-        """
-        prereq_text: "1,2,5" meaning tasks 1/2/5 must be completed first.
-        Completion is represented by COMPLETE locations being checked.
-        """
-        if not prereq_text or self.ctx.base_complete_location_id is None:
-            return True
-        parts = [p.strip() for p in prereq_text.split(",") if p.strip()]
-        for p in parts:
-            try:
-                idx_1based = int(p)
-            except ValueError:
-                continue
-            loc = self.ctx.base_complete_location_id + (idx_1based - 1)
-            if loc not in checked_locations:
-                return False
-        return True
-    
-    def _received_item_ids(self) -> set:
-        """
-        Best-effort extraction of received item IDs from common AP client context shapes.
-        Returns a set of integer item ids.
-        """
-        ctx = getattr(self, "ctx", None)
-        if not ctx:
-            return set()
-
-        candidates = None
-        for attr in ("items_received", "received_items"):
-            v = getattr(ctx, attr, None)
-            if isinstance(v, (list, tuple)):
-                candidates = v
-                break
-
-        if not candidates:
-            return set()
-
-        out = set()
-        for it in candidates:
-            # Many AP clients store items as objects with .item, sometimes tuples.
-            item_id = getattr(it, "item", None)
-            if isinstance(item_id, int):
-                out.add(item_id)
-                continue
-            if isinstance(it, (tuple, list)) and it:
-                # try first element if it looks like an int item id
-                if isinstance(it[0], int):
-                    out.add(it[0])
-        return out
-
+        group = {"available": 0, "locked": 1, "pending": 2, "completed": 3}
 
-    def _reward_prereqs_satisfied(self, prereq_text: str, checked_locations: set) -> bool:
-        """
-        prereq_text: "1,2,5" meaning Reward #1/#2/#5 must have been obtained.
-        Prefer checking received item IDs if base_item_id is present.
-        Fallback: treat reward locations being checked as satisfying the reward prereq.
-        """
-        if not prereq_text:
-            return True
+        def key(i):
+            g = group[states[i].status]
+            # available, then locked, by fan-out; pending and done stay in YAML order at the bottom
+            return (g, *analysis.rank_key(i)) if g < 2 else (g, 0, 0, i)
 
-        parts = [p.strip() for p in prereq_text.split(",") if p.strip()]
+        self._play_order = sorted(range(len(states)), key=key)
+        self._best_next = {
+            i for i in self._play_order[:BEST_NEXT_BADGES]
+            if states[i].status == "available" and analysis.unlocks(i) > 0
+        }
 
-        base_item_id = getattr(self.ctx, "base_item_id", None)
-        if isinstance(base_item_id, int):
-            have = self._received_item_ids()
-            for p in parts:
-                try:
-                    idx_1based = int(p)
-                except ValueError:
-                    continue
-                item_id = base_item_id + (idx_1based - 1)
-                if item_id not in have:
-                    return False
-            return True
-
-        # Fallback: if we don't know item ids, approximate with reward locations checked/pending.
-        if self.ctx.base_reward_location_id is None:
-            return True
+    def _task_card_spec(self, st: TaskState) -> CardSpec:
+        i = st.index
+        display_text = f"{i+1}. {st.name}"
+        if st.completed:
+            display_text = "✔ " + display_text
+
+        # sent but not confirmed yet: show it as done-ish, offer a retry if the server never answered
+        req = self.play.inflight.get(i) if st.pending else None
+        if req is not None:
+            return CardSpec(
+                key=i,
+                title="⏳ " + display_text,
+                muted=True,
+                hints=(f"Server didn't confirm this check after {req.attempts} tries.",) if req.failed else (),
+                button="Retry" if req.failed else "Sending…",
+                button_enabled=req.failed,
+            )
 
-        for p in parts:
-            try:
-                idx_1based = int(p)
-            except ValueError:
-                continue
-            loc = self.ctx.base_reward_location_id + (idx_1based - 1)
-            if (loc not in checked_locations) and (loc not in getattr(self, "pending_reward_locations", set())):
-                return False
-        return True
+        # Hints: show task line if locked behind tasks; reward line if locked behind rewards
+        hints = []
+        if st.locked and not st.completed:
+            if st.task_prereq_text and not st.task_prereq_ok:
+                hints.append(f"Locked behind task(s): {st.task_prereq_text}")
+            if st.reward_prereq_text and not st.reward_prereq_ok:
+                hints.append(f"Locked behind reward(s): {self._reward_prereq_display(st.reward_prereq_text)}")
+
+        meta = ""
+        if not st.completed and self._analysis is not None:
+            unlocks = self._analysis.unlocks(i)
+            if unlocks:
+                meta = f"Unlocks {unlocks} task{'' if unlocks == 1 else 's'} · longest chain {self._analysis.chain(i)}"
+                if i in self._best_next:
+                    meta = "★ Best next · " + meta
+
+        return CardSpec(
+            key=i,
+            title=display_text,
+            muted=st.completed,
+            meta=meta,
+            hints=tuple(hints),
+            button=None if st.completed else "Complete",
+            button_enabled=not st.locked,
+        )
 
+    def _on_task_card_action(self, key, button):
+        if button == "Retry":
+            self.retry_task(key)
+        else:
+            self.complete_task(key)
 
     def _reward_prereq_display(self, prereq_text: str) -> str:
         """
         Convert prereq indices into actual reward names from ctx.rewards.
         """
-        rewards = list(getattr(self.ctx, "rewards", []) or [])
         parts = [p.strip() for p in prereq_text.split(",") if p.strip()]
         names = []
 
@@ -1536,394 +1983,108 @@ class TaskipelagoApp(tk.Tk):
                 idx_1based = int(p)
             except ValueError:
                 continue
-            idx0 = idx_1based - 1
-            if 0 <= idx0 < len(rewards) and str(rewards[idx0]).strip():
-                names.append(str(rewards[idx0]).strip())
-            else:
-                names.append(f"Reward #{idx_1based}")
+            names.append(self.ctx.names.reward_text(idx_1based - 1) or f"Reward #{idx_1based}")
 
         return ", ".join(names)
-        
-    def _slot_name_from_id(self, slot_id):
-        """Best-effort slot-id -> slot name."""
-        if slot_id is None:
-            return "Unknown"
-        try:
-            ctx = getattr(self, "ctx", None)
-            slot_info = getattr(ctx, "slot_info", None) if ctx else None
-
-            # Archipelago commonly provides slot_info as dict[int, dict-like]
-            if isinstance(slot_info, dict) and slot_id in slot_info:
-                v = slot_info.get(slot_id)
-                if isinstance(v, dict):
-                    name = v.get("name") or v.get("slot_name") or v.get("player_name")
-                    if isinstance(name, str) and name.strip():
-                        return name.strip()
-                else:
-                    name = getattr(v, "name", None) or getattr(v, "slot_name", None)
-                    if isinstance(name, str) and name.strip():
-                        return name.strip()
-        except Exception:
-            pass
-
-        return f"Player {slot_id}"
-
-    def _get_location_item_and_player(self, loc_id: int):
-        """
-        Best-effort read of scouted location info from context.
-        Returns: (item_id|None, player_id|None)
-        """
-        ctx = getattr(self, "ctx", None)
-        if not ctx:
-            return None, None
-
-        # Different AP clients / versions store this differently.
-        candidates = [
-            "location_info",
-            "locations_info",
-            "locations_info_cache",
-            "location_infos",
-            "scouted_locations",
-        ]
-
-        for attr in candidates:
-            try:
-                m = getattr(ctx, attr, None)
-                if isinstance(m, dict) and loc_id in m:
-                    li = m.get(loc_id)
-
-                    # tuple/list form: (item, player, flags?) or similar
-                    if isinstance(li, (tuple, list)) and len(li) >= 2:
-                        return li[0], li[1]
-
-                    # dict form
-                    if isinstance(li, dict):
-                        return li.get("item"), li.get("player")
-
-                    # object form (NetUtils.LocationInfo-like)
-                    item = getattr(li, "item", None)
-                    player = getattr(li, "player", None)
-                    return item, player
-            except Exception:
-                continue
-
-        return None, None
-
-    def _resolve_item_name_for_sent(self, item_id, task_index: int):
-        """
-        Resolve an item name similar to your received-item popup logic:
-        - Prefer ctx.item_names map (multiworld items)
-        - If it's a Taskipelago Reward item id, use YAML reward text
-        - Otherwise fallback to YAML reward text for this task (best-effort)
-        """
-        ctx = getattr(self, "ctx", None)
-        if not ctx:
-            return None
-
-        resolved = None
-
-        # 1) global item name map
-        try:
-            item_names = getattr(ctx, "item_names", None)
-            if isinstance(item_names, dict):
-                resolved = item_names.get(item_id)
-            elif hasattr(item_names, "get"):
-                resolved = item_names.get(item_id)
-        except Exception:
-            resolved = None
-
-        # 2) Taskipelago reward range -> YAML reward text
-        try:
-            base_reward_item = getattr(ctx, "base_item_id", None)
-            rewards_text = list(getattr(ctx, "rewards", []) or [])
-            if isinstance(base_reward_item, int) and isinstance(item_id, int) and rewards_text:
-                idx = item_id - base_reward_item
-                if 0 <= idx < len(rewards_text):
-                    resolved = rewards_text[idx]
-        except Exception:
-            pass
-
-        # 3) fallback: YAML reward text by task index (even if item_id unknown)
-        if (not resolved) and task_index is not None:
-            try:
-                rewards_text = list(getattr(ctx, "rewards", []) or [])
-                if 0 <= task_index < len(rewards_text):
-                    resolved = rewards_text[task_index]
-            except Exception:
-                pass
-
-        if resolved is None:
-            return None
-
-        resolved = str(resolved).strip()
-        if not resolved:
-            return None
-        return resolved
 
     def complete_task(self, task_index: int):
-        if not getattr(self, "ctx", None):
-            return
-        if self.ctx.base_reward_location_id is None or self.ctx.base_complete_location_id is None:
-            return
-
-        reward_loc_id = self.ctx.base_reward_location_id + task_index
-        complete_loc_id = self.ctx.base_complete_location_id + task_index
-
-        checked = getattr(self.ctx, "checked_locations_set", set()) or set()
-        if reward_loc_id in checked or reward_loc_id in self.pending_reward_locations:
-            return
-
-        # UI optimism on reward location
-        self.pending_reward_locations.add(reward_loc_id)
-        self.refresh_play_tab()
-
-        try:
-            # Dedupe so doule-clicks or rapid refreshes don't spam
-            now = time.time()
-            sent_key = ("sent", reward_loc_id)
-            if sent_key != self._last_sent_key or (now - self._last_sent_seen_at) > 1.0:
-                item_id, recipient_id = self._get_location_item_and_player(reward_loc_id)
-                reward_name = self._resolve_item_name_for_sent(item_id, task_index)
-
-                # Skip if filler
-                if reward_name and reward_name.strip() != FILLER_TOKEN:
-                    recipient_name = self._slot_name_from_id(recipient_id) if recipient_id is not None else "Unknown"
-                    task_label = None
-                    try:
-                        if 0 <= task_index < len(self.ctx.tasks):
-                            task_label = self.ctx.tasks[task_index]
-                    except Exception:
-                        task_label = None
-
-                    body_lines = []
-                    if task_label:
-                        body_lines.append(f"Task {task_index+1}: {task_label}")
-                        body_lines.append("")  # spacer line
-                    body_lines.append(str(reward_name))
-                    body_lines.append("")
-                    body_lines.append(f"(sent to {recipient_name})")
-
-                    self._enqueue_notification(Notification(
-                        kind="sent",
-                        title="Reward Sent!",
-                        body="\n".join(body_lines),
-                        created_at=time.time()
-                    ))
-
-                    self._last_sent_key = sent_key
-                    self._last_sent_seen_at = now
-        except Exception:
-            pass
+        if getattr(self, "ctx", None):
+            self.play.complete(task_index)
 
-        async def _send():
-            # IMPORTANT: send BOTH checks in one click
-            await self.ctx.send_msgs([{
-                "cmd": "LocationChecks",
-                "locations": [complete_loc_id, reward_loc_id]
-            }])
+    def retry_task(self, task_index: int):
+        self.play.retry(task_index)
 
-        self.loop.call_soon_threadsafe(lambda: asyncio.create_task(_send()))
+    def _send_msgs(self, msgs: list):
+        # PlayModel's sender; the context lives on the loop thread
+        self._run_coro(self.ctx.send_msgs(msgs))
 
-    def _maybe_send_goal_complete(self):
-        if self.sent_goal:
+    def _update_task_card(self, task_index: int):
+        """Redraw a single play card (optimistic updates, retry state)."""
+        if not getattr(self, "ctx", None) or not (0 <= task_index < len(self._task_specs)):
             return
-        if not getattr(self, "ctx", None):
+        checked = set(getattr(self.ctx, "checked_locations_set", set()) or set())
+        st = self._task_state(task_index, checked, received_item_ids(self.ctx))
+        spec = self._task_card_spec(st)
+        if spec != self._task_specs[task_index]:
+            self._task_specs[task_index] = spec
+            self.play_cards.update_card(spec)
+        if task_index < len(self._task_status):
+            self._set_task_status(task_index, st.status)
+            self._update_play_showing()
+
+    # ---------------- search / state filter ----------------
+    def _set_task_status(self, task_index: int, status: str):
+        """Record a task's new state; under an active filter the card may need to appear or vanish."""
+        if self._task_status[task_index] == status:
             return
-        if not self.ctx.tasks or self.ctx.base_reward_location_id is None:
+        self._task_status[task_index] = status
+        if self._graph_built and self._graph_key is not None:
+            self.graph_view.set_status(task_index, status)
+        query, state = self.play_search_var.get(), self.play_state_var.get()
+        if filter_active(query, state):
+            self.play_cards.set_visible(task_index, task_matches(self._search_index, task_index, query, status, state))
+
+    def _schedule_play_filter(self):
+        # coalesce keystrokes; one filter pass per idle
+        if self._play_filter_job is None:
+            self._play_filter_job = self.after_idle(self._apply_play_filter)
+
+    def _apply_play_filter(self):
+        self._play_filter_job = None
+        keys = filter_keys(self._search_index, self.play_search_var.get(), self._task_status,
+                           self.play_state_var.get())
+        self.play_cards.set_filter(keys)
+        self._update_play_showing()
+
+    # ---------------- prereq graph ----------------
+    def _refresh_graph(self):
+        """
+        Lay the graph out again if the slot's tasks changed since the last layout. Only runs
+        while the graph tab is showing; completions after that just recolor (_set_task_status).
+        """
+        if not self._graph_built:
             return
-
-        checked = getattr(self.ctx, "checked_locations_set", set()) or set()
-
-        for i in range(len(self.ctx.tasks)):
-            if (self.ctx.base_reward_location_id + i) not in checked:
-                return
-
-        self.sent_goal = True
-
-        async def _send_goal():
-            await self.ctx.send_msgs([{"cmd": "StatusUpdate", "status": 30}])  # CLIENT_GOAL
-
-        self.loop.call_soon_threadsafe(lambda: asyncio.create_task(_send_goal()))
-
-    def on_server_disconnected(self):
-        self.after(0, self._handle_server_disconnected)
-
-    def _handle_server_disconnected(self):
-        self.connection_state = "disconnected"
-        self.connect_status.set("Disconnected (server closed connection).")
-        self.connect_button.config(text="Connect")
-        self.sent_goal = False
-        self._clear_play_state()
-
-    # ---------------- DeathLink popup ----------------
-    def on_deathlink_received(self, data: dict):
-        self.after(0, lambda: self._show_deathlink_popup(data))
-
-    def _show_deathlink_popup(self, data: dict):
-        # dedupe
-        key = (data.get("time"), data.get("source"), data.get("cause"))
-        now = time.time()
-        if key == self._last_deathlink_key and (now - self._last_deathlink_seen_at) < 2.0:
+        tasks = self._play_tasks_key
+        if tasks is None:
+            if self._graph_key is not None:
+                self._graph_key = None
+                self.graph_view.clear()
             return
-        self._last_deathlink_key = key
-        self._last_deathlink_seen_at = now
-
-        # amnesty- ignores X deathlinks
-        amnesty = int(getattr(self.ctx, "death_link_amnesty", 0) or 0) if getattr(self, "ctx", None) else 0
-
-        if self._deathlink_amnesty_left > 0:
-            self._deathlink_amnesty_left -= 1
-            return # iframed through it babyyy let's go
-
-        self._deathlink_amnesty_left = amnesty # reset if not dodged
-
-        pool = list(getattr(self.ctx, "death_link_pool", []) or [])
-        weights_raw = list(getattr(self.ctx, "death_link_weights", []) or [])
-
-        # normalize weights length
-        if len(weights_raw) < len(pool):
-            weights_raw += [1] * (len(pool) - len(weights_raw))
-        weights_raw = weights_raw[:len(pool)]
-
-        weights = []
-        for w in weights_raw:
-            try:
-                wf = float(w)
-            except Exception:
-                wf = 1.0
-            weights.append(max(0.0, wf))
-
-        if pool:
-            if sum(weights) > 0:
-                task = random.choices(pool, weights=weights, k=1)[0]
-            else:
-                task = random.choice(pool)
+        if tasks == self._graph_key or self.notebook.select() != str(self.graph_tab):
+            return
+        if len(self._task_status) != len(tasks):
+            return  # the play tab is still building; its job calls back here when done
+
+        with METRICS.timer("graph.layout"):
+            n = len(tasks)
+            layout = layered_layout(n, prereq_edges(self.ctx.task_prereqs, self.ctx.reward_prereqs, n))
+        self.graph_view.set_graph(layout, tasks, self._task_status)
+        self._graph_key = tasks
+
+    def _on_graph_select(self, task_index: int):
+        self.notebook.select(self.play_tab)
+        query, state = self.play_search_var.get(), self.play_state_var.get()
+        status = self._task_status[task_index] if task_index < len(self._task_status) else ""
+        if filter_active(query, state) and not task_matches(self._search_index, task_index, query, status, state):
+            # the card is filtered out; show everything so there's something to scroll to
+            self.play_search_var.set("")
+            self.play_state_var.set("All")
+            if self._play_filter_job is not None:
+                self.after_cancel(self._play_filter_job)
+            self._apply_play_filter()
+        self.after_idle(lambda: self.play_cards.scroll_to(task_index))
+
+    def _apply_play_sort(self):
+        if self.play_sort_var.get() == "Best next" and self._play_order is not None:
+            self.play_cards.set_order(self._play_order)
         else:
-            task = "No pool entries configured. Make something up, I guess"
-
-        source = data.get("source") or "Unknown"
-        cause = data.get("cause") or ""
-
-        detail_text = f"From: {source}"
-        if cause:
-            detail_text += f"\n{cause}"
-
-        self._enqueue_notification(Notification(
-            kind="deathlink",
-            title="DEATHLINK!",
-            body=f"{detail_text}\n\nTask: {task}",
-            created_at=time.time()
-        ))
-
-    # ---------------- Reward popup ----------------
-    def on_items_received(self, new_items):
-        self.after(0, lambda: self._show_reward_popups(new_items))
-
-    def _show_reward_popups(self, new_items):
-        for it in new_items:
-            item_id = getattr(it, "item", None)
-            sender = getattr(it, "player", None)
-            loc = getattr(it, "location", None)
-
-            # If we can't even read an item id, enqueue a debug notification
-            if item_id is None:
-                self._enqueue_notification(Notification(
-                    kind="reward",
-                    title="Reward Received (unparsed)",
-                    body=f"Got a reward event but couldn't parse fields:\n{it!r}",
-                    created_at=time.time()
-                ))
-                continue
-
-            # ---- 1) HARD SKIP: Task Complete token items (912xxx range) ----
-            base_token = getattr(self.ctx, "base_token_id", None)
-            n_tasks = len(getattr(self.ctx, "tasks", []) or [])
-            if isinstance(base_token, int) and isinstance(item_id, int) and n_tasks:
-                if 0 <= (item_id - base_token) < n_tasks:
-                    continue
-
-            # ---- 2) Resolve a REAL name (no fallback to "Item ID ...") ----
-            resolved_name = None
-
-            # 2a) Server-provided global item name map (best for multiworld items)
-            try:
-                item_names = getattr(self.ctx, "item_names", None)
-                if isinstance(item_names, dict):
-                    resolved_name = item_names.get(item_id)
-                elif hasattr(item_names, "get"):
-                    resolved_name = item_names.get(item_id)
-            except Exception:
-                resolved_name = None
-
-            # 2b) If this is one of our Taskipelago Reward items, show YAML reward text instead
-            base_reward_item = getattr(self.ctx, "base_item_id", None)
-            rewards_text = list(getattr(self.ctx, "rewards", []) or [])
-            if isinstance(base_reward_item, int) and isinstance(item_id, int) and rewards_text:
-                idx = item_id - base_reward_item
-                if 0 <= idx < len(rewards_text):
-                    resolved_name = rewards_text[idx]
-
-            # ---- 3) If we STILL don't have a name, do NOT popup ----
-            if not resolved_name or not str(resolved_name).strip():
-                continue
-
-            resolved_name = str(resolved_name).strip()
-
-            # If it's your filler token, don't popup
-            if resolved_name == FILLER_TOKEN:
-                continue
+            self.play_cards.set_order(range(len(self._task_specs)))
 
-            # (Extra safety) If server name says Task Complete anyway, skip
-            if resolved_name.startswith("Task Complete "):
-                continue
+    def _update_play_showing(self):
+        total = len(self._task_specs)
+        shown = self.play_cards.visible_count()
+        self.play_showing_var.set(f"Showing {shown} of {total}" if total and shown != total else "")
 
-            # ---- dedupe the popup ----
-            key = (item_id, sender, loc)
-            now = time.time()
-            if key == self._last_reward_key and (now - self._last_reward_seen_at) < 1.5:
-                continue
-            self._last_reward_key = key
-            self._last_reward_seen_at = now
-
-            sender_label = None
-            if sender is not None:
-                # Try common AP context mappings first
-                try:
-                    player_names = getattr(self.ctx, "player_names", None)
-                    if isinstance(player_names, dict):
-                        sender_label = player_names.get(sender)
-                    elif hasattr(player_names, "get"):
-                        sender_label = player_names.get(sender)
-                except Exception:
-                    sender_label = None
-
-                # Fallback: slot_info-style structures (if present)
-                if not sender_label:
-                    try:
-                        slot_info = getattr(self.ctx, "slot_info", None)
-                        info = None
-                        if isinstance(slot_info, dict):
-                            info = slot_info.get(sender)
-                        elif hasattr(slot_info, "get"):
-                            info = slot_info.get(sender)
-
-                        if isinstance(info, dict):
-                            sender_label = info.get("name") or info.get("slot_name")
-                        else:
-                            sender_label = getattr(info, "name", None) if info is not None else None
-                    except Exception:
-                        sender_label = None
-
-                if not sender_label:
-                    sender_label = f"Player {sender}"
-
-            # show popup
-            self._enqueue_notification(Notification(
-                kind="reward",
-                title="Reward Received!",
-                body=(f"{resolved_name}\n\n(from player {sender_label})" if sender is not None else resolved_name),
-                created_at=time.time()
-            ))
 
 
 if __name__ == "__main__":
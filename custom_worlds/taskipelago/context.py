@@ -0,0 +1,375 @@
+import asyncio
+import json
+from pathlib import Path
+import time
+
+import CommonClient
+from NetUtils import Endpoint, decode
+
+from .deathlink import DeathLinkEngine
+from .events import DEATHLINK, DISCONNECTED, ITEMS, STATE, UIEventBus
+from .metrics import METRICS
+from .names import NameResolver
+from .profiling import profiled
+from .replay import recorder_for
+
+# server+slot entries kept in taskipelago_notify_state.json; the least recently saved go first
+NOTIFY_STATE_MAX_KEYS = 100
+
+# fire-and-forget tasks; the loop itself only keeps weak references, so a task nobody holds on
+# to can be garbage collected mid-flight
+_background_tasks = set()
+
+
+def spawn(coro) -> asyncio.Task:
+    """asyncio.create_task that keeps the task referenced until it's done. Call on the loop."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+# ----------------------------
+# Networking
+# ----------------------------
+class TaskipelagoContext(CommonClient.CommonContext):
+    game = "Taskipelago"
+    items_handling = 0b111
+
+    def __init__(self, server_address=None, password=None):
+        super().__init__(server_address, password)
+        self.slot_data = {}
+
+        self.tasks = []
+        self.rewards = []
+        self.task_prereqs = []
+        self.reward_prereqs = []
+        self.lock_prereqs = False
+
+        self.base_reward_location_id = None
+        self.base_complete_location_id = None
+        self.base_item_id = None
+        self.base_token_id = None
+
+        # item/player display names, rebuilt on Connected/DataPackage/RoomUpdate
+        self.names = NameResolver()
+        # set by SessionManager so slots in the same room share one name memo
+        self.name_caches = None
+        # replay.PacketRecorder when TASKIPELAGO_RECORD is set (False once we know it isn't)
+        self.recorder = None
+
+        self.death_link_pool = []
+        self.death_link_enabled = False
+
+        self.checked_locations_set = set()
+
+        # everything the UI needs to hear about goes through here (never call into Tk directly)
+        self.events = UIEventBus()
+
+        self._deathlink_tag_enabled = False
+        self.death_link_weights = []
+        self.death_link_amnesty = 0
+        # pick table + amnesty + burst merging; kept across reconnects
+        self.deathlink = DeathLinkEngine()
+
+        self._last_item_index = 0
+
+        # persist received notification state
+        self._notify_state_path = Path.cwd() / "taskipelago_notify_state.json"
+        self._notify_key = None
+        self._loaded_notify_index = False
+        self._pending_notify_index = None  # type: int | None
+
+    def apply_slot_data(self, slot_data: dict):
+        self.slot_data = slot_data or {}
+        self.tasks = list(self.slot_data.get("tasks", []))
+        self.rewards = list(self.slot_data.get("rewards", []))
+        self.task_prereqs = list(self.slot_data.get("task_prereqs", []))
+        self.reward_prereqs = list(self.slot_data.get("reward_prereqs", []))
+        self.lock_prereqs = bool(self.slot_data.get("lock_prereqs", False))
+
+        self.base_reward_location_id = self.slot_data.get("base_reward_location_id")
+        self.base_complete_location_id = self.slot_data.get("base_complete_location_id")
+        self.base_item_id = self.slot_data.get("base_item_id")
+        self.base_token_id = self.slot_data.get("base_token_id")
+
+        self.death_link_pool = list(self.slot_data.get("death_link_pool", []))
+        self.death_link_weights = list(self.slot_data.get("death_link_weights", []))
+        self.death_link_amnesty = int(self.slot_data.get("death_link_amnesty", 0) or 0)
+        self.death_link_enabled = bool(self.slot_data.get("death_link_enabled", False))
+        self.deathlink.configure(self.death_link_pool, self.death_link_weights, self.death_link_amnesty,
+                                 slot_key=self._make_notify_key())
+
+        self.events.post(STATE)
+
+    @profiled("on_package")
+    def on_package(self, cmd: str, args: dict):
+        super().on_package(cmd, args)
+
+        if "checked_locations" in args and isinstance(args["checked_locations"], (list, set, tuple)):
+            self.checked_locations_set.update(args["checked_locations"])
+
+        base_checked = getattr(self, "locations_checked", None)
+        if isinstance(base_checked, set):
+            self.checked_locations_set.update(base_checked)
+
+        if cmd == "Connected":
+            # Apply slot data on connection
+            self.apply_slot_data(args.get("slot_data", {}))
+            if self.slot_data.get("death_link_enabled"):
+                spawn(self.enable_deathlink_tag())
+
+            # Load persisted "already notified" index for this server+slot.
+            # Apply it when we see the first ReceivedItems after connect.
+            self._loaded_notify_index = False
+            self._pending_notify_index = self.load_last_notified_index()
+
+            async def _double_sync():
+                await self.send_msgs([{"cmd": "Sync"}])
+                await asyncio.sleep(0.25)
+                await self.send_msgs([{"cmd": "Sync"}])
+
+            spawn(_double_sync())
+
+        if cmd == "Connected" and self.name_caches is not None:
+            room_key = self.room_key()
+            if room_key != self.names.room_key:
+                if self.names.room_key is not None:
+                    self.name_caches.release(self.names.room_key)
+                self.names.attach(room_key, self.name_caches.acquire(room_key))
+
+        if cmd in ("Connected", "DataPackage", "RoomUpdate"):
+            self.names.refresh(self, data_package_changed=(cmd == "DataPackage"))
+
+        if cmd in ("Connected", "RoomUpdate", "Sync", "ReceivedItems"):
+            self.events.post(STATE)
+
+        if cmd == "Bounced":
+            tags = args.get("tags") or []
+            if "DeathLink" in tags:
+                data = args.get("data") or {}
+                self.events.post(DEATHLINK, data)
+
+        if cmd == "ReceivedItems":
+            # Archipelago sends deltas as: {"index": <start>, "items": [ ... ]}
+            try:
+                packet_index = int(args.get("index", 0) or 0)
+            except Exception:
+                packet_index = 0
+
+            packet_items = list(args.get("items") or [])
+            packet_end = packet_index + len(packet_items)
+
+            # First ReceivedItems after connect: establish baseline using absolute server index.
+            if not self._loaded_notify_index:
+                self._loaded_notify_index = True
+
+                if isinstance(self._pending_notify_index, int):
+                    # Resume from previously-notified absolute index
+                    self._last_item_index = max(0, int(self._pending_notify_index))
+                else:
+                    # First time on this machine: skip ALL history by setting baseline to end of this packet.
+                    self._last_item_index = packet_end
+
+                # Persist immediately so reconnect/crash doesn't replay history
+                self.save_last_notified_index(self._last_item_index)
+
+            # Detect server restart
+            if packet_end < self._last_item_index:
+                # reset local cursor to the start of this packet so we process it
+                self._last_item_index = packet_index
+                self.save_last_notified_index(self._last_item_index, force=True)
+
+            # If this packet ends at/before what we've already shown, nothing new
+            if packet_end <= self._last_item_index:
+                return
+
+            # Compute overlap: how many items in this packet have we already notified?
+            # If _last_item_index is inside this packet range, skip up to that point.
+            already_notified_in_packet = max(0, self._last_item_index - packet_index)
+
+            new_items = packet_items[already_notified_in_packet:]
+
+            # Advance last notified absolute index to end of packet
+            self._last_item_index = packet_end
+            self.save_last_notified_index(self._last_item_index)
+
+            if new_items:
+                self.events.post(ITEMS, new_items)
+
+
+    async def enable_deathlink_tag(self):
+        # If we aren't connected to a server endpoint yet, bail.
+        if not getattr(self, "server", None):
+            return
+
+        # Always try at least once per connection; guard only prevents spamming.
+        if self._deathlink_tag_enabled:
+            return
+
+        self._deathlink_tag_enabled = True
+        await self.send_msgs([{"cmd": "ConnectUpdate", "tags": ["DeathLink"]}])
+
+    def room_key(self):
+        server = (self.server_address or "").strip().lower()
+        return server, str(getattr(self, "seed_name", None) or "")
+
+    def _make_notify_key(self) -> str:
+        # Slot name is stored in ctx.auth by your connect flow
+        server = (self.server_address or "").strip().lower()
+        slot = (getattr(self, "auth", None) or "").strip()
+        return f"v2::{server}::{slot}"
+
+    def _load_notify_state(self) -> dict:
+        try:
+            if self._notify_state_path.exists():
+                return json.loads(self._notify_state_path.read_text(encoding="utf-8") or "{}")
+        except Exception:
+            pass
+        return {}
+
+    def _save_notify_state(self, data: dict) -> None:
+        try:
+            with METRICS.timer("persist.notify_state"):
+                self._notify_state_path.parent.mkdir(parents=True, exist_ok=True)
+                self._notify_state_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        except Exception:
+            # Don't crash the client for a persistence failure
+            pass
+
+    def load_last_notified_index(self) -> int | None:
+        self._notify_key = self._make_notify_key()
+        if not self._notify_key.strip(":"):
+            return None
+        data = self._load_notify_state()
+        val = data.get(self._notify_key)
+        if isinstance(val, int) and val >= 0:
+            return val
+        return None
+
+    def save_last_notified_index(self, idx: int, *, force: bool = False) -> None:
+        if idx is None:
+            return
+        if self._notify_key is None:
+            self._notify_key = self._make_notify_key()
+        if not self._notify_key.strip(":"):
+            return
+
+        data = self._load_notify_state()
+        prev = data.get(self._notify_key)
+
+        # Only move forward unless forced (used for server reset)
+        if not force and isinstance(prev, int) and prev > idx:
+            return
+
+        # re-insert so the dict stays ordered by last save, then drop slots not seen in ages
+        data.pop(self._notify_key, None)
+        data[self._notify_key] = int(idx)
+        for stale in list(data)[:-NOTIFY_STATE_MAX_KEYS]:
+            del data[stale]
+        self._save_notify_state(data)
+
+    async def disconnect(self):
+        # Snapshot current endpoint so it can't be nulled out under us
+        endpoint = getattr(self, "server", None)
+        if not endpoint:
+            return
+
+        # Best-effort tell server we're disconnecting
+        try:
+            await self.send_msgs([{"cmd": "Disconnect"}])
+        except Exception:
+            pass
+
+        # Hard close the websocket so server_loop's "async for data in socket" exits
+        try:
+            sock = getattr(endpoint, "socket", None)
+            if sock is not None:
+                await sock.close()
+        except Exception:
+            pass
+
+        # Now clear local endpoint
+        self.server = None
+        self._deathlink_tag_enabled = False
+
+
+
+
+async def server_loop(ctx: TaskipelagoContext, address: str):
+    import websockets
+    import ssl
+    import traceback
+
+    raw = (address or "").strip()
+
+    # If user didn't provide scheme, try sensible defaults:
+    candidates = []
+    if "://" in raw:
+        candidates.append(raw)
+    else:
+        host = raw
+        # archipelago.gg is typically behind TLS; try wss first
+        if "archipelago.gg" in host.lower():
+            candidates.append(f"wss://{host}")
+        candidates.append(f"ws://{host}")
+
+    last_err = None
+
+    for url in candidates:
+        try:
+            ssl_ctx = ssl.create_default_context() if url.startswith("wss://") else None
+
+            socket = await websockets.connect(
+                url,
+                ssl=ssl_ctx,
+                ping_timeout=None,
+                ping_interval=None,
+                close_timeout=2,
+            )
+
+            ctx.server = Endpoint(socket)
+
+            # ensure every connection will send deathlink tag over
+            ctx._deathlink_tag_enabled = False
+
+            await ctx.send_connect()
+
+            # TASKIPELAGO_RECORD=1 keeps a copy of every command for replay.py
+            recorder = recorder_for(ctx, url)
+            if recorder is not None:
+                recorder.mark("connect")
+            try:
+                async for data in socket:
+                    t0 = time.perf_counter()
+                    msgs = decode(data)
+                    METRICS.observe("net.decode", time.perf_counter() - t0)
+                    METRICS.inc("net.bytes_in", len(data))
+                    for msg in msgs:
+                        if recorder is not None:
+                            recorder.record(msg)
+                        cmd = msg.get("cmd")
+                        METRICS.inc(f"packets.{cmd}")
+                        t0 = time.perf_counter()
+                        await CommonClient.process_server_cmd(ctx, msg)
+                        METRICS.observe(f"on_package.{cmd}", time.perf_counter() - t0)
+            finally:
+                if recorder is not None:
+                    recorder.mark("disconnect")
+
+            # Socket closed cleanly (server dropped us, or we disconnected)
+            ctx.events.post(DISCONNECTED)
+            return
+
+        except Exception as e:
+            last_err = e
+            print(f"[Taskipelago] Connection failed for {url}: {e!r}")
+            traceback.print_exc()
+
+    # If we tried all candidates and failed, stash a human-readable reason for UI
+    try:
+        ctx._last_disconnect_reason = f"{type(last_err).__name__}: {last_err}" if last_err else "Unknown error"
+    except Exception:
+        pass
+    finally:
+        ctx.events.post(DISCONNECTED)
@@ -0,0 +1,109 @@
+from bisect import bisect_right
+from itertools import accumulate
+import random
+from typing import List, Optional, Sequence, Tuple
+
+NO_POOL_TASK = "No pool entries configured. Make something up, I guess"
+
+# A DeathLink that arrives within QUIET_WINDOW of the previous one joins its burst; a burst is
+# flushed QUIET_WINDOW after its last death, or MAX_HOLD after its first, whichever comes first.
+QUIET_WINDOW = 0.75
+MAX_HOLD = 3.0
+# exact repeats (same time/source/cause) inside this window are the same death delivered twice
+DUPLICATE_WINDOW = 2.0
+
+
+class DeathLinkTable:
+    """Weighted pick from the DeathLink pool. Built once per slot data, O(log n) per pick."""
+
+    def __init__(self, pool: Sequence[str], weights: Sequence = ()):
+        self.pool = [str(x) for x in pool]
+
+        # normalize weights length; junk/negative weights count as 1/0 like before
+        raw = list(weights)[:len(self.pool)]
+        raw += [1] * (len(self.pool) - len(raw))
+        clean = []
+        for w in raw:
+            try:
+                wf = float(w)
+            except (TypeError, ValueError):
+                wf = 1.0
+            clean.append(max(0.0, wf))
+
+        self.cumulative = list(accumulate(clean))
+        self.total = self.cumulative[-1] if self.cumulative else 0.0
+
+    def pick(self, rng=random) -> str:
+        if not self.pool:
+            return NO_POOL_TASK
+        if self.total <= 0:
+            return rng.choice(self.pool)
+        i = bisect_right(self.cumulative, rng.random() * self.total)
+        return self.pool[min(i, len(self.pool) - 1)]
+
+
+class DeathLinkEngine:
+    """
+    Everything between a Bounced DeathLink and the notification: duplicate filtering, amnesty,
+    task assignment and burst coalescing. Lives on the context so it survives reconnects.
+
+    receive() takes deaths as they arrive; flush() hands back the finished bursts as lists of
+    (data, task) once they've gone quiet. Both must be called from the same thread.
+    """
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.table = DeathLinkTable([])
+        self.amnesty = 0
+        self.amnesty_left = 0
+        self._slot_key = None
+
+        self._last_key = None
+        self._last_seen_at = 0.0
+
+        self._burst: List[Tuple[dict, str]] = []
+        self._burst_started = 0.0
+        self._burst_last = 0.0
+
+    def configure(self, pool, weights, amnesty: int, slot_key=None):
+        """
+        Called when slot data is applied. The pick table is rebuilt; the amnesty counter only
+        starts over for a different slot (or a changed amnesty setting), not on reconnect.
+        """
+        self.table = DeathLinkTable(pool or [], weights or [])
+        amnesty = max(0, int(amnesty or 0))
+        if slot_key != self._slot_key or amnesty != self.amnesty:
+            self.amnesty_left = amnesty
+        self.amnesty = amnesty
+        self._slot_key = slot_key
+
+    def receive(self, data: dict, now: float) -> bool:
+        """Returns True if the death was punished (i.e. will show up in a burst)."""
+        key = (data.get("time"), data.get("source"), data.get("cause"))
+        if key == self._last_key and (now - self._last_seen_at) < DUPLICATE_WINDOW:
+            return False
+        self._last_key = key
+        self._last_seen_at = now
+
+        # amnesty- ignores X deathlinks
+        if self.amnesty_left > 0:
+            self.amnesty_left -= 1
+            return False  # iframed through it babyyy let's go
+        self.amnesty_left = self.amnesty  # reset if not dodged
+
+        if not self._burst:
+            self._burst_started = now
+        self._burst_last = now
+        self._burst.append((data, self.table.pick(self.rng)))
+        return True
+
+    def pending(self) -> int:
+        return len(self._burst)
+
+    def flush(self, now: float, force: bool = False) -> Optional[List[Tuple[dict, str]]]:
+        if not self._burst:
+            return None
+        if not force and (now - self._burst_last) < QUIET_WINDOW and (now - self._burst_started) < MAX_HOLD:
+            return None
+        burst, self._burst = self._burst, []
+        return burst
@@ -0,0 +1,68 @@
+from collections import deque
+import threading
+from typing import Any, List, Tuple
+
+# Event kinds posted by TaskipelagoContext
+STATE = "state"                # slot data / checks / items changed; payload unused
+ITEMS = "items"                # payload: list of NetworkItem-likes that haven't been notified yet
+DEATHLINK = "deathlink"        # payload: Bounced data dict
+DISCONNECTED = "disconnected"  # payload unused
+
+
+class UIEventBus:
+    """
+    The only way network code talks to the UI.
+
+    post() is safe from any thread and never touches Tk. The UI thread calls drain() from a
+    single pump. Redundant events are merged on the way in:
+      - STATE: at most one pending; later posts are dropped
+      - ITEMS: appended onto the previous ITEMS event if that's still the newest one
+    The queue is bounded; when full the oldest droppable event (not STATE/DISCONNECTED) goes.
+    """
+
+    def __init__(self, maxlen: int = 1000):
+        self._lock = threading.Lock()
+        self._queue: deque = deque()
+        self._maxlen = max(1, int(maxlen))
+        self._state_pending = False
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._queue)
+
+    def post(self, kind: str, payload: Any = None) -> None:
+        with self._lock:
+            if kind == STATE:
+                if self._state_pending:
+                    self.coalesced += 1
+                    return
+                self._state_pending = True
+            elif kind == ITEMS and self._queue and self._queue[-1][0] == ITEMS:
+                self._queue[-1][1].extend(payload or [])
+                self.coalesced += 1
+                return
+            elif kind == ITEMS:
+                payload = list(payload or [])
+
+            if len(self._queue) >= self._maxlen:
+                self._drop_oldest()
+            self._queue.append((kind, payload))
+
+    def _drop_oldest(self):
+        # STATE and DISCONNECTED are never dropped; there's at most one STATE anyway
+        for i, (kind, _payload) in enumerate(self._queue):
+            if kind not in (STATE, DISCONNECTED):
+                del self._queue[i]
+                self.dropped += 1
+                return
+
+    def drain(self) -> List[Tuple[str, Any]]:
+        with self._lock:
+            if not self._queue:
+                return []
+            out = list(self._queue)
+            self._queue.clear()
+            self._state_pending = False
+        return out
@@ -0,0 +1,222 @@
+"""
+Layered (Sugiyama-style) layout of the task prereq graph, without Tk.
+
+    edges = prereq_edges(ctx.task_prereqs, ctx.reward_prereqs, len(ctx.tasks))
+    layout = layered_layout(len(ctx.tasks), edges)
+
+The usual four steps, each kept close to linear so a 1000-task slot lays out in a few tens
+of milliseconds:
+
+  1. cycles are broken by reversing DFS back edges (reward prereqs can make cycles, and
+     task prereqs can too when lock_prereqs is off)
+  2. every task goes one layer below its deepest prereq (longest path from the roots)
+  3. an edge spanning several layers gets a dummy node in each layer it crosses, so it
+     can be routed between the tasks instead of through them
+  4. crossings are reduced with a few barycenter sweeps down and up (one pass over the
+     edges plus a sort per layer each), keeping whichever ordering had the fewest crossings
+     by a Fenwick-tree count
+
+Positions are in grid units (column, layer); the view scales them to pixels.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .play_state import indices
+
+SWEEPS = 4  # down+up barycenter passes (fewer if there's nothing left to uncross)
+MAX_DUMMIES = 50000  # past this, the longest edges are drawn straight instead of routed
+
+TASK_EDGE = "task"
+REWARD_EDGE = "reward"
+
+
+@dataclass
+class GraphLayout:
+    n: int                                                   # real nodes are 0..n-1, dummies after
+    layers: List[List[int]] = field(default_factory=list)    # node ids per layer, left to right
+    pos: Dict[int, Tuple[float, int]] = field(default_factory=dict)  # node -> (column, layer)
+    routes: List[Tuple[List[int], str]] = field(default_factory=list)  # (prereq .. dummies .. task, kind)
+    width: int = 0                                           # widest layer
+
+
+def prereq_edges(task_prereqs: Optional[Sequence], reward_prereqs: Optional[Sequence],
+                 n: int) -> List[Tuple[int, int, str]]:
+    """(prereq task, task, kind) for every in-range ref; reward #k counts as an edge from task k."""
+    edges = []
+    seen = set()
+    for kind, lists in ((TASK_EDGE, task_prereqs or ()), (REWARD_EDGE, reward_prereqs or ())):
+        for i, raw in enumerate(lists):
+            if i >= n or raw is None:
+                continue
+            for k in indices(str(raw)):
+                src = k - 1
+                if 0 <= src < n and src != i and (src, i, kind) not in seen:
+                    seen.add((src, i, kind))
+                    edges.append((src, i, kind))
+    return edges
+
+
+def acyclic(n: int, edges: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str, bool]]:
+    """Edges with a 'reversed' flag so the whole set is a DAG (iterative DFS, back edges flipped)."""
+    out_edges: List[List[int]] = [[] for _ in range(n)]
+    for e, (src, dst, _kind) in enumerate(edges):
+        out_edges[src].append(e)
+
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = [WHITE] * n
+    flipped = set()
+    for start in range(n):
+        if color[start] != WHITE:
+            continue
+        color[start] = GREY
+        stack = [(start, iter(out_edges[start]))]
+        while stack:
+            v, it = stack[-1]
+            e = next(it, None)
+            if e is None:
+                color[v] = BLACK
+                stack.pop()
+                continue
+            w = edges[e][1]
+            if color[w] == GREY:
+                flipped.add(e)
+            elif color[w] == WHITE:
+                color[w] = GREY
+                stack.append((w, iter(out_edges[w])))
+    return [(dst, src, kind, True) if e in flipped else (src, dst, kind, False)
+            for e, (src, dst, kind) in enumerate(edges)]
+
+
+def _longest_path_layers(n: int, dag: List[Tuple[int, int, str, bool]]) -> List[int]:
+    indeg = [0] * n
+    succ: List[List[int]] = [[] for _ in range(n)]
+    for src, dst, _kind, _rev in dag:
+        succ[src].append(dst)
+        indeg[dst] += 1
+    layer = [0] * n
+    queue = [v for v in range(n) if indeg[v] == 0]
+    head = 0
+    while head < len(queue):
+        v = queue[head]
+        head += 1
+        for w in succ[v]:
+            if layer[v] + 1 > layer[w]:
+                layer[w] = layer[v] + 1
+            indeg[w] -= 1
+            if indeg[w] == 0:
+                queue.append(w)
+    return layer
+
+
+def count_crossings(layers: List[List[int]], down: Dict[int, List[int]], order: List[float]) -> int:
+    """Edge crossings between adjacent layers: inversions counted with a Fenwick tree, O(E log V)."""
+    total = 0
+    for lay in layers[:-1]:
+        # lower ends of this layer's edges, taken in upper-end order
+        lower = []
+        for v in sorted(lay, key=order.__getitem__):
+            lower.extend(sorted(int(order[w]) for w in down.get(v, ())))
+        if len(lower) < 2:
+            continue
+        size = max(lower) + 1
+        tree = [0] * (size + 1)
+        seen = 0
+        for x in lower:
+            # how many already-seen ends lie strictly right of x
+            i, le = x + 1, 0
+            while i > 0:
+                le += tree[i]
+                i -= i & -i
+            total += seen - le
+            i = x + 1
+            while i <= size:
+                tree[i] += 1
+                i += i & -i
+            seen += 1
+    return total
+
+
+def layered_layout(n: int, edges: List[Tuple[int, int, str]], sweeps: int = SWEEPS) -> GraphLayout:
+    layout = GraphLayout(n)
+    if n == 0:
+        return layout
+
+    dag = acyclic(n, edges)
+    layer = _longest_path_layers(n, dag)
+
+    # ---- dummy nodes for long edges (shortest spans first, up to the cap) ----
+    up: Dict[int, List[int]] = {}    # node -> neighbours one layer above
+    down: Dict[int, List[int]] = {}  # node -> neighbours one layer below
+    node_layer = list(layer)
+    origin = list(range(n))  # initial ordering key: dummies sort next to the task they come from
+    budget = MAX_DUMMIES
+    routes = []
+    for src, dst, kind, rev in sorted(dag, key=lambda d: layer[d[1]] - layer[d[0]]):
+        span = layer[dst] - layer[src]
+        chain = [src]
+        if 1 < span <= budget + 1:
+            for lay in range(layer[src] + 1, layer[dst]):
+                d = len(node_layer)
+                node_layer.append(lay)
+                origin.append(src)
+                chain.append(d)
+            budget -= span - 1
+        chain.append(dst)
+        if span == 1 or len(chain) > 2:
+            for a, b in zip(chain, chain[1:]):
+                down.setdefault(a, []).append(b)
+                up.setdefault(b, []).append(a)
+        # routes always run prereq -> task, whichever way the layering had to see the edge
+        routes.append((chain[::-1] if rev else chain, kind))
+
+    layers: List[List[int]] = [[] for _ in range(max(node_layer) + 1)]
+    for v in sorted(range(len(node_layer)), key=lambda v: (origin[v], v)):
+        layers[node_layer[v]].append(v)
+
+    # ---- crossing reduction: barycenter sweeps ----
+    order = [0.0] * len(node_layer)
+
+    def number(lay: List[int]):
+        for i, v in enumerate(lay):
+            order[v] = i
+
+    for lay in layers:
+        number(lay)
+
+    def sweep(lay: List[int], neighbours: Dict[int, List[int]]):
+        def key(v):
+            ns = neighbours.get(v)
+            if not ns:
+                return order[v]  # no neighbours on that side: stay put
+            return sum(order[u] for u in ns) / len(ns)
+        lay.sort(key=key)
+        number(lay)
+
+    # alternate down and up; a sweep can undo gains elsewhere, so keep the best ordering seen
+    best = [list(lay) for lay in layers]
+    best_crossings = count_crossings(layers, down, order)
+    for step in range(2 * sweeps):
+        if best_crossings == 0:
+            break
+        if step % 2 == 0:
+            for lay in layers[1:]:
+                sweep(lay, up)
+        else:
+            for lay in reversed(layers[:-1]):
+                sweep(lay, down)
+        crossings = count_crossings(layers, down, order)
+        if crossings < best_crossings:
+            best, best_crossings = [list(lay) for lay in layers], crossings
+    layers = best
+
+    # ---- coordinates: layers centered on the widest one ----
+    width = max(len(lay) for lay in layers)
+    for li, lay in enumerate(layers):
+        offset = (width - len(lay)) / 2.0
+        for i, v in enumerate(lay):
+            layout.pos[v] = (i + offset, li)
+
+    layout.layers = layers
+    layout.routes = routes
+    layout.width = width
+    return layout
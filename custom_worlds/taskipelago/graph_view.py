@@ -0,0 +1,153 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .graph_layout import REWARD_EDGE, GraphLayout
+
+NODE_FONT = ("Segoe UI", 9)
+
+
+class PrereqGraphView(ttk.Frame):
+    """
+    Draws a GraphLayout on one tk.Canvas: a box per task, prereq -> task edges routed through
+    the layout's dummy points. Task prereqs are solid arrows, reward prereqs dashed.
+
+    set_graph() draws everything once; set_status() only recolors one box, so completing a
+    task never re-runs the layout. Clicking a box calls on_select(task index).
+    """
+
+    NODE_W = 150
+    NODE_H = 26
+    COL_GAP = 24
+    LAYER_GAP = 56
+    MARGIN = 20
+    MAX_LABEL = 22  # characters before a task name is cut with "…"
+
+    def __init__(self, parent, colors: dict, on_select: Optional[Callable] = None):
+        super().__init__(parent)
+        self.colors = colors
+        self.on_select = on_select
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, bg=colors.get("bg", "#1e1e1e"))
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.hsb = ttk.Scrollbar(self, orient="horizontal", command=self.canvas.xview)
+        self.canvas.configure(yscrollcommand=self.vsb.set, xscrollcommand=self.hsb.set)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.vsb.grid(row=0, column=1, sticky="ns")
+        self.hsb.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # mousewheel dispatch walks masters looking for this
+        self._scroll_owner = self
+        self.canvas._scroll_owner = self
+
+        # task index -> (box item, text item)
+        self._nodes: Dict[int, Tuple[int, int]] = {}
+        self._status: List[str] = []
+
+        self.canvas.tag_bind("node", "<Button-1>", self._on_click)
+        self.canvas.tag_bind("node", "<Enter>", lambda _e: self.canvas.configure(cursor="hand2"))
+        self.canvas.tag_bind("node", "<Leave>", lambda _e: self.canvas.configure(cursor=""))
+
+    # ---------- public API ----------
+    def set_graph(self, layout: GraphLayout, labels: Sequence[str], statuses: Sequence[str]):
+        cv = self.canvas
+        cv.delete("all")
+        self._nodes = {}
+        self._status = list(statuses)
+
+        border = self.colors.get("border", "#3a3a3a")
+        muted = self.colors.get("muted", "#bdbdbd")
+
+        # edges first so the boxes sit on top of them
+        for chain, kind in layout.routes:
+            points = self._route_points(layout, chain)
+            if kind == REWARD_EDGE:
+                cv.create_line(*points, fill=muted, dash=(4, 3), arrow="last", tags=("edge",))
+            else:
+                cv.create_line(*points, fill=border, width=1.5, arrow="last", tags=("edge",))
+
+        for i in range(layout.n):
+            x, y = self._center(layout, i)
+            text = labels[i] if i < len(labels) else f"Task {i + 1}"
+            text = f"{i + 1}. {text}"
+            if len(text) > self.MAX_LABEL:
+                text = text[:self.MAX_LABEL - 1] + "…"
+            fill, outline, text_fill = self._node_colors(self._status_of(i))
+            tags = ("node", f"n{i}")
+            box = cv.create_rectangle(x - self.NODE_W / 2, y - self.NODE_H / 2,
+                                      x + self.NODE_W / 2, y + self.NODE_H / 2,
+                                      fill=fill, outline=outline, tags=tags)
+            label = cv.create_text(x, y, text=text, font=NODE_FONT, fill=text_fill, tags=tags)
+            self._nodes[i] = (box, label)
+
+        w = 2 * self.MARGIN + max(1, layout.width) * (self.NODE_W + self.COL_GAP)
+        h = 2 * self.MARGIN + max(1, len(layout.layers)) * (self.NODE_H + self.LAYER_GAP)
+        cv.configure(scrollregion=(0, 0, w, h))
+        cv.xview_moveto(0.0)
+        cv.yview_moveto(0.0)
+
+    def set_status(self, i: int, status: str):
+        """Recolor one task's box (completion, locks opening); nothing moves."""
+        item = self._nodes.get(i)
+        if item is None:
+            return
+        if i < len(self._status):
+            self._status[i] = status
+        fill, outline, text_fill = self._node_colors(status)
+        box, label = item
+        self.canvas.itemconfigure(box, fill=fill, outline=outline)
+        self.canvas.itemconfigure(label, fill=text_fill)
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.canvas.configure(scrollregion=(0, 0, 0, 0))
+        self._nodes = {}
+        self._status = []
+
+    def yview_scroll(self, amount: int, what: str = "units"):
+        self.canvas.yview_scroll(amount, what)
+
+    # ---------- drawing ----------
+    def _status_of(self, i: int) -> str:
+        return self._status[i] if i < len(self._status) else "locked"
+
+    def _node_colors(self, status: str) -> Tuple[str, str, str]:
+        """(fill, outline, text) for a task state."""
+        panel = self.colors.get("panel", "#252526")
+        border = self.colors.get("border", "#3a3a3a")
+        fg = self.colors.get("fg", "#e6e6e6")
+        muted = self.colors.get("muted", "#bdbdbd")
+        if status == "completed":
+            return "#23382a", "#3f6b4a", muted
+        if status == "pending":
+            return "#3a3522", "#6b5f3a", muted
+        if status == "available":
+            return "#1f3a52", "#3c78a8", fg
+        return panel, border, muted  # locked
+
+    def _center(self, layout: GraphLayout, v: int) -> Tuple[float, float]:
+        col, lay = layout.pos[v]
+        x = self.MARGIN + col * (self.NODE_W + self.COL_GAP) + self.NODE_W / 2
+        y = self.MARGIN + lay * (self.NODE_H + self.LAYER_GAP) + self.NODE_H / 2
+        return x, y
+
+    def _route_points(self, layout: GraphLayout, chain: List[int]) -> List[float]:
+        pts = [self._center(layout, v) for v in chain]
+        # leave/enter the boxes through their top or bottom edge instead of their middle
+        half = self.NODE_H / 2
+        (x0, y0), y1 = pts[0], pts[1][1]
+        pts[0] = (x0, y0 + half if y1 > y0 else y0 - half)
+        ya, (xb, yb) = pts[-2][1], pts[-1]
+        pts[-1] = (xb, yb - half if yb > ya else yb + half)
+        return [c for p in pts for c in p]
+
+    # ---------- clicks ----------
+    def _on_click(self, _event):
+        if not callable(self.on_select):
+            return
+        for tag in self.canvas.gettags("current"):
+            if tag.startswith("n") and tag[1:].isdigit():
+                self.on_select(int(tag[1:]))
+                return
@@ -0,0 +1,251 @@
+"""
+Taskipelago without a window.
+
+Runs one or more slot sessions (see sessions.py) on a single asyncio loop and exposes a small
+JSON-lines control API, either on stdin/stdout (--stdio) or on a localhost TCP port (--port).
+One request per line, one reply per line:
+
+    {"cmd": "list_tasks"}                   # every slot; add "slot" for just one
+    {"cmd": "complete", "task": 3}          # 1-based, like the UI
+    {"cmd": "retry", "task": 3}
+    {"cmd": "status"}
+    {"cmd": "notifications", "limit": 20}
+    {"cmd": "metrics"}                      # counters/gauges/timings (see metrics.py)
+    {"cmd": "subscribe"}                    # stream {"event": ...} lines from now on
+    {"cmd": "unsubscribe"}
+    {"cmd": "add_slot", "server": "...", "slot": "...", "password": null}
+    {"cmd": "remove_slot"} / {"cmd": "disconnect"} / {"cmd": "connect"} / {"cmd": "quit"}
+
+Commands that act on one slot take "slot" (slot name, or "slot@server" when names clash); it can
+be left out while only one slot is hosted. An "id" field on a request is echoed back on its reply.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from typing import Callable, Dict, Optional
+
+from .context import spawn
+from .metrics import METRICS
+from .play_state import TaskState
+from .sessions import Session, SessionManager
+
+Sink = Callable[[dict], None]
+
+
+def _task_dict(st: TaskState) -> dict:
+    return {
+        "task": st.index + 1,
+        "name": st.name,
+        "reward": st.reward,
+        "status": st.status,
+        "task_prereqs": st.task_prereq_text,
+        "reward_prereqs": st.reward_prereq_text,
+        "task_prereqs_met": st.task_prereq_ok,
+        "reward_prereqs_met": st.reward_prereq_ok,
+    }
+
+
+class HeadlessClient:
+    def __init__(self, slots, max_notifications: int = 200):
+        """slots: iterable of (server, slot, password)"""
+        self._initial_slots = list(slots)
+        self.manager = SessionManager(on_event=self._on_session_event, max_notifications=max_notifications)
+
+        self._subscribers: Dict[int, Sink] = {}
+        self._stop: Optional[asyncio.Event] = None
+
+    # ---------------- lifecycle ----------------
+    async def run(self, port: Optional[int] = None, stdio: bool = False):
+        self._stop = asyncio.Event()
+        for server, slot, password in self._initial_slots:
+            self.manager.add(server, slot, password)
+        self.manager.start()
+
+        tcp = None
+        if port is not None:
+            tcp = await asyncio.start_server(self._handle_tcp, "127.0.0.1", port)
+            print(f"[Taskipelago] Headless control API on 127.0.0.1:{port}", file=sys.stderr)
+        if stdio:
+            self._start_stdio()
+
+        try:
+            await self._stop.wait()
+        finally:
+            if tcp is not None:
+                tcp.close()
+            await self.manager.shutdown()
+
+    def _on_session_event(self, session: Session, event: dict):
+        self._publish({**event, "slot": session.key})
+
+    # ---------------- control API ----------------
+    def _session(self, req: dict) -> Session:
+        session = self.manager.find(req.get("slot"))
+        if session is None:
+            raise LookupError("unknown slot" if req.get("slot") is not None else "slot is required")
+        return session
+
+    def handle_request(self, req: dict, sink: Sink) -> dict:
+        cmd = req.get("cmd")
+        try:
+            if cmd == "list_tasks":
+                if req.get("slot") is not None:
+                    session = self._session(req)
+                    pairs = [(session, st) for st in session.task_states()]
+                else:
+                    pairs = self.manager.combined_tasks()
+                return {"ok": True, "tasks": [{"slot": s.key, **_task_dict(st)} for s, st in pairs]}
+            if cmd in ("complete", "retry"):
+                session = self._session(req)
+                task = int(req.get("task"))
+                err = (session.complete if cmd == "complete" else session.retry)(task - 1)
+                return {"ok": False, "error": err} if err else {"ok": True}
+            if cmd == "status":
+                if req.get("slot") is not None:
+                    return {"ok": True, **self._session(req).status()}
+                return {"ok": True, **self.manager.status()}
+            if cmd == "notifications":
+                session = self._session(req)
+                limit = int(req.get("limit", 50))
+                notes = [n.to_dict() for _i, n in zip(range(limit), session.notifications.newest_first())]
+                return {"ok": True, "notifications": notes}
+            if cmd == "metrics":
+                return {"ok": True, **METRICS.snapshot()}
+            if cmd == "subscribe":
+                self._subscribers[id(sink)] = sink
+                return {"ok": True}
+            if cmd == "unsubscribe":
+                self._subscribers.pop(id(sink), None)
+                return {"ok": True}
+            if cmd == "add_slot":
+                server, slot = str(req["server"]).strip(), str(req["slot"]).strip()
+                if not server or not slot:
+                    raise ValueError("server and slot are required")
+                session = self.manager.add(server, slot, req.get("password") or None)
+                return {"ok": True, "slot": session.key}
+            if cmd == "remove_slot":
+                spawn(self.manager.remove(self._session(req).key))
+                return {"ok": True}
+            if cmd == "connect":
+                self._session(req).connect()
+                return {"ok": True}
+            if cmd == "disconnect":
+                spawn(self._session(req).disconnect())
+                return {"ok": True}
+            if cmd == "quit":
+                self._stop.set()
+                return {"ok": True}
+        except KeyError as e:
+            return {"ok": False, "error": f"bad request: missing {e.args[0]!r}"}
+        except LookupError as e:
+            return {"ok": False, "error": str(e)}
+        except (TypeError, ValueError) as e:
+            return {"ok": False, "error": f"bad request: {e}"}
+        return {"ok": False, "error": f"unknown command {cmd!r}"}
+
+    def _on_line(self, line: str, sink: Sink):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("expected an object")
+        except ValueError as e:
+            sink({"ok": False, "error": f"invalid json: {e}"})
+            return
+        reply = self.handle_request(req, sink)
+        reply["cmd"] = req.get("cmd")
+        if "id" in req:
+            reply["id"] = req["id"]
+        sink(reply)
+
+    def _publish(self, event: dict):
+        for key, sink in list(self._subscribers.items()):
+            try:
+                sink(event)
+            except Exception:
+                # dead connection
+                self._subscribers.pop(key, None)
+
+    # ---------------- transports ----------------
+    def _start_stdio(self):
+        # stdout carries the protocol; everything else (server_loop prints etc.) goes to stderr
+        out = sys.stdout
+        sys.stdout = sys.stderr
+        loop = asyncio.get_running_loop()
+
+        def sink(msg: dict):
+            out.write(json.dumps(msg) + "\n")
+            out.flush()
+
+        def reader():
+            for line in sys.stdin:
+                loop.call_soon_threadsafe(self._on_line, line, sink)
+            # stdin closed: nobody left to talk to
+            loop.call_soon_threadsafe(self._stop.set)
+
+        threading.Thread(target=reader, daemon=True).start()
+
+    async def _handle_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        def sink(msg: dict):
+            if writer.is_closing():
+                raise ConnectionError("closed")
+            writer.write((json.dumps(msg) + "\n").encode("utf-8"))
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self._on_line(line.decode("utf-8", errors="replace"), sink)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._subscribers.pop(id(sink), None)
+            writer.close()
+
+
+def _parse_slot(spec: str, default_server: Optional[str]):
+    """'Name' or 'Name@server:port'"""
+    slot, sep, server = spec.partition("@")
+    server = server if sep else default_server
+    if not slot.strip() or not server:
+        raise argparse.ArgumentTypeError(f"slot {spec!r} needs a server (--server or NAME@SERVER)")
+    return server.strip(), slot.strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="TaskipelagoHeadless", description="Taskipelago client without a UI.")
+    parser.add_argument("--server", default=None, help="server address, e.g. archipelago.gg:38281")
+    parser.add_argument("--slot", action="append", required=True,
+                        help="slot name, or NAME@SERVER; repeat to host several slots")
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--port", type=int, default=None, help="serve the control API on 127.0.0.1:PORT")
+    parser.add_argument("--stdio", action="store_true", help="serve the control API on stdin/stdout")
+    args = parser.parse_args(argv)
+
+    if args.port is None and not args.stdio:
+        args.stdio = True
+
+    try:
+        slots = [(*_parse_slot(spec, args.server), args.password) for spec in args.slot]
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    client = HeadlessClient(slots)
+    try:
+        asyncio.run(client.run(port=args.port, stdio=args.stdio))
+    except KeyboardInterrupt:
+        pass
+
+
+def launch(*args):
+    main(list(args))
+
+
+if __name__ == "__main__":
+    main()
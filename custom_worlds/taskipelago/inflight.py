@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class InflightRequest:
+    __slots__ = ("task_index", "locations", "reward_location", "sent_at", "attempts", "failed")
+
+    def __init__(self, task_index: int, locations: Tuple[int, ...], reward_location: int, sent_at: float):
+        self.task_index = task_index
+        self.locations = locations  # everything the LocationChecks carried
+        self.reward_location = reward_location  # the one we wait to see echoed back
+        self.sent_at = sent_at
+        self.attempts = 1
+        self.failed = False
+
+
+class InflightTable:
+    """
+    LocationChecks we've sent but the server hasn't confirmed yet.
+
+    A request is confirmed once its reward location shows up in the checked set. Until then,
+    due() hands back requests whose timeout ran out so the caller can resend them; the timeout
+    doubles per attempt and after max_attempts the request is marked failed (kept, so the UI can
+    offer a manual retry).
+    """
+
+    def __init__(self, timeout: float = 5.0, max_attempts: int = 4, backoff: float = 2.0):
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._by_task: Dict[int, InflightRequest] = {}
+        self._reward_locations: Set[int] = set()
+
+    def __len__(self):
+        return len(self._by_task)
+
+    def __contains__(self, task_index: int):
+        return task_index in self._by_task
+
+    def get(self, task_index: int):
+        return self._by_task.get(task_index)
+
+    def reward_locations(self) -> Set[int]:
+        return self._reward_locations
+
+    def add(self, task_index: int, locations: Iterable[int], reward_location: int, now: float) -> InflightRequest:
+        req = InflightRequest(task_index, tuple(locations), reward_location, now)
+        self._by_task[task_index] = req
+        self._reward_locations.add(reward_location)
+        return req
+
+    def _drop(self, req: InflightRequest):
+        self._by_task.pop(req.task_index, None)
+        self._reward_locations.discard(req.reward_location)
+
+    def confirm(self, checked: Set[int]) -> List[InflightRequest]:
+        done = [r for r in self._by_task.values() if r.reward_location in checked]
+        for r in done:
+            self._drop(r)
+        return done
+
+    def deadline(self, req: InflightRequest) -> float:
+        return req.sent_at + self.timeout * (self.backoff ** (req.attempts - 1))
+
+    def due(self, now: float) -> Tuple[List[InflightRequest], List[InflightRequest]]:
+        """Returns (to_resend, newly_failed). Resend candidates get their attempt counted here."""
+        resend, failed = [], []
+        for r in self._by_task.values():
+            if r.failed or now < self.deadline(r):
+                continue
+            if r.attempts >= self.max_attempts:
+                r.failed = True
+                failed.append(r)
+            else:
+                r.attempts += 1
+                r.sent_at = now
+                resend.append(r)
+        return resend, failed
+
+    def retry(self, task_index: int, now: float):
+        """Manual retry of a failed request: start its attempt budget over."""
+        r = self._by_task.get(task_index)
+        if r is None:
+            return None
+        r.failed = False
+        r.attempts = 1
+        r.sent_at = now
+        return r
+
+    def restart(self, now: float) -> List[InflightRequest]:
+        """After a reconnect: everything still unconfirmed goes out again with a fresh budget."""
+        for r in self._by_task.values():
+            r.failed = False
+            r.attempts = 1
+            r.sent_at = now
+        return list(self._by_task.values())
+
+    def clear(self):
+        self._by_task = {}
+        self._reward_locations = set()
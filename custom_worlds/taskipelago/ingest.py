@@ -0,0 +1,200 @@
+"""
+Bulk task import from CSV, TSV and Markdown checklists, without Tk.
+
+CSV/TSV: one task per row. With a header row, columns are matched by name (see COLUMNS);
+without one they're task, reward, reward type, prereqs, reward prereqs in that order.
+Prereqs are row numbers within the file ("2, 5"; ";" and spaces work too).
+
+Markdown: every "- [ ]" / "- [x]" item is a task ("*" and "+" bullets too), everything
+else is skipped. "Task text -> Reward" sets the reward. A nested item gets the item it's
+nested under as a prereq, so a syllabus outline unlocks top-down:
+
+    - [ ] Chapter 1 -> Pizza night
+      - [ ] Exercises 1.1-1.5        (needs Chapter 1)
+      - [ ] Exercises 1.6-1.9        (needs Chapter 1)
+    - [ ] Chapter 2
+
+The file is read line by line into TaskRecords; nothing touches widgets, so the client runs
+this on its worker thread and swaps the result into the TaskTable in one go.
+"""
+import csv
+import os
+import re
+from typing import Iterable, Iterator, List, Optional
+
+from .task_table import DEFAULT_REWARD_TYPE, FILLER_TOKEN, REWARD_TYPE_VALUES, TaskRecord
+from .yaml_io import Progress
+
+FORMATS = ("csv", "tsv", "markdown")
+FILE_TYPES = [
+    ("Task lists", "*.csv *.tsv *.tab *.md *.markdown *.txt"),
+    ("CSV", "*.csv"),
+    ("TSV", "*.tsv *.tab"),
+    ("Markdown checklist", "*.md *.markdown *.txt"),
+    ("All Files", "*.*"),
+]
+
+# header name (lowercased, "_"/"-" read as spaces) -> TaskRecord field
+COLUMNS = {
+    "task": "task", "tasks": "task", "name": "task", "title": "task",
+    "reward": "reward", "rewards": "reward", "challenge": "reward",
+    "reward type": "reward_type", "type": "reward_type", "reward types": "reward_type",
+    "prereqs": "prereqs", "task prereqs": "prereqs", "prereq": "prereqs", "depends on": "prereqs",
+    "requires": "prereqs",
+    "reward prereqs": "reward_prereqs", "reward prereq": "reward_prereqs",
+    "filler": "filler",
+}
+POSITIONAL = ("task", "reward", "reward_type", "prereqs", "reward_prereqs")
+
+PROGRESS_EVERY = 1000  # rows between progress updates
+SNIFF_LINES = 20  # lines looked at to guess the format of a file with no telling extension
+TAB_WIDTH = 4
+
+_CHECKLIST_RE = re.compile(r"^(?P<indent>[ \t]*)[-*+][ \t]+\[[ xX]\][ \t]*(?P<text>.*?)\s*$")
+_REWARD_SPLIT_RE = re.compile(r"\s+(?:->|→)\s+")
+_PREREQ_SPLIT_RE = re.compile(r"[,; ]+")
+
+
+def detect_format(path: str, head: Iterable[str] = ()) -> str:
+    """By extension, else by sniffing the first few lines."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".tsv", ".tab"):
+        return "tsv"
+    if ext in (".md", ".markdown"):
+        return "markdown"
+    head = [line for line in head if line.strip()]
+    if any(_CHECKLIST_RE.match(line) for line in head):
+        return "markdown"
+    return "tsv" if head and "\t" in head[0] else "csv"
+
+
+def _shift_prereqs(txt: str, offset: int) -> str:
+    """Normalize separators to "a,b" and move file row numbers past the rows already there."""
+    parts = [p for p in _PREREQ_SPLIT_RE.split(str(txt).strip()) if p]
+    out = []
+    for p in parts:
+        try:
+            out.append(str(int(p) + offset))
+        except ValueError:
+            out.append(p)  # left as typed; the validator flags it
+    return ",".join(out)
+
+
+def shift_records(records: List[TaskRecord], offset: int) -> List[TaskRecord]:
+    """Move file row numbers in prereqs past the offset rows already in the table, in place."""
+    if offset:
+        for rec in records:
+            rec.prereqs = _shift_prereqs(rec.prereqs, offset)
+            rec.reward_prereqs = _shift_prereqs(rec.reward_prereqs, offset)
+    return records
+
+
+def _record(task: str, reward: str = "", reward_type: str = "", prereqs: str = "",
+            reward_prereqs: str = "", filler: str = "", offset: int = 0) -> TaskRecord:
+    reward = reward.strip()
+    rt = reward_type.strip().lower()
+    if rt not in REWARD_TYPE_VALUES:
+        rt = DEFAULT_REWARD_TYPE
+    rec = TaskRecord(task=task.strip(), reward=reward, reward_type=rt, saved_reward_type=rt,
+                     prereqs=_shift_prereqs(prereqs, offset),
+                     reward_prereqs=_shift_prereqs(reward_prereqs, offset))
+    if reward == FILLER_TOKEN or filler.strip().lower() in ("1", "true", "yes", "y", "x"):
+        rec.reward = "" if reward == FILLER_TOKEN else reward
+        rec.set_filler(True)
+    return rec
+
+
+# ----------------------------
+# CSV / TSV
+# ----------------------------
+def _header_fields(row: List[str]) -> Optional[List[Optional[str]]]:
+    fields = [COLUMNS.get(re.sub(r"[_\-\s]+", " ", cell.strip().lower())) for cell in row]
+    return fields if "task" in fields else None
+
+
+def iter_delimited(lines: Iterable[str], delimiter: str = ",", offset: int = 0) -> Iterator[TaskRecord]:
+    fields: Optional[List[Optional[str]]] = None
+    first = True
+    for row in csv.reader(lines, delimiter=delimiter):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if first:
+            first = False
+            fields = _header_fields(row)
+            if fields is not None:
+                continue
+        if fields is None:
+            values = dict(zip(POSITIONAL, row))
+        else:
+            values = {f: cell for f, cell in zip(fields, row) if f is not None}
+        if not values.get("task", "").strip():
+            continue
+        yield _record(offset=offset, **values)
+
+
+# ----------------------------
+# Markdown checklists
+# ----------------------------
+def _indent_width(indent: str) -> int:
+    return len(indent.expandtabs(TAB_WIDTH))
+
+
+def iter_checklist(lines: Iterable[str], offset: int = 0) -> Iterator[TaskRecord]:
+    # (indent width, 1-based task number) for the items we're nested under
+    parents: List[tuple] = []
+    number = 0
+    for line in lines:
+        m = _CHECKLIST_RE.match(line)
+        if not m or not m.group("text"):
+            continue
+        width = _indent_width(m.group("indent"))
+        while parents and parents[-1][0] >= width:
+            parents.pop()
+
+        parts = _REWARD_SPLIT_RE.split(m.group("text"), maxsplit=1)
+        task = parts[0]
+        reward = parts[1] if len(parts) > 1 else ""
+        prereqs = str(parents[-1][1]) if parents else ""
+
+        number += 1
+        parents.append((width, number))
+        yield _record(task, reward, prereqs=prereqs, offset=offset)
+
+
+# ----------------------------
+# Files
+# ----------------------------
+def read_task_file(path: str, fmt: Optional[str] = None, offset: int = 0,
+                   progress: Optional[Progress] = None) -> List[TaskRecord]:
+    """
+    All tasks in a file. offset is how many rows the table already has (prereq numbers in
+    the file are shifted past them when appending). Raises ValueError with a user-facing message.
+    """
+    name = os.path.basename(path)
+    if progress is not None:
+        progress.phase = f"Reading {name}"
+    try:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            if fmt is None:
+                fmt = detect_format(path, [f.readline() for _ in range(SNIFF_LINES)])
+                f.seek(0)
+            if fmt == "markdown":
+                records = iter_checklist(f, offset)
+            elif fmt in ("csv", "tsv"):
+                records = iter_delimited(f, "\t" if fmt == "tsv" else ",", offset)
+            else:
+                raise ValueError(f"Unknown task list format {fmt!r} (expected one of {', '.join(FORMATS)}).")
+
+            out = []
+            for rec in records:
+                out.append(rec)
+                if progress is not None and len(out) % PROGRESS_EVERY == 0:
+                    progress.phase = f"Reading {name}: {len(out)} tasks"
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        raise ValueError(f"Failed to read {name}:\n{e}") from e
+
+    if not out:
+        raise ValueError(f"No tasks found in {name}.")
+    return out
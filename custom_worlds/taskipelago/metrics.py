@@ -0,0 +1,154 @@
+"""
+In-process counters, gauges and timing histograms for the client.
+
+    from .metrics import METRICS
+    METRICS.inc("packets.ReceivedItems")
+    with METRICS.timer("refresh.play"):
+        ...
+
+Everything goes into one process-wide registry (the Tk thread and the asyncio loop both
+write to it, so updates take a lock). snapshot() is a plain dict; the diagnostics window
+shows it and export_jsonl() appends it to a file so a "it's laggy" report can come with
+numbers attached.
+"""
+from collections import deque
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Callable, Dict, List
+
+# recent samples kept per histogram for percentiles; count/sum/max cover all of them
+HISTOGRAM_SAMPLES = 1024
+
+
+def percentiles(samples: List[float]) -> dict:
+    if not samples:
+        return {"n": 0}
+    s = sorted(samples)
+
+    def pct(p):
+        return s[min(len(s) - 1, int(p * len(s)))]
+
+    return {"n": len(s), "p50_ms": pct(0.50) * 1000, "p95_ms": pct(0.95) * 1000,
+            "p99_ms": pct(0.99) * 1000, "max_ms": s[-1] * 1000}
+
+
+class Histogram:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=HISTOGRAM_SAMPLES)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.recent.append(seconds)
+
+    def to_dict(self) -> dict:
+        out = percentiles(list(self.recent))
+        out["n"] = self.count
+        out["mean_ms"] = (self.total / self.count * 1000) if self.count else 0.0
+        out["max_ms"] = self.max * 1000
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        # gauges read when a snapshot is taken (widget counts, queue depths, ...)
+        self._gauge_fns: Dict[str, Callable[[], float]] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def gauge_fn(self, name: str, fn: Callable[[], float]):
+        with self._lock:
+            self._gauge_fns[name] = fn
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            h = self.histograms.get(name)
+            if h is None:
+                h = self.histograms[name] = Histogram()
+            h.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            fns = list(self._gauge_fns.items())
+        gauges = {}
+        for name, fn in fns:
+            try:
+                gauges[name] = fn()
+            except Exception:
+                # a gauge whose widget is gone; leave it out
+                pass
+        with self._lock:
+            gauges.update(self.gauges)
+            return {
+                "time": time.time(),
+                "uptime_s": round(time.time() - self.started, 3),
+                "counters": dict(sorted(self.counters.items())),
+                "gauges": dict(sorted(gauges.items())),
+                "histograms": {k: h.to_dict() for k, h in sorted(self.histograms.items())},
+            }
+
+    def export_jsonl(self, path: Path, extra: dict = None) -> dict:
+        snap = self.snapshot()
+        if extra:
+            snap.update(extra)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(snap) + "\n")
+        return snap
+
+    def format_text(self, snap: dict = None) -> str:
+        """Plain-text table for the diagnostics window."""
+        snap = snap or self.snapshot()
+        lines = [f"uptime {snap['uptime_s']:.0f}s", "", "GAUGES"]
+        for k, v in snap["gauges"].items():
+            lines.append(f"  {k:<34}{v:>12g}")
+        lines += ["", "COUNTERS"]
+        for k, v in snap["counters"].items():
+            lines.append(f"  {k:<34}{v:>12}")
+        lines += ["", f"TIMINGS (ms){'n':>26}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for k, h in snap["histograms"].items():
+            if not h.get("n"):
+                continue
+            lines.append(f"  {k:<30}{h['n']:>10}{h.get('p50_ms', 0):>9.2f}{h.get('p95_ms', 0):>9.2f}"
+                         f"{h.get('p99_ms', 0):>9.2f}{h['max_ms']:>9.2f}")
+        return "\n".join(lines)
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,585 @@
+"""
+A stand-in Archipelago server for load testing the client without a live room.
+
+MockRoom speaks just enough of the protocol for server_loop / TaskipelagoContext: RoomInfo,
+Connect -> Connected (synthetic Taskipelago slot_data), GetDataPackage, Sync, LocationChecks ->
+RoomUpdate, Bounce -> Bounced. On top of that it can push load at configurable rates:
+ReceivedItems floods, RoomUpdate streams, DeathLink storms and dropped connections.
+
+    python -m worlds.taskipelago.mockserver --serve --port 38281 --tasks 500 --items-per-second 200
+    python -m worlds.taskipelago.mockserver --load --duration 30 --sessions 4 --deathlinks-per-second 5
+
+--serve runs a websocket server the normal client can connect to. --load starts the server
+and drives SessionManager sessions against it, then prints client-side processing latency
+per command plus memory use. --direct skips the websocket and feeds commands straight into
+process_server_cmd, for quick runs and tests.
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass
+import json
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import BASE_COMPLETE_LOC_ID, BASE_ITEM_ID, BASE_REWARD_LOC_ID, BASE_TOKEN_ID
+from .metrics import percentiles
+
+MOCK_GAME = "Mock Game"
+SEED_NAME = "mock-seed"
+
+
+@dataclass
+class MockConfig:
+    tasks: int = 100
+    other_players: int = 7
+    mock_items: int = 500               # item ids in the other players' data package
+    initial_items: int = 0              # already received when a slot first connects
+    items_per_second: float = 0.0       # ReceivedItems flood
+    item_batch: int = 25                # items per ReceivedItems packet
+    room_updates_per_second: float = 0.0
+    deathlinks_per_second: float = 0.0
+    deathlink_burst: int = 1            # Bounced packets per storm tick
+    drop_every: float = 0.0             # seconds between forced disconnects, 0 = never
+    seed: Optional[int] = None
+
+
+def _slot_data(cfg: MockConfig, rng: random.Random) -> dict:
+    n = cfg.tasks
+    prereqs = []
+    for i in range(n):
+        # a sparse chain-ish prereq graph, always pointing backwards
+        prereqs.append(str(rng.randint(1, i)) if i and rng.random() < 0.3 else "")
+    return {
+        "tasks": [f"Mock task {i + 1}" for i in range(n)],
+        "rewards": [f"Mock reward {i + 1}" if i % 5 else "" for i in range(n)],
+        "reward_types": ["item" if i % 5 else "filler" for i in range(n)],
+        "task_prereqs": prereqs,
+        "reward_prereqs": [""] * n,
+        "lock_prereqs": True,
+        "death_link_pool": [f"Punishment {i + 1}" for i in range(10)],
+        "death_link_weights": [1] * 10,
+        "death_link_amnesty": 0,
+        "death_link_enabled": True,
+        "base_reward_location_id": BASE_REWARD_LOC_ID,
+        "base_complete_location_id": BASE_COMPLETE_LOC_ID,
+        "base_item_id": BASE_ITEM_ID,
+        "base_token_id": BASE_TOKEN_ID,
+    }
+
+
+class _SlotState:
+    def __init__(self, slot: int, name: str):
+        self.slot = slot
+        self.name = name
+        self.items: List[list] = []  # [item, location, player, flags]
+        self.checked = set()
+
+
+class MockRoom:
+    """
+    Transport-free server logic. handle() takes one client command and returns the replies;
+    the load generators produce unsolicited commands. Every outgoing command carries a
+    "mock_ts" (time.time() when it was produced) so the client side can measure delivery lag.
+    """
+
+    def __init__(self, cfg: MockConfig):
+        self.cfg = cfg
+        self.rng = random.Random(cfg.seed)
+        self.slot_data = _slot_data(cfg, self.rng)
+        self._slots: Dict[str, _SlotState] = {}
+        self._next_slot = cfg.other_players + 1
+        self.sent = 0
+
+    # ---------- helpers ----------
+    def _stamp(self, cmd: dict) -> dict:
+        cmd["mock_ts"] = time.time()
+        self.sent += 1
+        return cmd
+
+    def slot_for(self, name: str) -> _SlotState:
+        st = self._slots.get(name)
+        if st is None:
+            st = self._slots[name] = _SlotState(self._next_slot, name)
+            self._next_slot += 1
+            for _ in range(self.cfg.initial_items):
+                st.items.append(self._random_item())
+        return st
+
+    def _random_item(self) -> list:
+        i = self.rng.randrange(self.cfg.tasks)
+        sender = self.rng.randint(1, max(1, self.cfg.other_players))
+        return [BASE_ITEM_ID + i, self.rng.randint(1, self.cfg.mock_items), sender, 0]
+
+    def _players(self) -> list:
+        players = [{"class": "NetworkPlayer", "team": 0, "slot": i, "alias": f"Other{i}", "name": f"Other{i}"}
+                   for i in range(1, self.cfg.other_players + 1)]
+        players += [{"class": "NetworkPlayer", "team": 0, "slot": st.slot, "alias": st.name, "name": st.name}
+                    for st in self._slots.values()]
+        return players
+
+    def _slot_info(self) -> dict:
+        info = {str(i): {"class": "NetworkSlot", "name": f"Other{i}", "game": MOCK_GAME, "type": 1,
+                         "group_members": []}
+                for i in range(1, self.cfg.other_players + 1)}
+        info.update({str(st.slot): {"class": "NetworkSlot", "name": st.name, "game": "Taskipelago", "type": 1,
+                                    "group_members": []}
+                     for st in self._slots.values()})
+        return info
+
+    def _data_package(self, games) -> dict:
+        packages = {}
+        if "Taskipelago" in games:
+            packages["Taskipelago"] = {
+                "item_name_to_id": {**{f"Reward {i + 1}": BASE_ITEM_ID + i for i in range(self.cfg.tasks)},
+                                    **{f"Task Complete {i + 1}": BASE_TOKEN_ID + i for i in range(self.cfg.tasks)}},
+                "location_name_to_id": {**{f"Task {i + 1} (Reward)": BASE_REWARD_LOC_ID + i for i in range(self.cfg.tasks)},
+                                        **{f"Task {i + 1} (Complete)": BASE_COMPLETE_LOC_ID + i for i in range(self.cfg.tasks)}},
+                "checksum": f"mock-taskipelago-{self.cfg.tasks}",
+            }
+        if MOCK_GAME in games:
+            packages[MOCK_GAME] = {
+                "item_name_to_id": {f"Mock Item {i}": i for i in range(1, self.cfg.mock_items + 1)},
+                "location_name_to_id": {f"Mock Location {i}": i for i in range(1, self.cfg.mock_items + 1)},
+                "checksum": f"mock-game-{self.cfg.mock_items}",
+            }
+        return {"games": packages}
+
+    # ---------- protocol ----------
+    def room_info(self) -> dict:
+        return self._stamp({
+            "cmd": "RoomInfo",
+            "version": [0, 5, 0],
+            "generator_version": [0, 5, 0],
+            "tags": ["AP", "Mock"],
+            "password": False,
+            "permissions": {"release": 2, "collect": 2, "remaining": 2},
+            "hint_cost": 10,
+            "location_check_points": 1,
+            "games": ["Taskipelago", MOCK_GAME],
+            "datapackage_checksums": {"Taskipelago": f"mock-taskipelago-{self.cfg.tasks}",
+                                      MOCK_GAME: f"mock-game-{self.cfg.mock_items}"},
+            "seed_name": SEED_NAME,
+            "time": time.time(),
+        })
+
+    def handle(self, conn: "MockConnection", msg: dict) -> List[dict]:
+        cmd = msg.get("cmd")
+        if cmd == "Connect":
+            st = self.slot_for(str(msg.get("name") or "Tasker"))
+            conn.slot = st
+            all_locs = ([BASE_REWARD_LOC_ID + i for i in range(self.cfg.tasks)]
+                        + [BASE_COMPLETE_LOC_ID + i for i in range(self.cfg.tasks)])
+            return [
+                self._stamp({
+                    "cmd": "Connected",
+                    "team": 0,
+                    "slot": st.slot,
+                    "players": self._players(),
+                    "missing_locations": [loc for loc in all_locs if loc not in st.checked],
+                    "checked_locations": sorted(st.checked),
+                    "slot_data": self.slot_data,
+                    "slot_info": self._slot_info(),
+                    "hint_points": 0,
+                }),
+                self._stamp({"cmd": "ReceivedItems", "index": 0, "items": list(st.items)}),
+            ]
+        if conn.slot is None:
+            return []
+        st = conn.slot
+        if cmd == "GetDataPackage":
+            return [self._stamp({"cmd": "DataPackage", "data": self._data_package(msg.get("games") or [])})]
+        if cmd == "Sync":
+            return [self._stamp({"cmd": "ReceivedItems", "index": 0, "items": list(st.items)})]
+        if cmd == "LocationChecks":
+            new = [loc for loc in msg.get("locations") or [] if loc not in st.checked]
+            st.checked.update(new)
+            return [self._stamp({"cmd": "RoomUpdate", "checked_locations": new})] if new else []
+        if cmd == "Bounce":
+            return [self._stamp({"cmd": "Bounced", **{k: v for k, v in msg.items() if k != "cmd"}})]
+        # ConnectUpdate, StatusUpdate, Say, ... are accepted and ignored
+        return []
+
+    # ---------- load ----------
+    def item_flood(self, conn: "MockConnection") -> dict:
+        st = conn.slot
+        start = len(st.items)
+        st.items.extend(self._random_item() for _ in range(self.cfg.item_batch))
+        return self._stamp({"cmd": "ReceivedItems", "index": start, "items": st.items[start:]})
+
+    def room_update(self, conn: "MockConnection") -> dict:
+        return self._stamp({"cmd": "RoomUpdate", "players": self._players(), "hint_points": 0})
+
+    def deathlink(self) -> dict:
+        source = f"Other{self.rng.randint(1, max(1, self.cfg.other_players))}"
+        return self._stamp({
+            "cmd": "Bounced",
+            "tags": ["DeathLink"],
+            "data": {"time": time.time(), "source": source, "cause": f"{source} tripped over a mock."},
+        })
+
+
+class MockConnection:
+    """One connected client. Subclasses deliver commands over some transport."""
+
+    def __init__(self, room: MockRoom):
+        self.room = room
+        self.slot: Optional[_SlotState] = None
+        self.closed = False
+
+    async def send(self, cmds: List[dict]):
+        raise NotImplementedError
+
+    async def close(self):
+        self.closed = True
+
+    async def receive(self, msgs: List[dict]):
+        replies = []
+        for msg in msgs:
+            replies.extend(self.room.handle(self, msg))
+        if replies:
+            await self.send(replies)
+
+    async def run_load(self):
+        """Unsolicited traffic at the configured rates until the connection goes away."""
+        cfg = self.room.cfg
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        due = {
+            "items": cfg.item_batch / cfg.items_per_second if cfg.items_per_second > 0 else None,
+            "room": 1.0 / cfg.room_updates_per_second if cfg.room_updates_per_second > 0 else None,
+            "deathlink": 1.0 / cfg.deathlinks_per_second if cfg.deathlinks_per_second > 0 else None,
+        }
+        next_at = {k: start + v for k, v in due.items() if v is not None}
+        drop_at = start + cfg.drop_every if cfg.drop_every > 0 else None
+
+        while not self.closed:
+            if self.slot is None:
+                await asyncio.sleep(0.01)
+                continue
+            now = loop.time()
+            if drop_at is not None and now >= drop_at:
+                await self.close()
+                return
+            out = []
+            for kind, at in list(next_at.items()):
+                if now < at:
+                    continue
+                next_at[kind] = at + due[kind]
+                if kind == "items":
+                    out.append(self.room.item_flood(self))
+                elif kind == "room":
+                    out.append(self.room.room_update(self))
+                else:
+                    out.extend(self.room.deathlink() for _ in range(max(1, cfg.deathlink_burst)))
+            if out:
+                await self.send(out)
+            wake = min(list(next_at.values()) + ([drop_at] if drop_at is not None else []), default=now + 0.05)
+            await asyncio.sleep(max(0.0, min(0.05, wake - loop.time())))
+
+
+# ----------------------------
+# Websocket transport
+# ----------------------------
+class _WebsocketConnection(MockConnection):
+    def __init__(self, room: MockRoom, ws):
+        super().__init__(room)
+        self.ws = ws
+
+    async def send(self, cmds: List[dict]):
+        if self.closed:
+            return
+        try:
+            await self.ws.send(json.dumps(cmds))
+        except Exception:
+            self.closed = True
+
+    async def close(self):
+        self.closed = True
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+
+
+class MockServer:
+    def __init__(self, cfg: MockConfig, host: str = "127.0.0.1", port: int = 0):
+        self.room = MockRoom(cfg)
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        import websockets
+
+        self._server = await websockets.serve(self._handler, self.host, self.port, ping_interval=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    @property
+    def address(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, ws, _path=None):
+        conn = _WebsocketConnection(self.room, ws)
+        await conn.send([self.room.room_info()])
+        load = asyncio.create_task(conn.run_load())
+        try:
+            async for data in ws:
+                await conn.receive(json.loads(data))
+        except Exception:
+            pass
+        finally:
+            conn.closed = True
+            load.cancel()
+
+
+# ----------------------------
+# Direct transport (no sockets)
+# ----------------------------
+class _DirectSocket:
+    """Stands in for the websocket on ctx.server so send_msgs() lands in the mock room."""
+
+    def __init__(self, conn: "_DirectConnection"):
+        self.conn = conn
+
+    @property
+    def open(self) -> bool:
+        return not self.conn.closed
+
+    async def send(self, data):
+        await self.conn.receive(json.loads(data))
+
+    async def close(self):
+        await self.conn.close()
+
+
+class _DirectConnection(MockConnection):
+    def __init__(self, room: MockRoom, ctx):
+        super().__init__(room)
+        self.ctx = ctx
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def send(self, cmds: List[dict]):
+        if not self.closed:
+            self._queue.put_nowait(cmds)
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            self._queue.put_nowait(None)
+
+    async def serve(self):
+        """What server_loop does for a real socket."""
+        import CommonClient
+        from NetUtils import Endpoint, decode
+
+        from .events import DISCONNECTED
+        from .replay import recorder_for
+
+        self.ctx.server = Endpoint(_DirectSocket(self))
+        self.ctx._deathlink_tag_enabled = False
+        load = asyncio.create_task(self.run_load())
+        recorder = recorder_for(self.ctx, "mock")
+        if recorder is not None:
+            recorder.mark("connect")
+        try:
+            await self.send([self.room.room_info()])
+            await self.ctx.send_connect()
+            while True:
+                cmds = await self._queue.get()
+                if cmds is None:
+                    break
+                # round-trip through JSON so the context sees what a socket would have delivered
+                for msg in decode(json.dumps(cmds)):
+                    if recorder is not None:
+                        recorder.record(msg)
+                    await CommonClient.process_server_cmd(self.ctx, msg)
+        finally:
+            if recorder is not None:
+                recorder.mark("disconnect")
+            load.cancel()
+            self.ctx.server = None
+            self.ctx.events.post(DISCONNECTED)
+
+
+# ----------------------------
+# Load driver
+# ----------------------------
+class LatencyProbe:
+    """Wraps ctx.on_package to time each command and how long it took to arrive."""
+
+    def __init__(self):
+        self.processing: Dict[str, List[float]] = {}
+        self.delivery: Dict[str, List[float]] = {}
+
+    def attach(self, ctx):
+        inner = ctx.on_package
+
+        def on_package(cmd, args):
+            start = time.perf_counter()
+            sent = args.get("mock_ts") if isinstance(args, dict) else None
+            if isinstance(sent, (int, float)):
+                self.delivery.setdefault(cmd, []).append(max(0.0, time.time() - sent))
+            try:
+                return inner(cmd, args)
+            finally:
+                self.processing.setdefault(cmd, []).append(time.perf_counter() - start)
+
+        ctx.on_package = on_package
+
+    def report(self) -> dict:
+        return {
+            cmd: {"processing": percentiles(self.processing.get(cmd, [])),
+                  "delivery": percentiles(self.delivery.get(cmd, []))}
+            for cmd in sorted(set(self.processing) | set(self.delivery))
+        }
+
+
+def _rss_kb() -> Optional[int]:
+    try:
+        import resource
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except Exception:
+        return None
+
+
+async def run_load_test(cfg: MockConfig, duration: float = 10.0, sessions: int = 1, direct: bool = False,
+                        reconnect: bool = True) -> dict:
+    """
+    Drive `sessions` headless sessions against a mock room for `duration` seconds.
+    Returns latency percentiles per command, event/notification counts and memory figures.
+    """
+    from .sessions import SessionManager
+    from .notifications import NotificationHistory
+    from . import sessions as sessions_mod
+
+    tracemalloc.start()
+    tmp = Path(tempfile.mkdtemp(prefix="taskipelago_mock_"))
+    probe = LatencyProbe()
+    counts: Dict[str, int] = {}
+
+    def on_event(_session, event):
+        counts[event["event"]] = counts.get(event["event"], 0) + 1
+        if event["event"] == "disconnected" and reconnect and _session.key in manager.sessions:
+            # come straight back, like a user hitting Connect again
+            asyncio.get_running_loop().call_later(0.2, _session.connect)
+
+    server = None
+    room = MockRoom(cfg)
+    if not direct:
+        server = MockServer(cfg)
+        server.room = room
+        await server.start()
+        address = server.address
+    else:
+        address = "mock"
+
+        async def direct_loop(ctx, _address):
+            await _DirectConnection(room, ctx).serve()
+
+        sessions_mod.server_loop = direct_loop
+
+    manager = SessionManager(on_event=on_event)
+    try:
+        for i in range(sessions):
+            s = manager.add(address, f"Tasker{i + 1}", connect=False)
+            s.ctx._notify_state_path = tmp / "notify_state.json"
+            s.history = NotificationHistory(tmp / f"history_{i + 1}.jsonl")
+            probe.attach(s.ctx)
+            s.connect()
+        manager.start()
+
+        start = time.perf_counter()
+        await asyncio.sleep(duration)
+        elapsed = time.perf_counter() - start
+
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            "duration_s": elapsed,
+            "sessions": sessions,
+            "server_commands": room.sent,
+            "commands": probe.report(),
+            "events": counts,
+            "items_received": sum(len(getattr(s.ctx, "items_received", []) or []) for s in manager),
+            "notifications": sum(len(s.notifications) for s in manager),
+            "event_bus": {s.key: {"dropped": s.ctx.events.dropped, "coalesced": s.ctx.events.coalesced}
+                          for s in manager},
+            "memory": {"traced_kb": current // 1024, "traced_peak_kb": peak // 1024, "max_rss_kb": _rss_kb()},
+        }
+    finally:
+        await manager.shutdown()
+        if server is not None:
+            await server.stop()
+        if direct:
+            from .context import server_loop
+            sessions_mod.server_loop = server_loop
+        tracemalloc.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return report
+
+
+def _print_report(report: dict):
+    print(f"{report['sessions']} session(s), {report['duration_s']:.1f}s, "
+          f"{report['server_commands']} server commands, {report['items_received']} items, "
+          f"{report['notifications']} notifications kept")
+    print(f"{'command':<16}{'n':>8}  processing ms: {'p50':>7}{'p95':>8}{'p99':>8}{'max':>8}   lag p95 ms")
+    for cmd, r in report["commands"].items():
+        p, d = r["processing"], r["delivery"]
+        if not p.get("n"):
+            continue
+        print(f"{cmd:<16}{p['n']:>8}{'':>17}{p['p50_ms']:>7.2f}{p['p95_ms']:>8.2f}{p['p99_ms']:>8.2f}"
+              f"{p['max_ms']:>8.2f}{d.get('p95_ms', 0.0):>13.2f}")
+    print("events:", report["events"])
+    print("event bus:", report["event_bus"])
+    print("memory:", report["memory"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="TaskipelagoMockServer", description="Local mock Archipelago server.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--serve", action="store_true", help="run a websocket server until interrupted")
+    mode.add_argument("--load", action="store_true", help="run a load test against an in-process server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=38281)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--sessions", type=int, default=1)
+    parser.add_argument("--direct", action="store_true", help="load test without websockets")
+    parser.add_argument("--json", action="store_true", help="print the load report as JSON")
+    for field, default in MockConfig.__dataclass_fields__.items():
+        kind = type(default.default) if default.default is not None else int
+        parser.add_argument(f"--{field.replace('_', '-')}", type=kind, default=default.default)
+    args = parser.parse_args(argv)
+
+    cfg = MockConfig(**{f: getattr(args, f) for f in MockConfig.__dataclass_fields__})
+
+    if args.serve:
+        async def serve():
+            server = await MockServer(cfg, args.host, args.port).start()
+            print(f"[Taskipelago] Mock server on {server.address} ({cfg.tasks} tasks)")
+            await asyncio.Event().wait()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+        return
+
+    report = asyncio.run(run_load_test(cfg, args.duration, args.sessions, direct=args.direct))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
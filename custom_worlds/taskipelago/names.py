@@ -0,0 +1,182 @@
+from typing import Dict, Optional, Tuple
+
+from .task_table import FILLER_TOKEN
+
+# marker for item ids that should never produce a notification (completion tokens, filler)
+_SUPPRESSED = ""
+
+
+class RoomNameCache:
+    """Data-package names memoized per (item_id, slot). Identical for every slot of a room."""
+
+    def __init__(self):
+        self.items: Dict[Tuple[int, Optional[int]], Optional[str]] = {}
+        self.users = 0
+
+
+class NameCachePool:
+    """Hands out one RoomNameCache per room so sessions connected to the same room share it."""
+
+    def __init__(self):
+        self._rooms: Dict[Tuple[str, str], RoomNameCache] = {}
+
+    def __len__(self):
+        return len(self._rooms)
+
+    def acquire(self, room_key: Tuple[str, str]) -> RoomNameCache:
+        cache = self._rooms.get(room_key)
+        if cache is None:
+            cache = self._rooms[room_key] = RoomNameCache()
+        cache.users += 1
+        return cache
+
+    def release(self, room_key: Tuple[str, str]):
+        cache = self._rooms.get(room_key)
+        if cache is None:
+            return
+        cache.users -= 1
+        if cache.users <= 0:
+            del self._rooms[room_key]
+
+
+class NameResolver:
+    """
+    Item-id -> display name and slot-id -> player name tables for one connection.
+
+    Rebuilt by TaskipelagoContext when Connected / DataPackage / RoomUpdate arrive, and only when
+    the inputs actually changed. Lookups afterwards are plain dict hits; names from the
+    server's data package are memoized on first use, in a RoomNameCache when one is attached.
+    """
+
+    def __init__(self):
+        self._slot_fp = None
+        self._players_fp = None
+
+        self._rewards: Tuple[str, ...] = ()
+        self._overrides: Dict[int, str] = {}  # Taskipelago reward/token ids
+        self._global: Dict[Tuple[int, Optional[int]], Optional[str]] = {}
+        self.room_key = None
+        self._players: Dict[int, str] = {}
+
+        self._item_names = None
+        self._our_slot = None
+
+    # ---------- building ----------
+    def attach(self, room_key, cache: RoomNameCache):
+        """Use a room-wide memo instead of a private one (multi-slot sessions)."""
+        self.room_key = room_key
+        self._global = cache.items
+
+    def refresh(self, ctx, data_package_changed: bool = False) -> bool:
+        """Rebuild whatever part of the tables is stale. Returns True if anything changed."""
+        changed = False
+
+        rewards = tuple(str(r).strip() for r in (getattr(ctx, "rewards", None) or []))
+        base_item = getattr(ctx, "base_item_id", None)
+        base_token = getattr(ctx, "base_token_id", None)
+        n_tasks = len(getattr(ctx, "tasks", None) or [])
+        slot_fp = (rewards, n_tasks, base_item, base_token, getattr(ctx, "slot", None))
+
+        if slot_fp != self._slot_fp or data_package_changed:
+            self._slot_fp = slot_fp
+            self._rewards = rewards
+            self._item_names = getattr(ctx, "item_names", None)
+            self._our_slot = getattr(ctx, "slot", None)
+
+            overrides: Dict[int, str] = {}
+            if isinstance(base_token, int):
+                for i in range(n_tasks):
+                    overrides[base_token + i] = _SUPPRESSED
+            if isinstance(base_item, int):
+                for i, text in enumerate(rewards):
+                    overrides[base_item + i] = _SUPPRESSED if (not text or text == FILLER_TOKEN) else text
+            self._overrides = overrides
+            if data_package_changed or self.room_key is None:
+                # in place: an attached memo is shared with the other slots of this room
+                self._global.clear()
+            changed = True
+
+        players_fp = self._players_fingerprint(ctx)
+        if players_fp != self._players_fp:
+            self._players_fp = players_fp
+            self._players = dict(players_fp)
+            changed = True
+
+        return changed
+
+    @staticmethod
+    def _players_fingerprint(ctx) -> Tuple[Tuple[int, str], ...]:
+        names: Dict[int, str] = {}
+
+        # slot_info first, player_names (aliases) win when present
+        slot_info = getattr(ctx, "slot_info", None)
+        if hasattr(slot_info, "items"):
+            for slot_id, info in slot_info.items():
+                if isinstance(info, dict):
+                    name = info.get("name") or info.get("slot_name") or info.get("player_name")
+                else:
+                    name = getattr(info, "name", None) or getattr(info, "slot_name", None)
+                if isinstance(name, str) and name.strip():
+                    names[slot_id] = name.strip()
+
+        player_names = getattr(ctx, "player_names", None)
+        if hasattr(player_names, "items"):
+            for slot_id, name in player_names.items():
+                if isinstance(name, str) and name.strip():
+                    names[slot_id] = name.strip()
+
+        return tuple(sorted(names.items(), key=lambda kv: str(kv[0])))
+
+    # ---------- lookups ----------
+    def item_name(self, item_id, slot: Optional[int] = None) -> Optional[str]:
+        """
+        Display name for an item, or None if it shouldn't be shown (tokens, filler, unknown ids).
+        slot is the slot whose game the item belongs to; defaults to ours.
+        """
+        if not isinstance(item_id, int):
+            return None
+
+        override = self._overrides.get(item_id)
+        if override is not None:
+            return override or None
+
+        if slot is None:
+            slot = self._our_slot
+        key = (item_id, slot)
+        if key in self._global:
+            return self._global[key]
+
+        name = self._lookup_global(item_id, slot)
+        if name is not None:
+            name = str(name).strip()
+            # server-side names can still be ours (older seeds without base_token_id in slot data)
+            if not name or name == FILLER_TOKEN or name.startswith("Task Complete ") or name.startswith("Unknown "):
+                name = None
+        self._global[key] = name
+        return name
+
+    def _lookup_global(self, item_id: int, slot: Optional[int]):
+        item_names = self._item_names
+        if item_names is None:
+            return None
+        try:
+            if hasattr(item_names, "lookup_in_slot"):
+                return item_names.lookup_in_slot(item_id, slot)
+            if hasattr(item_names, "get"):
+                return item_names.get(item_id)
+        except Exception:
+            return None
+        return None
+
+    def suppressed(self, item_id) -> bool:
+        return self._overrides.get(item_id) == _SUPPRESSED
+
+    def reward_text(self, task_index: int) -> Optional[str]:
+        if 0 <= task_index < len(self._rewards):
+            return self._rewards[task_index] or None
+        return None
+
+    def player_name(self, slot_id) -> str:
+        if slot_id is None:
+            return "Unknown"
+        return self._players.get(slot_id) or f"Player {slot_id}"
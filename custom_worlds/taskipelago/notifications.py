@@ -0,0 +1,356 @@
+import json
+import os
+from pathlib import Path
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from .metrics import METRICS
+
+# ReceivedItems deltas with at least this many new rewards get folded into summary notifications
+REWARD_BURST_THRESHOLD = 8
+
+# notification history file size before it's rotated out to <name>.1
+HISTORY_MAX_BYTES = 8 * 1024 * 1024
+
+
+class Notification:
+    __slots__ = ("kind", "title", "body", "created_at", "id", "details")
+
+    def __init__(self, kind: str, title: str, body: str, created_at: float, id: int = 0, details: tuple = ()):
+        self.kind = kind  # "reward" | "deathlink" | "sent"
+        self.title = title
+        self.body = body
+        self.created_at = created_at  # time.time()
+        self.id = id  # assigned by NotificationStore.add
+        self.details = details  # individual entries folded into a summary notification
+
+    def to_dict(self) -> dict:
+        d = {"id": self.id, "kind": self.kind, "title": self.title, "body": self.body, "created_at": self.created_at}
+        if self.details:
+            d["details"] = list(self.details)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Notification":
+        return cls(
+            kind=str(d.get("kind", "")),
+            title=str(d.get("title", "")),
+            body=str(d.get("body", "")),
+            created_at=float(d.get("created_at", 0.0) or 0.0),
+            id=int(d.get("id", 0) or 0),
+            details=tuple(str(x) for x in d.get("details") or ()),
+        )
+
+    def __repr__(self):
+        return f"Notification(id={self.id}, kind={self.kind!r}, title={self.title!r})"
+
+
+# ----------------------------
+# In-memory ring buffer
+# ----------------------------
+class NotificationStore:
+    """
+    Fixed-capacity ring of live notifications.
+    add/dismiss are O(1); a full ring overwrites (and returns) the oldest entry.
+    Dismissed entries leave a hole that the next wrap-around reuses.
+    """
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = max(1, int(capacity))
+        self._slots: List[Optional[Notification]] = [None] * self.capacity
+        self._head = 0  # next slot to write
+        self._by_id = {}  # id -> slot position
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def add(self, n: Notification) -> Tuple[Notification, Optional[Notification]]:
+        """Store n (assigning its id). Returns (n, evicted_or_None)."""
+        n.id = self._next_id
+        self._next_id += 1
+
+        evicted = self._slots[self._head]
+        if evicted is not None:
+            self._by_id.pop(evicted.id, None)
+
+        self._slots[self._head] = n
+        self._by_id[n.id] = self._head
+        self._head = (self._head + 1) % self.capacity
+        return n, evicted
+
+    def get(self, notif_id: int) -> Optional[Notification]:
+        pos = self._by_id.get(notif_id)
+        return None if pos is None else self._slots[pos]
+
+    def dismiss(self, notif_id: int) -> bool:
+        pos = self._by_id.pop(notif_id, None)
+        if pos is None:
+            return False
+        self._slots[pos] = None
+        return True
+
+    def clear(self):
+        self._slots = [None] * self.capacity
+        self._by_id = {}
+        self._head = 0
+
+    def newest_first(self) -> Iterator[Notification]:
+        for k in range(1, self.capacity + 1):
+            n = self._slots[(self._head - k) % self.capacity]
+            if n is not None:
+                yield n
+
+
+# ----------------------------
+# Persistent history (JSON lines)
+# ----------------------------
+class NotificationHistory:
+    """
+    Append-only JSON-lines log of every notification ever shown.
+    Only byte offsets are kept in memory; pages are read with a seek.
+
+    Once the file passes max_bytes it is moved to <name>.1 (replacing the previous one) and a
+    fresh file is started, so neither the file nor the offset list grows forever.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = HISTORY_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._offsets: Optional[List[int]] = None  # start offset of each line, built lazily
+        self._end = 0
+
+    def _scan(self):
+        offsets = []
+        pos = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        offsets.append(pos)
+                    pos += len(line)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # unreadable history shouldn't take the client down
+            offsets = []
+        self._offsets = offsets
+        self._end = pos
+
+    def __len__(self):
+        if self._offsets is None:
+            self._scan()
+        return len(self._offsets)
+
+    def append(self, n: Notification) -> None:
+        self.append_many([n])
+
+    def append_many(self, notes) -> None:
+        lines = [(json.dumps(n.to_dict(), ensure_ascii=False) + "\n").encode("utf-8") for n in notes]
+        if not lines:
+            return
+        try:
+            if self._offsets is None:
+                self._scan()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with METRICS.timer("persist.history"), open(self.path, "ab") as f:
+                pos = f.tell()
+                f.write(b"".join(lines))
+            for line in lines:
+                self._offsets.append(pos)
+                pos += len(line)
+            self._end = pos
+            if self.max_bytes and self._end > self.max_bytes:
+                self._rotate()
+        except Exception:
+            # Don't crash the client for a persistence failure
+            pass
+
+    def _rotate(self):
+        os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+        self._offsets = []
+        self._end = 0
+
+    def page_count(self, page_size: int) -> int:
+        total = len(self)
+        return max(1, (total + page_size - 1) // page_size)
+
+    def page(self, page_no: int, page_size: int = 50) -> List[Notification]:
+        """Page 0 is the newest page_size entries, newest first."""
+        total = len(self)
+        hi = total - page_no * page_size
+        lo = max(0, hi - page_size)
+        if hi <= 0:
+            return []
+
+        start = self._offsets[lo]
+        stop = self._offsets[hi] if hi < total else self._end
+        out = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(start)
+                chunk = f.read(stop - start)
+            for raw in chunk.splitlines():
+                if not raw.strip():
+                    continue
+                try:
+                    out.append(Notification.from_dict(json.loads(raw.decode("utf-8"))))
+                except Exception:
+                    continue
+        except Exception:
+            return []
+        out.reverse()
+        return out
+
+
+# ----------------------------
+# Building notifications
+# ----------------------------
+class RewardNotifier:
+    """
+    Turns ReceivedItems deltas into reward notifications: name resolution through a NameResolver,
+    a short dedupe window for double deliveries, and burst folding into per-sender summaries.
+    """
+
+    def __init__(self, burst_threshold: int = REWARD_BURST_THRESHOLD):
+        self.burst_threshold = burst_threshold
+        self._last_key = None
+        self._last_seen_at = 0.0
+
+    def build(self, new_items, names) -> List[Notification]:
+        out: List[Notification] = []
+        entries = []  # (resolved_name, sender, sender_label)
+        for it in new_items:
+            item_id = getattr(it, "item", None)
+            sender = getattr(it, "player", None)
+            loc = getattr(it, "location", None)
+
+            # If we can't even read an item id, enqueue a debug notification
+            if item_id is None:
+                out.append(Notification(
+                    kind="reward",
+                    title="Reward Received (unparsed)",
+                    body=f"Got a reward event but couldn't parse fields:\n{it!r}",
+                    created_at=time.time()
+                ))
+                continue
+
+            # Tokens, filler and ids we can't name resolve to None: no popup
+            resolved_name = names.item_name(item_id)
+            if resolved_name is None:
+                continue
+
+            # ---- dedupe the popup ----
+            key = (item_id, sender, loc)
+            now = time.time()
+            if key == self._last_key and (now - self._last_seen_at) < 1.5:
+                continue
+            self._last_key = key
+            self._last_seen_at = now
+
+            sender_label = names.player_name(sender) if sender is not None else None
+            entries.append((resolved_name, sender, sender_label))
+
+        if len(entries) >= self.burst_threshold:
+            out.extend(self._summaries(entries))
+            return out
+
+        out.extend(
+            Notification(
+                kind="reward",
+                title="Reward Received!",
+                body=(f"{resolved_name}\n\n(from player {sender_label})" if sender is not None else resolved_name),
+                created_at=time.time()
+            )
+            for resolved_name, sender, sender_label in entries
+        )
+        return out
+
+    @staticmethod
+    def _summaries(entries) -> List[Notification]:
+        """
+        Big ReceivedItems deltas (first connect, long offline stretch) become one summary card per
+        sender with per-item counts. The individual entries ride along as expandable details.
+        """
+        by_sender = {}
+        for resolved_name, sender, sender_label in entries:
+            group = by_sender.setdefault(sender, {"label": sender_label, "counts": {}, "details": []})
+            group["counts"][resolved_name] = group["counts"].get(resolved_name, 0) + 1
+            group["details"].append(resolved_name)
+
+        now = time.time()
+        summaries = []
+        # biggest senders end up on top
+        for sender, group in sorted(by_sender.items(), key=lambda kv: len(kv[1]["details"])):
+            counts = sorted(group["counts"].items(), key=lambda kv: (-kv[1], kv[0]))
+            lines = [f"{cnt}× {name}" if cnt > 1 else name for name, cnt in counts]
+            body = "\n".join(lines)
+            if sender is not None:
+                body += f"\n\n(from player {group['label']})"
+            total = len(group["details"])
+            summaries.append(Notification(
+                kind="reward",
+                title=f"{total} Rewards Received!",
+                body=body,
+                created_at=now,
+                details=tuple(group["details"]),
+            ))
+        return summaries
+
+
+def sent_notification(task_index: int, task_label: Optional[str], reward_name: str, recipient_name: str) -> Notification:
+    body_lines = []
+    if task_label:
+        body_lines.append(f"Task {task_index+1}: {task_label}")
+        body_lines.append("")  # spacer line
+    body_lines.append(str(reward_name))
+    body_lines.append("")
+    body_lines.append(f"(sent to {recipient_name})")
+
+    return Notification(
+        kind="sent",
+        title="Reward Sent!",
+        body="\n".join(body_lines),
+        created_at=time.time()
+    )
+
+
+def deathlink_notification(burst) -> Notification:
+    """burst: [(bounce data, assigned task), ...] from DeathLinkEngine.flush()"""
+    if len(burst) == 1:
+        data, task = burst[0]
+        source = data.get("source") or "Unknown"
+        cause = data.get("cause") or ""
+
+        detail_text = f"From: {source}"
+        if cause:
+            detail_text += f"\n{cause}"
+
+        return Notification(
+            kind="deathlink",
+            title="DEATHLINK!",
+            body=f"{detail_text}\n\nTask: {task}",
+            created_at=time.time()
+        )
+
+    sources = []
+    task_counts = {}
+    details = []
+    for data, task in burst:
+        source = data.get("source") or "Unknown"
+        if source not in sources:
+            sources.append(source)
+        task_counts[task] = task_counts.get(task, 0) + 1
+        cause = data.get("cause") or ""
+        details.append(f"{source}: {cause} -> {task}" if cause else f"{source} -> {task}")
+
+    shown = ", ".join(sources[:3]) + (f" (+{len(sources) - 3} more)" if len(sources) > 3 else "")
+    tasks = [f"{cnt}× {task}" if cnt > 1 else task for task, cnt in task_counts.items()]
+
+    return Notification(
+        kind="deathlink",
+        title=f"{len(burst)} DEATHLINKS!",
+        body=f"From: {shown}\n\nTasks:\n" + "\n".join(tasks),
+        created_at=time.time(),
+        details=tuple(details),
+    )
@@ -0,0 +1,295 @@
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from .analysis import PrereqAnalysis
+from .events import DEATHLINK, DISCONNECTED, ITEMS, STATE
+from .inflight import InflightTable
+from .notifications import (
+    Notification, NotificationHistory, NotificationStore, RewardNotifier, deathlink_notification, sent_notification,
+)
+from .play_state import (
+    TaskState, all_rewards_checked, compute_task_states, location_item_and_player,
+    received_item_ids, sent_reward_name, slot_ready, task_state,
+)
+from .task_table import FILLER_TOKEN
+
+INFLIGHT_CHECK_INTERVAL = 1.0  # seconds between looks at unconfirmed LocationChecks
+
+# what observers get: fn(kind, payload)
+CONNECTED = "connected"          # None
+STATE_CHANGED = "state"          # None; task states may have changed, refresh what you show
+TASK_CHANGED = "task"            # task index; just this task changed (optimistic complete, retry)
+COMPLETED = "completed"          # task index; the server confirmed our check
+FAILED = "failed"                # task index; gave up resending, task shows a retry
+GOAL = "goal"                    # None; goal StatusUpdate sent
+NOTIFICATION = "notification"    # (Notification, evicted Notification or None)
+LOST_CONNECTION = "disconnected"  # reason string or None; the server side went away
+
+Observer = Callable[[str, object], None]
+
+
+class PlayModel:
+    """
+    Everything the Play tab knows about a slot, minus Tk: connection state, in-flight checks,
+    goal detection, notifications. The Tk app, headless sessions and bench.py all drive this.
+
+    Feed it the context's events with pump(); it tells observers what changed. Sending goes
+    through send(msgs), so the owner decides which thread/loop ctx.send_msgs runs on.
+    Not thread-safe: call it from one thread (the Tk thread, or the loop for headless).
+    """
+
+    def __init__(self, ctx=None, *, send: Optional[Callable[[list], object]] = None,
+                 history_path: Optional[Path] = None, max_notifications: int = 200,
+                 clock: Callable[[], float] = time.monotonic, label: str = ""):
+        self.ctx = ctx
+        self.send = send
+        self.clock = clock
+        self.label = label
+
+        self.connection_state = "disconnected"
+        self.sent_goal = False
+
+        # LocationChecks sent that the server hasn't echoed back yet
+        self.inflight = InflightTable()
+        self.notifications = NotificationStore(max_notifications)
+        self.history = NotificationHistory(history_path or Path.cwd() / "taskipelago_notify_history.jsonl")
+        self._reward_notifier = RewardNotifier()
+
+        # Dedupe "sent" notifications for double clicks
+        self._last_sent_key = None
+        self._last_sent_seen_at = 0.0
+
+        # prereq fan-out for "best next", rebuilt when the slot's task list changes
+        self._analysis: Optional[PrereqAnalysis] = None
+        self._analysis_tasks = None
+
+        self._observers: List[Observer] = []
+        self._next_inflight_check = 0.0
+        self._inflight_slot = None  # (seed, team, slot) the in-flight checks were sent for
+
+    # ---------------- observers ----------------
+    def subscribe(self, fn: Observer):
+        self._observers.append(fn)
+
+    def unsubscribe(self, fn: Observer):
+        if fn in self._observers:
+            self._observers.remove(fn)
+
+    def _emit(self, kind: str, payload=None):
+        for fn in list(self._observers):
+            fn(kind, payload)
+
+    # ---------------- connection ----------------
+    def connecting(self):
+        self.connection_state = "connecting"
+        self.sent_goal = False
+
+    def disconnected(self):
+        """We hung up (or are about to); no LOST_CONNECTION event. Unconfirmed checks are dropped."""
+        self.connection_state = "disconnected"
+        self.sent_goal = False
+        self.inflight.clear()
+
+    # ---------------- network events ----------------
+    def pump(self, events=None):
+        """Handle the context's queued events (or the given (kind, payload) list)."""
+        ctx = self.ctx
+        if ctx is None:
+            return
+        if events is None:
+            events = ctx.events.drain()
+
+        state_changed = False
+        received = []
+        for kind, payload in events:
+            if kind == STATE:
+                state_changed = True
+            elif kind == ITEMS:
+                received.extend(payload)
+            elif kind == DEATHLINK:
+                ctx.deathlink.receive(payload, self.clock())
+            elif kind == DISCONNECTED:
+                self._on_lost_connection()
+
+        # one refresh per pump no matter how many Connected/Sync/RoomUpdate arrived
+        if state_changed:
+            self._on_state()
+        if received:
+            self.notify(self._reward_notifier.build(received, ctx.names))
+
+        now = self.clock()
+        burst = ctx.deathlink.flush(now)
+        if burst:
+            self.notify([deathlink_notification(burst)])
+
+        if now >= self._next_inflight_check:
+            self._next_inflight_check = now + INFLIGHT_CHECK_INTERVAL
+            self.check_inflight()
+
+    def _on_state(self):
+        ctx = self.ctx
+        reconnected = self.connection_state == "connecting"
+        if reconnected:
+            self.connection_state = "connected"
+            self._emit(CONNECTED)
+
+        slot = (getattr(ctx, "seed_name", None), getattr(ctx, "team", None), getattr(ctx, "slot", None))
+        if slot != self._inflight_slot:
+            # checks left over from another slot's session mean nothing here (STATE_CHANGED redraws)
+            self.inflight.clear()
+            self._inflight_slot = slot
+
+        checked = getattr(ctx, "checked_locations_set", set()) or set()
+        for req in self.inflight.confirm(checked):
+            self._emit(COMPLETED, req.task_index)
+
+        if reconnected:
+            # checks sent before the connection dropped may never have reached the server
+            for req in self.inflight.restart(self.clock()):
+                self._send_location_checks(req.locations)
+                self._emit(TASK_CHANGED, req.task_index)
+
+        if not self.sent_goal and all_rewards_checked(self.ctx):
+            self.sent_goal = True
+            self._send([{"cmd": "StatusUpdate", "status": 30}])  # CLIENT_GOAL
+            self._emit(GOAL)
+
+        self._emit(STATE_CHANGED)
+
+    def _on_lost_connection(self):
+        if self.connection_state == "disconnected":
+            # we hung up ourselves; disconnected() already cleaned up
+            return
+        # unlike hanging up, unconfirmed checks are kept: the next Connected resends them
+        self.connection_state = "disconnected"
+        self.sent_goal = False
+        self._emit(LOST_CONNECTION, getattr(self.ctx, "_last_disconnect_reason", None))
+
+    # ---------------- notifications ----------------
+    def notify(self, notes) -> List[Notification]:
+        """Store and persist right away; observers decide when to draw them."""
+        added = []
+        evictions = []
+        for n in notes:
+            n, evicted = self.notifications.add(n)
+            added.append(n)
+            evictions.append(evicted)
+        self.history.append_many(added)
+        for n, evicted in zip(added, evictions):
+            self._emit(NOTIFICATION, (n, evicted))
+        return added
+
+    # ---------------- tasks ----------------
+    def task_states(self) -> List[TaskState]:
+        return compute_task_states(self.ctx, self.inflight, self.inflight.reward_locations())
+
+    def task_state(self, i: int, checked=None, have_items=None) -> TaskState:
+        if checked is None:
+            checked = set(getattr(self.ctx, "checked_locations_set", set()) or set())
+        if have_items is None:
+            have_items = received_item_ids(self.ctx)
+        return task_state(self.ctx, i, checked, have_items, self.inflight, self.inflight.reward_locations())
+
+    def analysis(self, states: Optional[List[TaskState]] = None) -> Optional[PrereqAnalysis]:
+        """The slot's prereq analysis (see analysis.py), caught up with completed and pending tasks."""
+        ctx = self.ctx
+        if not slot_ready(ctx):
+            self._analysis = self._analysis_tasks = None
+            return None
+        if self._analysis is None or self._analysis_tasks is not ctx.tasks:
+            self._analysis = PrereqAnalysis.for_slot(ctx)
+            self._analysis_tasks = ctx.tasks
+        if states is None:
+            states = self.task_states()
+        self._analysis.sync(st.index for st in states if st.completed or st.pending)
+        return self._analysis
+
+    def complete(self, task_index: int) -> Optional[str]:
+        """Returns an error string, or None once the checks are on their way."""
+        ctx = self.ctx
+        if self.connection_state != "connected" or not slot_ready(ctx):
+            return "not connected"
+        if not (0 <= task_index < len(ctx.tasks)):
+            return "no such task"
+
+        reward_loc_id = ctx.base_reward_location_id + task_index
+        complete_loc_id = ctx.base_complete_location_id + task_index
+        checked = getattr(ctx, "checked_locations_set", set()) or set()
+        if reward_loc_id in checked:
+            return "already completed"
+        if task_index in self.inflight:
+            return "already pending"
+
+        st = self.task_state(task_index)
+        if st.locked:
+            return "prerequisites not met"
+
+        # optimism: this task shows as pending until the server confirms the check
+        self.inflight.add(task_index, (complete_loc_id, reward_loc_id), reward_loc_id, self.clock())
+        self._emit(TASK_CHANGED, task_index)
+
+        try:
+            now = time.time()
+            sent_key = ("sent", reward_loc_id)
+            if sent_key != self._last_sent_key or (now - self._last_sent_seen_at) > 1.0:
+                item_id, recipient_id = location_item_and_player(ctx, reward_loc_id)
+                reward_name = sent_reward_name(ctx, item_id, task_index, recipient_id)
+
+                # Skip if filler
+                if reward_name and reward_name.strip() != FILLER_TOKEN:
+                    recipient_name = ctx.names.player_name(recipient_id) if recipient_id is not None else "Unknown"
+                    self.notify([sent_notification(task_index, ctx.tasks[task_index], reward_name, recipient_name)])
+                    self._last_sent_key = sent_key
+                    self._last_sent_seen_at = now
+        except Exception:
+            pass
+
+        # IMPORTANT: send BOTH checks in one click
+        self._send_location_checks([complete_loc_id, reward_loc_id])
+        return None
+
+    def retry(self, task_index: int) -> Optional[str]:
+        req = self.inflight.retry(task_index, self.clock())
+        if req is None:
+            return "task is not pending"
+        self._send_location_checks(req.locations)
+        self._emit(TASK_CHANGED, task_index)
+        return None
+
+    def check_inflight(self):
+        # nothing to resend into while we're offline; the next Connected resends them all
+        if not len(self.inflight) or self.connection_state != "connected" or not getattr(self.ctx, "server", None):
+            return
+        resend, failed = self.inflight.due(self.clock())
+        for req in resend:
+            who = f"{self.label}: " if self.label else ""
+            print(f"[Taskipelago] {who}Resending check for task {req.task_index + 1} (attempt {req.attempts})",
+                  file=sys.stderr)
+            self._send_location_checks(req.locations)
+        for req in failed:
+            self._emit(FAILED, req.task_index)
+
+    def _send_location_checks(self, locations):
+        self._send([{"cmd": "LocationChecks", "locations": list(locations)}])
+
+    def _send(self, msgs: list):
+        if self.send is not None:
+            self.send(msgs)
+
+    def status(self, states: Optional[List[TaskState]] = None) -> dict:
+        if states is None:
+            states = self.task_states()
+        counts = {"available": 0, "locked": 0, "pending": 0, "completed": 0}
+        for st in states:
+            counts[st.status] += 1
+        analysis = self.analysis(states)
+        best = analysis.best_next(st.index for st in states if st.status == "available") if analysis else []
+        return {
+            "connection": self.connection_state,
+            "tasks": len(states),
+            **counts,
+            "best_next": best[0] + 1 if best else None,
+            "goal_sent": self.sent_goal,
+        }
@@ -0,0 +1,242 @@
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Set
+
+
+@dataclass(slots=True)
+class TaskState:
+    index: int  # 0-based
+    name: str
+    reward: str
+    completed: bool
+    pending: bool  # sent, waiting for the server to confirm
+    task_prereq_text: str
+    reward_prereq_text: str
+    task_prereq_ok: bool
+    reward_prereq_ok: bool
+    locked: bool  # lock_prereqs is on and something's missing
+
+    @property
+    def can_complete(self) -> bool:
+        return not self.completed and not self.pending and not self.locked
+
+    @property
+    def status(self) -> str:
+        if self.completed:
+            return "completed"
+        if self.pending:
+            return "pending"
+        return "locked" if self.locked else "available"
+
+
+def indices(prereq_text: str) -> List[int]:
+    """'1, 2,x,5' -> [1, 2, 5] (1-based, junk ignored like before)"""
+    out = []
+    for p in prereq_text.split(","):
+        p = p.strip()
+        if not p:
+            continue
+        try:
+            out.append(int(p))
+        except ValueError:
+            continue
+    return out
+
+
+def received_item_ids(ctx) -> Set[int]:
+    """
+    Best-effort extraction of received item IDs from common AP client context shapes.
+    Returns a set of integer item ids.
+    """
+    if not ctx:
+        return set()
+
+    candidates = None
+    for attr in ("items_received", "received_items"):
+        v = getattr(ctx, attr, None)
+        if isinstance(v, (list, tuple)):
+            candidates = v
+            break
+
+    if not candidates:
+        return set()
+
+    out = set()
+    for it in candidates:
+        # Many AP clients store items as objects with .item, sometimes tuples.
+        item_id = getattr(it, "item", None)
+        if isinstance(item_id, int):
+            out.add(item_id)
+            continue
+        if isinstance(it, (tuple, list)) and it:
+            # try first element if it looks like an int item id
+            if isinstance(it[0], int):
+                out.add(it[0])
+    return out
+
+
+def prereqs_satisfied(ctx, prereq_text: str, checked_locations: Set[int]) -> bool:
+    """
+    prereq_text: "1,2,5" meaning tasks 1/2/5 must be completed first.
+    Completion is represented by COMPLETE locations being checked.
+    """
+    if not prereq_text or ctx.base_complete_location_id is None:
+        return True
+    for idx_1based in indices(prereq_text):
+        if ctx.base_complete_location_id + (idx_1based - 1) not in checked_locations:
+            return False
+    return True
+
+
+def reward_prereqs_satisfied(ctx, prereq_text: str, checked_locations: Set[int], have_items: Optional[Set[int]] = None,
+                             pending_reward_locations: Iterable[int] = ()) -> bool:
+    """
+    prereq_text: "1,2,5" meaning Reward #1/#2/#5 must have been obtained.
+    Prefer checking received item IDs if base_item_id is present.
+    Fallback: treat reward locations being checked as satisfying the reward prereq.
+    """
+    if not prereq_text:
+        return True
+
+    base_item_id = getattr(ctx, "base_item_id", None)
+    if isinstance(base_item_id, int):
+        have = have_items if have_items is not None else received_item_ids(ctx)
+        for idx_1based in indices(prereq_text):
+            if base_item_id + (idx_1based - 1) not in have:
+                return False
+        return True
+
+    # Fallback: if we don't know item ids, approximate with reward locations checked/pending.
+    if ctx.base_reward_location_id is None:
+        return True
+
+    for idx_1based in indices(prereq_text):
+        loc = ctx.base_reward_location_id + (idx_1based - 1)
+        if (loc not in checked_locations) and (loc not in pending_reward_locations):
+            return False
+    return True
+
+
+def slot_ready(ctx) -> bool:
+    return bool(
+        ctx
+        and ctx.tasks
+        and ctx.base_reward_location_id is not None
+        and ctx.base_complete_location_id is not None
+    )
+
+
+def task_state(ctx, i: int, checked: Set[int], have_items: Set[int], pending_tasks=(), pending_reward_locations=()) -> TaskState:
+    reward_loc_id = ctx.base_reward_location_id + i
+    complete_loc_id = ctx.base_complete_location_id + i
+
+    # Consider "completed" when reward location is checked (the one that sends items)
+    completed = (complete_loc_id in checked) or (reward_loc_id in checked)
+
+    prereq_list = ctx.task_prereqs or []
+    reward_prereq_list = ctx.reward_prereqs or []
+
+    # task prereqs satisfied based on COMPLETE locations (completion tokens)
+    task_prereq_text = ""
+    task_prereq_ok = True
+    if i < len(prereq_list):
+        raw = prereq_list[i]
+        task_prereq_text = ("" if raw is None else str(raw)).strip()
+        if task_prereq_text:
+            task_prereq_ok = prereqs_satisfied(ctx, task_prereq_text, checked)
+
+    reward_prereq_text = ""
+    reward_prereq_ok = True
+    if i < len(reward_prereq_list):
+        raw = reward_prereq_list[i]
+        reward_prereq_text = ("" if raw is None else str(raw)).strip()
+        if reward_prereq_text:
+            reward_prereq_ok = reward_prereqs_satisfied(ctx, reward_prereq_text, checked, have_items, pending_reward_locations)
+
+    rewards = ctx.rewards or []
+    return TaskState(
+        index=i,
+        name=str(ctx.tasks[i]),
+        reward=str(rewards[i]) if i < len(rewards) else "",
+        completed=completed,
+        pending=(not completed) and (i in pending_tasks),
+        task_prereq_text=task_prereq_text,
+        reward_prereq_text=reward_prereq_text,
+        task_prereq_ok=task_prereq_ok,
+        reward_prereq_ok=reward_prereq_ok,
+        locked=bool(ctx.lock_prereqs) and not (task_prereq_ok and reward_prereq_ok),
+    )
+
+
+def compute_task_states(ctx, pending_tasks=(), pending_reward_locations=()) -> List[TaskState]:
+    if not slot_ready(ctx):
+        return []
+    checked = set(getattr(ctx, "checked_locations_set", set()) or set())
+    have = received_item_ids(ctx)
+    return [task_state(ctx, i, checked, have, pending_tasks, pending_reward_locations) for i in range(len(ctx.tasks))]
+
+
+def all_rewards_checked(ctx) -> bool:
+    """Goal condition: every reward location of this slot is checked."""
+    if not slot_ready(ctx):
+        return False
+    checked = getattr(ctx, "checked_locations_set", set()) or set()
+    base = ctx.base_reward_location_id
+    return all((base + i) in checked for i in range(len(ctx.tasks)))
+
+
+def location_item_and_player(ctx, loc_id: int):
+    """
+    Best-effort read of scouted location info from context.
+    Returns: (item_id|None, player_id|None)
+    """
+    if not ctx:
+        return None, None
+
+    # Different AP clients / versions store this differently.
+    candidates = [
+        "location_info",
+        "locations_info",
+        "locations_info_cache",
+        "location_infos",
+        "scouted_locations",
+    ]
+
+    for attr in candidates:
+        try:
+            m = getattr(ctx, attr, None)
+            if isinstance(m, dict) and loc_id in m:
+                li = m.get(loc_id)
+
+                # tuple/list form: (item, player, flags?) or similar
+                if isinstance(li, (tuple, list)) and len(li) >= 2:
+                    return li[0], li[1]
+
+                # dict form
+                if isinstance(li, dict):
+                    return li.get("item"), li.get("player")
+
+                # object form (NetUtils.LocationInfo-like)
+                item = getattr(li, "item", None)
+                player = getattr(li, "player", None)
+                return item, player
+        except Exception:
+            continue
+
+    return None, None
+
+
+def sent_reward_name(ctx, item_id, task_index: int, recipient_id=None) -> Optional[str]:
+    """
+    Resolve an item name similar to the received-item popup logic:
+    - Taskipelago Reward item ids use YAML reward text, tokens/filler resolve to nothing
+    - Otherwise the recipient's game name from the data package
+    - Otherwise fallback to YAML reward text for this task (best-effort)
+    """
+    if not ctx:
+        return None
+
+    resolved = ctx.names.item_name(item_id, recipient_id)
+    if resolved is None and not ctx.names.suppressed(item_id) and task_index is not None:
+        resolved = ctx.names.reward_text(task_index)
+    return resolved
+
@@ -0,0 +1,245 @@
+"""
+Opt-in profiling of the client and world hot paths.
+
+    TASKIPELAGO_PROFILE=cpu        cProfile per call site
+    TASKIPELAGO_PROFILE=mem        tracemalloc: allocation growth/peak per call site + top allocators
+    TASKIPELAGO_PROFILE=cpu,mem    both (also: 1 = cpu, all = both)
+    TASKIPELAGO_PROFILE_DIR=path   where to write (default ./taskipelago_profiles/<time>-<pid>)
+
+Functions decorated with @profiled("site") are looked at once, when the module is imported: if
+the variable isn't set the decorator hands back the function itself, so there's nothing in the
+call path at all. When it is set, every call to a site is added to that site's profile, and at
+exit (or on dump_profiles()) each site gets:
+
+    <site>.prof      pstats file (snakeviz / python -m pstats)
+    <site>.txt       top functions by cumulative time
+    <site>.mem.txt   calls, net allocation and peak per call (mem mode)
+    summary.txt      one line per site, plus the top allocation sites in mem mode
+
+Generator functions (the sliced render jobs) are profiled one slice at a time.
+Only one cProfile can run at once; a site called while another is being profiled (nested
+sites, or the other thread) just runs, and its time shows up in the outer one.
+"""
+import atexit
+import functools
+import inspect
+import os
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+PROFILE_ENV = "TASKIPELAGO_PROFILE"
+PROFILE_DIR_ENV = "TASKIPELAGO_PROFILE_DIR"
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 30
+
+
+def _modes() -> set:
+    raw = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if not raw or raw == "0":
+        return set()
+    modes = set()
+    for part in re.split(r"[,+ ]+", raw):
+        if part in ("1", "true", "yes", "cpu"):
+            modes.add("cpu")
+        elif part in ("mem", "memory", "tracemalloc"):
+            modes.add("mem")
+        elif part == "all":
+            modes |= {"cpu", "mem"}
+    return modes
+
+
+MODES = _modes()
+ENABLED = bool(MODES)
+
+
+class _Site:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.profile = None
+        self.mem_calls = 0
+        self.mem_net = 0
+        self.mem_peak = 0
+
+    def run(self, fn, args, kwargs):
+        if "mem" in MODES:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+            before, _peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+        profile = None
+        if "cpu" in MODES and _state.claim():
+            import cProfile
+
+            if self.profile is None:
+                self.profile = cProfile.Profile()
+            profile = self.profile
+            try:
+                profile.enable()
+            except ValueError:
+                # some other profiler (a debugger, sys.monitoring user) got there first
+                _state.release()
+                profile = None
+
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+                _state.release()
+            self.calls += 1
+            self.wall += time.perf_counter() - t0
+            if "mem" in MODES:
+                after, peak = tracemalloc.get_traced_memory()
+                self.mem_calls += 1
+                self.mem_net += after - before
+                self.mem_peak = max(self.mem_peak, peak - before)
+
+
+class _State:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._busy = False
+        self.sites: Dict[str, _Site] = {}
+        self.out_dir: Optional[Path] = None
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self._busy:
+                return False
+            self._busy = True
+            return True
+
+    def release(self):
+        with self._lock:
+            self._busy = False
+
+    def site(self, name: str) -> _Site:
+        site = self.sites.get(name)
+        if site is None:
+            site = self.sites[name] = _Site(name)
+        return site
+
+
+_state = _State()
+
+
+def profiled(name: str):
+    """Decorator; a no-op unless TASKIPELAGO_PROFILE was set when the module got imported."""
+    def deco(fn):
+        if not ENABLED:
+            return fn
+        site = _state.site(name)
+        _register_atexit()
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                gen = fn(*args, **kwargs)
+                try:
+                    while True:
+                        try:
+                            item = site.run(next, (gen,), {})
+                        except StopIteration:
+                            return
+                        yield item
+                finally:
+                    gen.close()
+
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return site.run(fn, args, kwargs)
+
+        return wrapper
+
+    return deco
+
+
+_atexit_registered = False
+
+
+def _register_atexit():
+    global _atexit_registered
+    if not _atexit_registered:
+        _atexit_registered = True
+        atexit.register(dump_profiles)
+
+
+def output_dir() -> Path:
+    if _state.out_dir is None:
+        target = os.environ.get(PROFILE_DIR_ENV, "").strip()
+        if target:
+            _state.out_dir = Path(target)
+        else:
+            _state.out_dir = Path.cwd() / "taskipelago_profiles" / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    return _state.out_dir
+
+
+def _safe(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+
+
+def dump_profiles() -> Optional[Path]:
+    """Write every site's profile so far. Returns the directory, or None if nothing ran."""
+    sites = [s for s in list(_state.sites.values()) if s.calls]
+    if not sites:
+        return None
+    out = output_dir()
+    try:
+        out.mkdir(parents=True, exist_ok=True)
+        summary = [f"{'site':<28}{'calls':>8}{'total ms':>12}{'mean ms':>10}"]
+        for site in sorted(sites, key=lambda s: s.wall, reverse=True):
+            summary.append(f"{site.name:<28}{site.calls:>8}{site.wall * 1000:>12.1f}"
+                           f"{site.wall / site.calls * 1000:>10.2f}")
+            base = str(out / _safe(site.name))
+            if site.profile is not None:
+                _write_cpu(site, base)
+            if site.mem_calls:
+                Path(base + ".mem.txt").write_text(
+                    f"calls {site.mem_calls}\n"
+                    f"net allocated {site.mem_net / 1024:.1f} KiB ({site.mem_net / site.mem_calls / 1024:.2f} KiB/call)\n"
+                    f"largest peak above start {site.mem_peak / 1024:.1f} KiB\n",
+                    encoding="utf-8",
+                )
+        summary += _top_allocations()
+        (out / "summary.txt").write_text("\n".join(summary) + "\n", encoding="utf-8")
+    except Exception as e:
+        # Don't crash the client for a profiling failure
+        print(f"[Taskipelago] Could not write profiles to {out}: {e!r}")
+        return None
+    print(f"[Taskipelago] Profiles written to {out}")
+    return out
+
+
+def _write_cpu(site: _Site, base: str):
+    import io
+    import pstats
+
+    site.profile.dump_stats(base + ".prof")
+    buf = io.StringIO()
+    stats = pstats.Stats(site.profile, stream=buf)
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    Path(base + ".txt").write_text(buf.getvalue(), encoding="utf-8")
+
+
+def _top_allocations():
+    if "mem" not in MODES:
+        return []
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        return []
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+    lines = ["", f"top {len(stats)} live allocation sites:"]
+    lines += [f"  {stat}" for stat in stats]
+    return lines
@@ -0,0 +1,281 @@
+"""
+Record every decoded server command to a file, and play recordings back as benchmarks.
+
+Recording is off unless TASKIPELAGO_RECORD is set when the client connects:
+    TASKIPELAGO_RECORD=1                  -> ./taskipelago_<timestamp>.jsonl.gz
+    TASKIPELAGO_RECORD=path/to/file.gz    -> that file (.gz is gzipped, anything else plain JSONL)
+
+One file per client run (reconnects included). First line is a header, then one
+{"t": seconds since start, "m": command} per command, encoded with NetUtils.encode so
+NetworkItem & co. come back as the same types on decode. {"t": ..., "e": "connect"} and
+{"t": ..., "e": "disconnect"} mark socket boundaries.
+
+Replay:
+    python -m worlds.taskipelago.replay session.jsonl.gz [--speed 1.0] [--repeat 5] [--json]
+
+feeds the commands through CommonClient.process_server_cmd into a fresh TaskipelagoContext
+wrapped in a headless Session (so the notification/task-state side runs too), at recorded
+speed or as fast as possible, and reports handling time per command.
+"""
+import argparse
+import asyncio
+import atexit
+import gzip
+import json
+import os
+from pathlib import Path
+import random
+import shutil
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+RECORD_ENV = "TASKIPELAGO_RECORD"
+FORMAT = "taskipelago-recording"
+FLUSH_INTERVAL = 1.0  # seconds; keeps a crash from losing more than this
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class PacketRecorder:
+    def __init__(self, path: Path, server: str = "", slot: str = ""):
+        from NetUtils import encode
+
+        self._encode = encode
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = _open(self.path, "w")
+        self._start = time.monotonic()
+        self._last_flush = self._start
+        self.count = 0
+        self._f.write(json.dumps({"format": FORMAT, "version": 1, "server": server, "slot": slot,
+                                  "started": time.time()}) + "\n")
+        atexit.register(self.close)
+
+    def record(self, msg: dict):
+        if self._f is None:
+            return
+        now = time.monotonic()
+        self._f.write(f'{{"t": {now - self._start:.6f}, "m": {self._encode(msg)}}}\n')
+        self.count += 1
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self._last_flush = now
+            self._f.flush()
+
+    def mark(self, event: str):
+        """Connection boundary; flushed right away so a crash after a drop still has it."""
+        if self._f is None:
+            return
+        self._f.write(json.dumps({"t": round(time.monotonic() - self._start, 6), "e": event}) + "\n")
+        self._f.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._f is not None:
+            try:
+                self._f.close()
+            finally:
+                self._f = None
+
+
+def recorder_for(ctx, server: str = "") -> Optional[PacketRecorder]:
+    """The context's recorder, started on first use if TASKIPELAGO_RECORD asks for one."""
+    rec = getattr(ctx, "recorder", None)
+    if rec is None:
+        rec = recorder_from_env(server, getattr(ctx, "auth", None) or "")
+        ctx.recorder = rec if rec is not None else False
+    return rec or None
+
+
+def recorder_from_env(server: str = "", slot: str = "") -> Optional[PacketRecorder]:
+    target = os.environ.get(RECORD_ENV, "").strip()
+    if not target or target == "0":
+        return None
+    if target.lower() in ("1", "true", "yes"):
+        path = Path.cwd() / f"taskipelago_{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+    else:
+        path = Path(target)
+    try:
+        rec = PacketRecorder(path, server, slot)
+    except Exception as e:
+        # Don't crash the client for a recording failure
+        print(f"[Taskipelago] Could not start recording to {path}: {e!r}")
+        return None
+    print(f"[Taskipelago] Recording server commands to {path}")
+    return rec
+
+
+def read_recording(path: Path) -> Tuple[dict, Iterator[Tuple[float, Optional[dict], Optional[str]]]]:
+    """Returns (header, iterator of (t, command or None, marker or None))."""
+    from NetUtils import decode
+
+    f = _open(Path(path), "r")
+    header = json.loads(f.readline() or "{}")
+    if header.get("format") != FORMAT:
+        f.close()
+        raise ValueError(f"{path} is not a Taskipelago recording")
+
+    def records():
+        with f:
+            try:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = decode(line)
+                    except ValueError:
+                        # truncated last line from a crash
+                        break
+                    yield float(rec["t"]), rec.get("m"), rec.get("e")
+            except EOFError:
+                # gzip stream without its trailer (client killed mid-run); everything before is fine
+                pass
+
+    return header, records()
+
+
+# ----------------------------
+# Replay
+# ----------------------------
+class _NullSocket:
+    """ctx.server.socket for replays: the client may try to talk back; nobody's listening."""
+    open = True
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send(self, data):
+        self.sent += 1
+
+    async def close(self):
+        self.open = False
+
+
+async def replay(path: Path, speed: Optional[float] = None, state_dir: Optional[Path] = None,
+                 seed: int = 0) -> dict:
+    """
+    speed None plays as fast as possible, 1.0 at recorded pace, 2.0 twice as fast, ...
+    state_dir holds the notify-state/history files; a throwaway temp dir by default so every
+    replay starts from the same state.
+    """
+    import CommonClient
+    from NetUtils import Endpoint
+
+    from .events import DISCONNECTED
+    from .metrics import percentiles
+    from .sessions import Session
+
+    random.seed(seed)  # deathlink task picks
+    header, records = read_recording(path)
+
+    tmp = None
+    if state_dir is None:
+        state_dir = tmp = Path(tempfile.mkdtemp(prefix="taskipelago_replay_"))
+
+    session = Session(header.get("server") or "replay", header.get("slot") or "replay",
+                      history_path=Path(state_dir) / "notify_history.jsonl")
+    ctx = session.ctx
+    ctx._notify_state_path = Path(state_dir) / "notify_state.json"
+    ctx.server_address = session.server
+    ctx.auth = session.slot
+    socket = _NullSocket()
+
+    def connect():
+        # what server_loop does when a socket opens
+        ctx.server = Endpoint(socket)
+        ctx._deathlink_tag_enabled = False
+        session.connection_state = "connecting"
+
+    connect()
+
+    handling: Dict[str, List[float]] = {}
+    pump: List[float] = []
+    start = time.perf_counter()
+    try:
+        connected = True
+        for t, msg, marker in records:
+            if speed:
+                delay = t / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if marker == "disconnect":
+                ctx.server = None
+                ctx.events.post(DISCONNECTED)
+                session.pump()
+                connected = False
+                continue
+            if marker == "connect":
+                if not connected:
+                    connect()
+                    connected = True
+                continue
+            if msg is None:
+                continue
+
+            t0 = time.perf_counter()
+            await CommonClient.process_server_cmd(ctx, msg)
+            t1 = time.perf_counter()
+            session.pump()
+            t2 = time.perf_counter()
+
+            handling.setdefault(str(msg.get("cmd")), []).append(t1 - t0)
+            pump.append(t2 - t1)
+
+            # let tasks the handlers spawned (Sync, ConnectUpdate, ...) run
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - start
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        "recording": str(path),
+        "commands": sum(len(v) for v in handling.values()),
+        "wall_s": elapsed,
+        "handling": {cmd: percentiles(samples) for cmd, samples in sorted(handling.items())},
+        "pump": percentiles(pump),
+        "notifications": len(session.notifications),
+        "client_messages_sent": socket.sent,
+    }
+
+
+def _print_report(report: dict):
+    print(f"{report['recording']}: {report['commands']} commands in {report['wall_s']:.3f}s, "
+          f"{report['notifications']} notifications, {report['client_messages_sent']} client sends")
+    print(f"{'command':<16}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = list(report["handling"].items()) + [("(session pump)", report["pump"])]
+    for cmd, p in rows:
+        if not p.get("n"):
+            continue
+        print(f"{cmd:<16}{p['n']:>8}{p['p50_ms']:>10.3f}{p['p95_ms']:>10.3f}{p['p99_ms']:>10.3f}{p['max_ms']:>10.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="TaskipelagoReplay", description="Replay a recorded Taskipelago session.")
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--speed", type=float, default=None,
+                        help="1.0 = recorded pace; omit to replay as fast as possible")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--state-dir", type=Path, default=None,
+                        help="keep notify state between replays here (default: fresh temp dir each run)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    reports = [asyncio.run(replay(args.recording, args.speed, args.state_dir, args.seed))
+               for _ in range(max(1, args.repeat))]
+    if args.json:
+        print(json.dumps(reports if len(reports) > 1 else reports[0], indent=2))
+    else:
+        for r in reports:
+            _print_report(r)
+
+
+if __name__ == "__main__":
+    main()
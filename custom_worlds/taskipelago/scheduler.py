@@ -0,0 +1,117 @@
+import time
+import traceback
+from typing import Callable, Dict, Iterator, Optional
+
+from .metrics import METRICS
+
+
+class RenderScheduler:
+    """
+    Runs big UI updates in slices so the window keeps handling input.
+
+    A job is a generator; every `yield` marks a point where it's fine to stop for this frame.
+    Jobs are keyed by target ("play", "notifications", ...). Scheduling a target that already has
+    pending work throws the old generator away, so only the latest state ever gets drawn.
+
+    Slices run from after_idle and each one stops once budget_ms is spent; the next slice is
+    queued behind a short after() so pending input/redraw events get processed in between.
+
+    Metrics: render.slice is each slice's run time, job.<target> is schedule() to finish.
+    """
+
+    def __init__(self, widget, budget_ms: float = 12.0, gap_ms: int = 1):
+        self.widget = widget
+        self.budget = budget_ms / 1000.0
+        self.gap_ms = gap_ms
+        self._jobs: Dict[str, Iterator] = {}
+        self._done: Dict[str, Optional[Callable[[], None]]] = {}
+        self._started: Dict[str, float] = {}
+        self._scheduled = False
+
+    def schedule(self, target: str, job: Iterator, on_done: Optional[Callable[[], None]] = None):
+        old = self._jobs.pop(target, None)
+        if old is not None:
+            try:
+                old.close()
+            except Exception:
+                pass
+        self._jobs[target] = job
+        self._done[target] = on_done
+        self._started.setdefault(target, time.perf_counter())
+        self._kick(immediate=True)
+
+    def cancel(self, target: str):
+        job = self._jobs.pop(target, None)
+        self._done.pop(target, None)
+        self._started.pop(target, None)
+        if job is not None:
+            job.close()
+
+    def busy(self, target: Optional[str] = None) -> bool:
+        return bool(self._jobs) if target is None else target in self._jobs
+
+    def pending(self) -> int:
+        """How many targets have a job waiting for slices."""
+        return len(self._jobs)
+
+    def run_now(self, target: str):
+        """Finish a target synchronously (e.g. before reading back what it built)."""
+        job = self._jobs.pop(target, None)
+        done = self._done.pop(target, None)
+        if job is None:
+            return
+        for _ in job:
+            pass
+        self._record_job(target)
+        if callable(done):
+            done()
+
+    def _kick(self, immediate: bool = False):
+        if self._scheduled or not self._jobs:
+            return
+        self._scheduled = True
+        if immediate:
+            self.widget.after_idle(self._run)
+        else:
+            self.widget.after(self.gap_ms, lambda: self.widget.after_idle(self._run))
+
+    def _run(self):
+        self._scheduled = False
+        t0 = time.perf_counter()
+        deadline = t0 + self.budget
+
+        # round-robin so one huge job can't starve a small one
+        while self._jobs and time.perf_counter() < deadline:
+            for target in list(self._jobs.keys()):
+                job = self._jobs.get(target)
+                if job is None:
+                    continue
+                try:
+                    next(job)
+                except StopIteration:
+                    self._finish(target, job)
+                except Exception:
+                    traceback.print_exc()
+                    self._finish(target, job, run_done=False)
+                if time.perf_counter() >= deadline:
+                    break
+
+        METRICS.observe("render.slice", time.perf_counter() - t0)
+        self._kick()
+
+    def _record_job(self, target: str):
+        started = self._started.pop(target, None)
+        if started is not None:
+            METRICS.observe(f"job.{target}", time.perf_counter() - started)
+
+    def _finish(self, target: str, job: Iterator, run_done: bool = True):
+        # only drop it if a newer job hasn't replaced it in the meantime
+        if self._jobs.get(target) is job:
+            del self._jobs[target]
+            self._record_job(target)
+            done = self._done.pop(target, None)
+            if run_done and callable(done):
+                try:
+                    done()
+                except Exception:
+                    traceback.print_exc()
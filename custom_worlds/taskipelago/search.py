@@ -0,0 +1,125 @@
+from bisect import bisect_left, insort
+import re
+from typing import Dict, List, Optional, Set
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Play tab state filter values -> TaskState.status values they match
+STATE_FILTERS = {
+    "All": None,
+    "Available": {"available"},
+    "Locked": {"locked"},
+    "Pending": {"pending"},
+    "Completed": {"completed"},
+    "Not completed": {"available", "locked", "pending"},
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").casefold())
+
+
+class TaskSearchIndex:
+    """
+    Token -> task index postings with prefix lookup.
+
+    Documents are updated one at a time (set / remove), so building it can be sliced and a
+    changed task only re-indexes itself. Tokens are kept in a sorted list, so a prefix maps to
+    a contiguous run found with bisect. A query matches tasks containing a token that starts
+    with every query word ("dra bos" finds "Defeat the dragon boss").
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._tokens: List[str] = []  # sorted keys of _postings
+        self._docs: Dict[int, frozenset] = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def clear(self):
+        self._postings = {}
+        self._tokens = []
+        self._docs = {}
+
+    def set(self, doc_id: int, *texts: str):
+        new = frozenset(t for text in texts for t in tokenize(text))
+        old = self._docs.get(doc_id, frozenset())
+        if new == old:
+            return
+        for tok in old - new:
+            self._unpost(tok, doc_id)
+        for tok in new - old:
+            posting = self._postings.get(tok)
+            if posting is None:
+                posting = self._postings[tok] = set()
+                insort(self._tokens, tok)
+            posting.add(doc_id)
+        self._docs[doc_id] = new
+
+    def remove(self, doc_id: int):
+        for tok in self._docs.pop(doc_id, ()):
+            self._unpost(tok, doc_id)
+
+    def _unpost(self, tok: str, doc_id: int):
+        posting = self._postings.get(tok)
+        if posting is None:
+            return
+        posting.discard(doc_id)
+        if not posting:
+            del self._postings[tok]
+            i = bisect_left(self._tokens, tok)
+            if i < len(self._tokens) and self._tokens[i] == tok:
+                del self._tokens[i]
+
+    def prefix(self, word: str) -> Set[int]:
+        out: Set[int] = set()
+        i = bisect_left(self._tokens, word)
+        tokens = self._tokens
+        while i < len(tokens) and tokens[i].startswith(word):
+            out |= self._postings[tokens[i]]
+            i += 1
+        return out
+
+    def matches(self, doc_id: int, query: str) -> bool:
+        """One document against a query, without touching the postings (for single updates)."""
+        doc = self._docs.get(doc_id, frozenset())
+        return all(any(t.startswith(w) for t in doc) for w in tokenize(query))
+
+    def search(self, query: str) -> Optional[Set[int]]:
+        """Matching doc ids, or None for an empty query (= everything)."""
+        words = tokenize(query)
+        if not words:
+            return None
+        # longest word first: usually the smallest candidate set
+        words.sort(key=len, reverse=True)
+        result = self.prefix(words[0])
+        for w in words[1:]:
+            if not result:
+                break
+            result &= self.prefix(w)
+        return result
+
+
+def filter_keys(index: TaskSearchIndex, query: str, statuses: List[str], state: str) -> Optional[Set[int]]:
+    """
+    Combine a text query and a state filter. statuses[i] is TaskState.status of task i.
+    Returns None when nothing is filtered.
+    """
+    hits = index.search(query)
+    wanted = STATE_FILTERS.get(state)
+    if wanted is None:
+        return hits
+    candidates = hits if hits is not None else range(len(statuses))
+    return {i for i in candidates if i < len(statuses) and statuses[i] in wanted}
+
+
+def task_matches(index: TaskSearchIndex, doc_id: int, query: str, status: str, state: str) -> bool:
+    wanted = STATE_FILTERS.get(state)
+    if wanted is not None and status not in wanted:
+        return False
+    return index.matches(doc_id, query)
+
+
+def filter_active(query: str, state: str) -> bool:
+    return bool(tokenize(query)) or STATE_FILTERS.get(state) is not None
@@ -0,0 +1,184 @@
+import asyncio
+from pathlib import Path
+import re
+import traceback
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .context import TaskipelagoContext, server_loop, spawn
+from .metrics import METRICS
+from .names import NameCachePool
+from .play_model import COMPLETED, FAILED, GOAL, LOST_CONNECTION, NOTIFICATION, STATE_CHANGED, PlayModel
+from .play_state import TaskState
+
+EVENT_PUMP_MS = 30
+
+# fn(session, event_dict)
+EventHandler = Callable[["Session", dict], None]
+
+
+def session_key(server: str, slot: str) -> str:
+    return f"{slot.strip()}@{server.strip().lower()}"
+
+
+def _history_path(key: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", key).strip("_") or "slot"
+    return Path.cwd() / f"taskipelago_notify_history_{safe}.jsonl"
+
+
+class Session(PlayModel):
+    """
+    One slot connection without any UI: a context plus its PlayModel, with the model's
+    events turned into on_event dicts. Must be used on the loop.
+    """
+
+    def __init__(self, server: str, slot: str, password: Optional[str] = None, *, on_event: EventHandler = None,
+                 name_caches: Optional[NameCachePool] = None, max_notifications: int = 200,
+                 history_path: Optional[Path] = None):
+        self.server = server
+        self.slot = slot
+        self.password = password
+        self.key = session_key(server, slot)
+        self.on_event = on_event
+
+        ctx = TaskipelagoContext(server, password)
+        ctx.name_caches = name_caches
+        super().__init__(ctx, send=self._send_msgs, history_path=history_path or _history_path(self.key),
+                         max_notifications=max_notifications, label=self.key)
+        self.subscribe(self._on_model_event)
+
+        self._server_task: Optional[asyncio.Task] = None
+
+    # ---------------- lifecycle ----------------
+    def connect(self):
+        if self.connection_state != "disconnected":
+            return
+        self.connecting()
+        self.ctx.server_address = self.server
+        self.ctx.auth = self.slot
+        self.ctx.password = self.password
+        self._server_task = asyncio.create_task(server_loop(self.ctx, self.server))
+
+    async def disconnect(self):
+        self.disconnected()
+        if self.ctx.server:
+            await self.ctx.disconnect()
+
+    def close(self):
+        """Drop the shared name memo reference (the session is going away)."""
+        caches = self.ctx.name_caches
+        if caches is not None and self.ctx.names.room_key is not None:
+            caches.release(self.ctx.names.room_key)
+            self.ctx.names.room_key = None
+
+    def _send_msgs(self, msgs: list):
+        spawn(self.ctx.send_msgs(msgs))
+
+    # ---------------- model events -> on_event ----------------
+    def _on_model_event(self, kind: str, payload):
+        if self.on_event is None:
+            return
+        if kind == STATE_CHANGED:
+            self._emit_event({"event": "state", **self.status()})
+        elif kind == NOTIFICATION:
+            self._emit_event({"event": "notification", **payload[0].to_dict()})
+        elif kind in (COMPLETED, FAILED):
+            self._emit_event({"event": kind, "task": payload + 1})
+        elif kind == GOAL:
+            self._emit_event({"event": "goal"})
+        elif kind == LOST_CONNECTION:
+            self._emit_event({"event": "disconnected", "reason": payload})
+
+    def _emit_event(self, event: dict):
+        self.on_event(self, event)
+
+    def status(self, states: Optional[List[TaskState]] = None) -> dict:
+        st = super().status(states)
+        return {"connection": st.pop("connection"), "server": self.server, "slot": self.slot, **st}
+
+
+class SessionManager:
+    """
+    Many slot sessions on one asyncio loop. Each session keeps its own context and state;
+    sessions connected to the same room (server + seed) share a name memo through the pool.
+    """
+
+    def __init__(self, on_event: EventHandler = None, max_notifications: int = 200):
+        self.on_event = on_event
+        self.max_notifications = max_notifications
+        self.name_caches = NameCachePool()
+        self.sessions: Dict[str, Session] = {}
+        self._pump_task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self) -> Iterator[Session]:
+        return iter(list(self.sessions.values()))
+
+    def add(self, server: str, slot: str, password: Optional[str] = None, connect: bool = True) -> Session:
+        key = session_key(server, slot)
+        session = self.sessions.get(key)
+        if session is None:
+            session = Session(server, slot, password, on_event=self._on_session_event,
+                              name_caches=self.name_caches, max_notifications=self.max_notifications)
+            self.sessions[key] = session
+        if connect:
+            session.connect()
+        return session
+
+    async def remove(self, key: str) -> bool:
+        session = self.sessions.pop(key, None)
+        if session is None:
+            return False
+        await session.disconnect()
+        session.close()
+        return True
+
+    def find(self, ref: Optional[str]) -> Optional[Session]:
+        """Look a session up by key, or by bare slot name if that's unambiguous. None -> the only one."""
+        if ref is None:
+            return next(iter(self.sessions.values())) if len(self.sessions) == 1 else None
+        if ref in self.sessions:
+            return self.sessions[ref]
+        matches = [s for s in self.sessions.values() if s.slot == ref]
+        return matches[0] if len(matches) == 1 else None
+
+    def _on_session_event(self, session: Session, event: dict):
+        if self.on_event is not None:
+            self.on_event(session, event)
+
+    # ---------------- loop ----------------
+    def start(self):
+        if self._pump_task is None:
+            self._pump_task = asyncio.create_task(self._pump())
+
+    async def _pump(self):
+        while True:
+            for session in self:
+                try:
+                    with METRICS.timer("pump.session"):
+                        session.pump()
+                except Exception:
+                    traceback.print_exc()
+            await asyncio.sleep(EVENT_PUMP_MS / 1000)
+
+    async def shutdown(self):
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+            self._pump_task = None
+        for key in list(self.sessions):
+            await self.remove(key)
+
+    # ---------------- combined view ----------------
+    def combined_tasks(self) -> List[Tuple[Session, TaskState]]:
+        return [(session, st) for session in self for st in session.task_states()]
+
+    def status(self) -> dict:
+        per_slot = {}
+        totals = {"tasks": 0, "available": 0, "locked": 0, "pending": 0, "completed": 0}
+        for session in self:
+            st = session.status()
+            per_slot[session.key] = st
+            for k in totals:
+                totals[k] += st[k]
+        return {"sessions": per_slot, "totals": totals, "rooms": len(self.name_caches)}
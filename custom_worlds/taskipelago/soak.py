@@ -0,0 +1,324 @@
+"""
+Soak test: long runs of simulated traffic against the client, watching for anything that grows.
+
+    python -m worlds.taskipelago.soak --duration 7200 --sample-every 30 --out soak.jsonl
+    xvfb-run python -m worlds.taskipelago.soak --tk --duration 3600      # the real Tk app
+
+Headless mode runs SessionManager sessions against an in-process MockRoom (no sockets, see
+mockserver.py --direct) with item floods, RoomUpdates, DeathLinks, forced disconnects and a
+steady trickle of completed tasks. --tk drives TaskipelagoApp the same way, so widgets and the
+render scheduler are in the loop too; it needs a display (a virtual one is fine).
+
+Every --sample-every seconds it records RSS, tracemalloc current size and top allocators,
+asyncio task count, notification/history/state-file sizes and handler latency percentiles for
+the interval. At the end the post-warmup samples are split in thirds and the last third is
+compared with the first; growth past the limits fails the run (exit code 1).
+"""
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass, fields
+import json
+import os
+from pathlib import Path
+import random
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+from .metrics import percentiles
+from .mockserver import LatencyProbe, MockConfig, MockRoom, _DirectConnection
+
+
+@dataclass
+class SoakConfig:
+    duration: float = 600.0
+    sample_every: float = 10.0
+    sessions: int = 1
+    complete_every: float = 1.0        # seconds between completed tasks, per session
+    warmup: float = 0.2                # fraction of the run left out of the growth check
+    history_max_bytes: int = 1024 * 1024
+    top_allocators: int = 10
+    # allowed growth, last third vs first third of the post-warmup samples
+    max_traced_growth_kb: int = 2048
+    max_rss_growth_kb: int = 16384
+    max_task_growth: int = 20
+
+
+# soak traffic defaults; every MockConfig field can still be overridden on the command line
+SOAK_MOCK_DEFAULTS = dict(tasks=2000, items_per_second=20.0, room_updates_per_second=1.0,
+                          deathlinks_per_second=0.2, drop_every=120.0)
+
+
+def _rss_kb() -> Optional[int]:
+    """Current resident set size (ru_maxrss is only the peak)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except Exception:
+        pass
+    try:
+        import resource
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except Exception:
+        return None
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+class Sampler:
+    def __init__(self, cfg: SoakConfig, out: Optional[Path]):
+        self.cfg = cfg
+        self.out = out
+        self.samples: List[dict] = []
+        self.start = time.monotonic()
+
+    def sample(self, extra: dict, latencies: List[float]):
+        from .context import _background_tasks
+
+        snap = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        top = [str(stat) for stat in snap.statistics("lineno")[:self.cfg.top_allocators]]
+        current, _peak = tracemalloc.get_traced_memory()
+        s = {
+            "t": round(time.monotonic() - self.start, 1),
+            "rss_kb": _rss_kb(),
+            "traced_kb": current // 1024,
+            "background_tasks": len(_background_tasks),
+            **extra,
+            "latency": percentiles(latencies),
+            "top_allocators": top,
+        }
+        self.samples.append(s)
+        lat = s["latency"]
+        print(f"[soak] t={s['t']:>7.0f}s rss={s['rss_kb']}KiB traced={s['traced_kb']}KiB "
+              f"tasks={s.get('asyncio_tasks')} notes={s.get('notifications')} "
+              f"history={s.get('history_bytes', 0) // 1024}KiB p95={lat.get('p95_ms', 0):.2f}ms", flush=True)
+        if self.out is not None:
+            with self.out.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(s) + "\n")
+
+    def verdict(self) -> dict:
+        cfg = self.cfg
+        usable = self.samples[int(len(self.samples) * cfg.warmup):]
+        if len(usable) < 6:
+            return {"ok": True, "note": "too few samples for a growth check", "failures": []}
+        third = len(usable) // 3
+        early, late = usable[:third], usable[-third:]
+
+        def avg(rows, key):
+            vals = [r[key] for r in rows if r.get(key) is not None]
+            return sum(vals) / len(vals) if vals else 0.0
+
+        growth = {
+            "traced_kb": avg(late, "traced_kb") - avg(early, "traced_kb"),
+            "rss_kb": avg(late, "rss_kb") - avg(early, "rss_kb"),
+            "asyncio_tasks": avg(late, "asyncio_tasks") - avg(early, "asyncio_tasks"),
+        }
+        failures = []
+        if growth["traced_kb"] > cfg.max_traced_growth_kb:
+            failures.append(f"traced memory grew {growth['traced_kb']:.0f} KiB")
+        if growth["rss_kb"] > cfg.max_rss_growth_kb:
+            failures.append(f"RSS grew {growth['rss_kb']:.0f} KiB")
+        if growth["asyncio_tasks"] > cfg.max_task_growth:
+            failures.append(f"asyncio task count grew by {growth['asyncio_tasks']:.0f}")
+        return {"ok": not failures, "growth": growth, "failures": failures}
+
+
+# ----------------------------
+# Headless soak
+# ----------------------------
+async def soak_headless(cfg: SoakConfig, mock: MockConfig, out: Optional[Path] = None) -> dict:
+    from . import sessions as sessions_mod
+    from .context import server_loop
+    from .notifications import NotificationHistory
+    from .sessions import SessionManager
+
+    tmp = Path(tempfile.mkdtemp(prefix="taskipelago_soak_"))
+    room = MockRoom(mock)
+    rng = random.Random(mock.seed)
+    probe = LatencyProbe()
+    counts: Dict[str, int] = {}
+
+    def on_event(session, event):
+        counts[event["event"]] = counts.get(event["event"], 0) + 1
+        if event["event"] == "disconnected" and session.key in manager.sessions:
+            asyncio.get_running_loop().call_later(0.2, session.connect)
+
+    async def direct_loop(ctx, _address):
+        await _DirectConnection(room, ctx).serve()
+
+    sessions_mod.server_loop = direct_loop
+    manager = SessionManager(on_event=on_event)
+    sampler = Sampler(cfg, out)
+    tracemalloc.start(10)
+    try:
+        for i in range(cfg.sessions):
+            s = manager.add("mock", f"Soaker{i + 1}", connect=False)
+            s.ctx._notify_state_path = tmp / "notify_state.json"
+            s.history = NotificationHistory(tmp / f"history_{i + 1}.jsonl", max_bytes=cfg.history_max_bytes)
+            probe.attach(s.ctx)
+            s.connect()
+        manager.start()
+
+        deadline = time.monotonic() + cfg.duration
+        next_sample = time.monotonic() + cfg.sample_every
+        next_complete = time.monotonic() + cfg.complete_every
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(0.1, cfg.complete_every))
+            now = time.monotonic()
+            if now >= next_complete:
+                next_complete = now + cfg.complete_every
+                for s in manager:
+                    available = [st.index for st in s.task_states() if st.status == "available"]
+                    if available:
+                        s.complete(rng.choice(available))
+            if now >= next_sample:
+                next_sample = now + cfg.sample_every
+                latencies = [t for samples in probe.processing.values() for t in samples]
+                # the probe would be a leak of its own otherwise
+                probe.processing.clear()
+                probe.delivery.clear()
+                sampler.sample({
+                    "asyncio_tasks": len(asyncio.all_tasks()),
+                    "notifications": sum(len(s.notifications) for s in manager),
+                    "inflight": sum(len(s.inflight) for s in manager),
+                    "history_bytes": sum(_file_size(s.history.path) for s in manager),
+                    "history_entries": sum(len(s.history) for s in manager),
+                    "notify_state_bytes": _file_size(tmp / "notify_state.json"),
+                    "events": dict(counts),
+                }, latencies)
+    finally:
+        await manager.shutdown()
+        sessions_mod.server_loop = server_loop
+        tracemalloc.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {"mode": "headless", "samples": len(sampler.samples), **sampler.verdict()}
+
+
+# ----------------------------
+# Tk soak
+# ----------------------------
+def soak_tk(cfg: SoakConfig, mock: MockConfig, out: Optional[Path] = None) -> dict:
+    from .client import TaskipelagoApp, count_widgets
+    from .notifications import NotificationHistory
+    from .play_model import LOST_CONNECTION
+
+    tmp = Path(tempfile.mkdtemp(prefix="taskipelago_soak_"))
+    room = MockRoom(mock)
+    rng = random.Random(mock.seed)
+    probe = LatencyProbe()
+    sampler = Sampler(cfg, out)
+    result: dict = {}
+    tracemalloc.start(10)
+
+    app = TaskipelagoApp()
+    app.play.history = NotificationHistory(tmp / "history.jsonl", max_bytes=cfg.history_max_bytes)
+    deadline = time.monotonic() + cfg.duration
+
+    def serve():
+        # what _start_connect does, with the mock room instead of server_loop
+        app.play.connecting()
+        app.connect_status.set("Soak: connecting to mock room...")
+        asyncio.run_coroutine_threadsafe(_DirectConnection(room, app.ctx).serve(), app.loop)
+
+    def on_play_event(kind, _payload):
+        if kind == LOST_CONNECTION:
+            app.after(200, serve)
+
+    def start():
+        if not getattr(app, "ctx", None):
+            app.after(50, start)
+            return
+        app.ctx._notify_state_path = tmp / "notify_state.json"
+        app.ctx.auth = "Soaker"
+        app.ctx.server_address = "mock"
+        probe.attach(app.ctx)
+        app.play.subscribe(on_play_event)
+        serve()
+        app.after(int(cfg.complete_every * 1000), complete)
+        app.after(int(cfg.sample_every * 1000), sample)
+
+    def complete():
+        if app.play.connection_state == "connected":
+            available = [st.index for st in app.play.task_states() if st.status == "available"]
+            if available:
+                app.complete_task(rng.choice(available))
+        app.after(int(cfg.complete_every * 1000), complete)
+
+    def loop_task_count() -> int:
+        # asyncio.all_tasks isn't safe from another thread; ask the loop
+        return asyncio.run_coroutine_threadsafe(_count_tasks(), app.loop).result(timeout=5)
+
+    def sample():
+        latencies = [t for samples in probe.processing.values() for t in samples]
+        probe.processing.clear()
+        probe.delivery.clear()
+        sampler.sample({
+            "asyncio_tasks": loop_task_count(),
+            "widgets": count_widgets(app),
+            "canvas_items": len(app.play_cards.canvas.find_all()) + len(app.notif_cards.canvas.find_all()),
+            "notifications": len(app.play.notifications),
+            "pending_cards": len(app._pending_notification_cards),
+            "inflight": len(app.play.inflight),
+            "history_bytes": _file_size(app.play.history.path),
+            "notify_state_bytes": _file_size(tmp / "notify_state.json"),
+        }, latencies)
+        if time.monotonic() >= deadline:
+            result.update(sampler.verdict())
+            app.destroy()
+            return
+        app.after(int(cfg.sample_every * 1000), sample)
+
+    app.after(0, start)
+    try:
+        app.mainloop()
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {"mode": "tk", "samples": len(sampler.samples), **result}
+
+
+async def _count_tasks() -> int:
+    return len(asyncio.all_tasks())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="TaskipelagoSoak", description="Long-running leak/latency soak test.")
+    parser.add_argument("--tk", action="store_true", help="drive the Tk client (needs a display, e.g. xvfb-run)")
+    parser.add_argument("--out", type=Path, default=None, help="append every sample to this JSONL file")
+    for f in fields(SoakConfig):
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default)
+    for f in fields(MockConfig):
+        default = SOAK_MOCK_DEFAULTS.get(f.name, f.default)
+        kind = type(f.default) if f.default is not None else int
+        parser.add_argument(f"--{f.name.replace('_', '-')}", type=kind, default=default)
+    args = vars(parser.parse_args(argv))
+
+    cfg = SoakConfig(**{f.name: args[f.name] for f in fields(SoakConfig)})
+    mock = MockConfig(**{f.name: args[f.name] for f in fields(MockConfig)})
+    print(f"[soak] {asdict(cfg)}")
+    print(f"[soak] {asdict(mock)}")
+
+    if args["tk"]:
+        if threading.current_thread() is not threading.main_thread():
+            raise SystemExit("--tk has to run on the main thread")
+        result = soak_tk(cfg, mock, args["out"])
+    else:
+        result = asyncio.run(soak_headless(cfg, mock, args["out"]))
+
+    print(json.dumps(result, indent=2))
+    raise SystemExit(0 if result.get("ok", False) else 1)
+
+
+if __name__ == "__main__":
+    main()
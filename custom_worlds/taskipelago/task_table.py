@@ -0,0 +1,226 @@
+from dataclasses import dataclass, field
+import itertools
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+FILLER_TOKEN = "nothing here, get pranked nerd"
+REWARD_TYPE_VALUES = ("junk", "useful", "progression", "trap")
+DEFAULT_REWARD_TYPE = "useful"
+
+_uids = itertools.count(1)
+
+
+# ----------------------------
+# Row model (YAML Generator)
+# ----------------------------
+@dataclass(slots=True)
+class TaskRecord:
+    task: str = ""
+    reward: str = ""
+    prereqs: str = ""
+    reward_prereqs: str = ""
+    filler: bool = False
+    reward_type: str = DEFAULT_REWARD_TYPE
+
+    # what to restore when filler gets unticked again
+    saved_reward: str = ""
+    saved_reward_type: str = DEFAULT_REWARD_TYPE
+
+    # optional name prereq fields can use instead of the row number
+    label: str = ""
+    # identity for the session; survives moves, never exported
+    uid: int = field(default_factory=lambda: next(_uids), compare=False, repr=False)
+
+    def set_filler(self, on: bool):
+        if on == self.filler:
+            return
+        if on:
+            current = self.reward.strip()
+            if current and current != FILLER_TOKEN:
+                self.saved_reward = current
+            current_type = self.reward_type.strip().lower()
+            if current_type:
+                self.saved_reward_type = current_type
+            self.reward = FILLER_TOKEN
+            self.reward_type = "junk"
+        else:
+            self.reward = self.saved_reward
+            self.reward_type = self.saved_reward_type or DEFAULT_REWARD_TYPE
+        self.filler = on
+
+    def get_data(self):
+        return (
+            self.task.strip(),
+            self.reward.strip(),
+            self.prereqs.strip(),
+            self.reward_prereqs.strip(),
+            self.filler,
+            self.reward_type.strip().lower() or DEFAULT_REWARD_TYPE,
+        )
+
+
+# ----------------------------
+# Prereq references
+# ----------------------------
+def split_refs(text: str) -> List[str]:
+    """ "1, ch2" -> ["1", "ch2"]. A ref is a 1-based row number or a task label."""
+    return [p.strip() for p in str(text).split(",") if p.strip()]
+
+
+def ref_number(ref: str) -> Optional[int]:
+    try:
+        return int(ref)
+    except ValueError:
+        return None
+
+
+def label_key(label: str) -> str:
+    return label.strip().casefold()
+
+
+def _renumber_text(text: str, mapping: Callable[[int], Optional[int]], n: int) -> str:
+    out = []
+    changed = False
+    for ref in split_refs(text):
+        k = ref_number(ref)
+        # only numbers that pointed at a real row follow it; anything else stays as typed
+        if k is not None and 1 <= k <= n:
+            new = mapping(k)
+            changed = changed or new != k
+            if new is None:
+                continue
+            ref = str(new)
+        out.append(ref)
+    return ",".join(out) if changed else text
+
+
+class TaskTable:
+    """
+    Plain list-of-records backing the YAML generator.
+    Views subscribe with add_listener(fn) and get called as fn(kind, index) where kind is
+    "insert" | "remove" | "move" | "update" | "reset". No widgets live here.
+
+    Prereq fields hold row numbers and/or labels. Inserting, removing or moving rows rewrites
+    the numbers so they keep pointing at the same tasks (a removed task drops out of the
+    fields that needed it); labels don't need it. export_rows() turns both into the positions
+    generate_early reads.
+    """
+
+    def __init__(self, records: Optional[Iterable[TaskRecord]] = None):
+        self.records: List[TaskRecord] = list(records or [])
+        self._listeners: List[Callable[[str, int], None]] = []
+        self._uid_rows: Optional[Dict[int, int]] = None  # uid -> row, rebuilt after structural changes
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, idx: int) -> TaskRecord:
+        return self.records[idx]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def add_listener(self, fn: Callable[[str, int], None]):
+        self._listeners.append(fn)
+
+    def _notify(self, kind: str, index: int = -1):
+        if kind != "update":
+            self._uid_rows = None
+        for fn in list(self._listeners):
+            fn(kind, index)
+
+    def append(self, record: Optional[TaskRecord] = None) -> int:
+        self.records.append(record if record is not None else TaskRecord())
+        idx = len(self.records) - 1
+        self._notify("insert", idx)
+        return idx
+
+    def insert(self, index: int, record: Optional[TaskRecord] = None) -> int:
+        n = len(self.records)
+        index = max(0, min(index, n))
+        self.records.insert(index, record if record is not None else TaskRecord())
+        if index < n:
+            self._renumber(lambda k: k + 1 if k > index else k, n)
+        self._notify("insert", index)
+        return index
+
+    def remove(self, index: int):
+        n = len(self.records)
+        if 0 <= index < n:
+            del self.records[index]
+            gone = index + 1
+            self._renumber(lambda k: None if k == gone else (k - 1 if k > gone else k), n)
+            self._notify("remove", index)
+
+    def move(self, src: int, dst: int):
+        n = len(self.records)
+        if not (0 <= src < n) or not (0 <= dst < n) or src == dst:
+            return
+        self.records.insert(dst, self.records.pop(src))
+        lo, hi = min(src, dst), max(src, dst)
+        step = -1 if src < dst else 1
+
+        def mapping(k: int) -> int:
+            i = k - 1
+            if i == src:
+                return dst + 1
+            if lo <= i <= hi:
+                return i + step + 1
+            return k
+
+        self._renumber(mapping, n)
+        self._notify("move", lo)
+
+    def _renumber(self, mapping: Callable[[int], Optional[int]], n: int):
+        """Rewrite numeric prereq refs after rows moved; n is the row count they were typed against."""
+        for rec in self.records:
+            if rec.prereqs:
+                rec.prereqs = _renumber_text(rec.prereqs, mapping, n)
+            if rec.reward_prereqs:
+                rec.reward_prereqs = _renumber_text(rec.reward_prereqs, mapping, n)
+
+    def updated(self, index: int):
+        # called by views after they edited a record in place
+        self._notify("update", index)
+
+    def replace_all(self, records: Iterable[TaskRecord]):
+        self.records = list(records)
+        self._notify("reset")
+
+    # ---------- lookups ----------
+    def row_of(self, uid: int) -> Optional[int]:
+        if self._uid_rows is None:
+            self._uid_rows = {rec.uid: i for i, rec in enumerate(self.records)}
+        return self._uid_rows.get(uid)
+
+    def labels(self) -> Dict[str, int]:
+        """label_key(label) -> row, first row wins."""
+        out: Dict[str, int] = {}
+        for i, rec in enumerate(self.records):
+            if rec.label.strip():
+                out.setdefault(label_key(rec.label), i)
+        return out
+
+    def export_rows(self) -> List[Tuple[TaskRecord, str, str]]:
+        """
+        (record, prereqs, reward_prereqs) for every row with a task, refs resolved to the
+        1-based positions the exported lists will have (blank rows aren't exported).
+        Refs that don't resolve are passed through for generate_early to reject.
+        """
+        labels = self.labels()
+        exported: Dict[int, int] = {}
+        for i, rec in enumerate(self.records):
+            if rec.task.strip():
+                exported[i] = len(exported) + 1
+
+        def resolve(text: str) -> str:
+            out = []
+            for ref in split_refs(text):
+                k = ref_number(ref)
+                row = k - 1 if k is not None else labels.get(label_key(ref))
+                pos = exported.get(row) if row is not None else None
+                # kept as written, repeats too: parse_index_list de-dupes task prereqs itself
+                out.append(str(pos) if pos is not None else ref)
+            return ",".join(out)
+
+        return [(rec, resolve(rec.prereqs), resolve(rec.reward_prereqs))
+                for i, rec in enumerate(self.records) if i in exported]
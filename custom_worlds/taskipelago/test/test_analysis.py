@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from ..analysis import PrereqAnalysis
+from ..graph_layout import REWARD_EDGE, TASK_EDGE, acyclic
+from ..play_state import indices
+
+# 0 -> 1 -> 3 -> 4, 0 -> 2 -> 3, and 5 on its own
+DIAMOND = [(0, 1, TASK_EDGE), (0, 2, TASK_EDGE), (1, 3, TASK_EDGE), (2, 3, TASK_EDGE), (3, 4, TASK_EDGE)]
+
+
+def _numbers(a):
+    return [a.unlocks(i) for i in range(a.n)], [a.chain(i) for i in range(a.n)]
+
+
+def test_unlocks_and_chains():
+    a = PrereqAnalysis(6, DIAMOND)
+    assert _numbers(a) == ([4, 2, 2, 1, 0, 0], [4, 3, 3, 2, 1, 1])
+    assert a.unlocks(99) == 0 and a.chain(-1) == 0
+
+
+def test_best_next_order():
+    a = PrereqAnalysis(6, DIAMOND)
+    # most unlocks, then longest chain, then YAML order
+    assert a.best_next([5, 4, 2, 1, 3]) == [1, 2, 3, 4, 5]
+    assert a.rank_key(0) == (-4, -4, 0)
+
+
+def test_completing_updates_only_what_is_left():
+    a = PrereqAnalysis(6, DIAMOND)
+    a.complete(3)
+    # a done task still counts what's open below it (its card just doesn't show it)
+    assert _numbers(a) == ([3, 1, 1, 1, 0, 0], [3, 2, 2, 1, 1, 1])
+    a.complete(3)  # repeats are ignored
+    assert _numbers(a) == ([3, 1, 1, 1, 0, 0], [3, 2, 2, 1, 1, 1])
+
+
+def test_sync():
+    a = PrereqAnalysis(6, DIAMOND)
+    assert a.sync([3, 1, 42]) is True
+    assert _numbers(a) == ([2, 1, 1, 1, 0, 0], [3, 1, 2, 1, 1, 1])
+    assert a.sync([1, 3]) is False
+    # 3 came back (a pending check that was given up on): recounted from scratch
+    assert a.sync([1]) is True
+    assert _numbers(a) == ([3, 2, 2, 1, 0, 0], [4, 2, 3, 2, 1, 1])
+    assert _numbers(a) != _numbers(PrereqAnalysis(6, DIAMOND))
+
+
+def test_cycles_and_duplicate_pairs_count_once():
+    edges = [(0, 1, TASK_EDGE), (1, 0, REWARD_EDGE), (1, 2, TASK_EDGE), (1, 2, REWARD_EDGE)]
+    assert acyclic(3, edges) == [(0, 1, TASK_EDGE, False), (0, 1, REWARD_EDGE, True),
+                                 (1, 2, TASK_EDGE, False), (1, 2, REWARD_EDGE, False)]
+    a = PrereqAnalysis(3, edges)
+    assert _numbers(a) == ([2, 1, 0], [3, 2, 1])
+
+
+def test_for_slot_reads_the_prereq_lists():
+    ctx = SimpleNamespace(tasks=["a", "b", "c"], task_prereqs=["", "1", "x, 2"], reward_prereqs=["", "", "1"])
+    a = PrereqAnalysis.for_slot(ctx)
+    assert _numbers(a) == ([2, 1, 0], [3, 2, 1])
+    assert indices("1, 2,x,5") == [1, 2, 5]
+    assert PrereqAnalysis.for_slot(SimpleNamespace(tasks=None, task_prereqs=None, reward_prereqs=None)).n == 0
@@ -0,0 +1,79 @@
+import random
+
+from ..graph_layout import REWARD_EDGE, TASK_EDGE, count_crossings, layered_layout, prereq_edges
+
+
+def _crossings(layout):
+    """Crossings of the drawn layout, read back from its routes and positions."""
+    down = {}
+    for chain, _kind in layout.routes:
+        for a, b in zip(chain, chain[1:]):
+            if layout.pos[a][1] > layout.pos[b][1]:
+                a, b = b, a
+            down.setdefault(a, []).append(b)
+    order = [0.0] * len(layout.pos)
+    for lay in layout.layers:
+        for i, v in enumerate(lay):
+            order[v] = i
+    return count_crossings(layout.layers, down, order)
+
+
+def test_prereq_edges_skips_junk_and_out_of_range_refs():
+    edges = prereq_edges(["", "1", "1, 2, x, 9, 3, 1"], [None, "", "2"], 3)
+    # self refs, refs past n and repeats are dropped; reward prereqs are their own kind
+    assert edges == [(0, 1, TASK_EDGE), (0, 2, TASK_EDGE), (1, 2, TASK_EDGE), (1, 2, REWARD_EDGE)]
+    assert prereq_edges(None, ["", "1", "1"], 2) == [(0, 1, REWARD_EDGE)]
+
+
+def test_count_crossings():
+    order = [0, 1, 0, 1, 0, 1]
+    layers = [[0, 1], [2, 3], [4, 5]]
+    assert count_crossings(layers, {0: [2], 1: [3]}, order) == 0
+    assert count_crossings(layers, {0: [3], 1: [2]}, order) == 1
+    assert count_crossings(layers, {0: [2, 3], 1: [2, 3]}, order) == 1
+    assert count_crossings(layers, {0: [3], 1: [2], 2: [5], 3: [4]}, order) == 2
+    assert count_crossings([[0]], {}, [0]) == 0
+
+
+def test_layers_follow_the_longest_prereq_path():
+    # 0 -> 1 -> 2 and 0 -> 2 directly: the short edge gets a dummy in layer 1
+    layout = layered_layout(3, prereq_edges(["", "1", "1,2"], None, 3))
+    assert [layout.pos[v][1] for v in range(3)] == [0, 1, 2]
+    assert sorted(map(sorted, layout.layers)) == [[0], [1, 3], [2]]
+    assert sorted(layout.routes) == [([0, 1], TASK_EDGE), ([0, 3, 2], TASK_EDGE), ([1, 2], TASK_EDGE)]
+    assert layout.width == 2
+
+
+def test_cycles_are_laid_out_with_routes_still_pointing_prereq_to_task():
+    # task 2 needs 1 and reward 1 needs task 2
+    layout = layered_layout(2, prereq_edges(["", "1"], ["2", ""], 2))
+    assert layout.layers == [[0], [1]]
+    assert sorted(layout.routes) == [([0, 1], TASK_EDGE), ([1, 0], REWARD_EDGE)]
+
+
+def test_sweeps_uncross_a_swapped_pair():
+    # 0 -> 3 and 1 -> 2 start out crossed
+    edges = [(0, 3, TASK_EDGE), (1, 2, TASK_EDGE)]
+    assert _crossings(layered_layout(4, edges, sweeps=0)) == 1
+    layout = layered_layout(4, edges)
+    assert layout.layers == [[0, 1], [3, 2]]
+    assert _crossings(layout) == 0
+    assert layout.pos[3] == (0.0, 1) and layout.pos[2] == (1.0, 1)
+
+
+def test_trees_end_with_no_crossings():
+    rng = random.Random(7)
+    n = 200
+    # parents come from a shuffled numbering so the initial order is scrambled
+    perm = list(range(n))
+    rng.shuffle(perm)
+    edges = [(perm[rng.randrange(i)], perm[i], TASK_EDGE) for i in range(1, n)]
+    assert _crossings(layered_layout(n, edges, sweeps=0)) > 0
+    layout = layered_layout(n, edges)
+    assert _crossings(layout) == 0
+    assert sorted(v for lay in layout.layers for v in lay if v < n) == list(range(n))
+
+
+def test_empty_graph():
+    layout = layered_layout(0, [])
+    assert (layout.layers, layout.routes, layout.width) == ([], [], 0)
@@ -0,0 +1,108 @@
+from ..context import TaskipelagoContext
+from ..events import DISCONNECTED, STATE
+from ..inflight import InflightTable
+from ..play_model import PlayModel
+
+
+def _table():
+    table = InflightTable(timeout=5.0, max_attempts=4, backoff=2.0)
+    table.add(3, (920_003, 910_003), 910_003, now=0.0)
+    return table
+
+
+def test_timeout_doubles_per_attempt():
+    table = _table()
+    req = table.get(3)
+
+    assert table.due(4.9) == ([], [])
+    sent_at = []
+    for now in (5.0, 15.0, 35.0):
+        resend, failed = table.due(now)
+        assert resend == [req] and failed == []
+        sent_at.append(req.sent_at)
+        assert table.due(now) == ([], [])  # not due again right away
+    assert sent_at == [5.0, 15.0, 35.0]
+    assert req.attempts == 4
+    assert table.deadline(req) == 75.0
+
+
+def test_gives_up_after_max_attempts_and_keeps_the_request():
+    table = _table()
+    req = table.get(3)
+    for now in (5.0, 15.0, 35.0):
+        table.due(now)
+
+    assert table.due(75.0) == ([], [req])
+    assert req.failed
+    assert 3 in table
+    assert table.due(1000.0) == ([], [])  # failed requests wait for a manual retry
+
+    assert table.retry(3, 1000.0) is req
+    assert not req.failed and req.attempts == 1
+    assert table.deadline(req) == 1005.0
+    assert table.retry(7, 1000.0) is None
+
+
+def test_confirm_drops_only_echoed_requests():
+    table = _table()
+    table.add(4, (920_004, 910_004), 910_004, now=0.0)
+
+    done = table.confirm({910_004, 920_003})  # task 3's completion token alone doesn't confirm it
+    assert [r.task_index for r in done] == [4]
+    assert 4 not in table and 3 in table
+    assert table.reward_locations() == {910_003}
+    assert len(table) == 1
+
+
+# ---------------- PlayModel across a dropped connection ----------------
+def _model(tmp_path, sent):
+    ctx = TaskipelagoContext()
+    ctx.apply_slot_data({"tasks": ["a", "b", "c"], "rewards": ["", "", ""],
+                         "base_reward_location_id": 910_000, "base_complete_location_id": 920_000})
+    ctx.seed_name, ctx.team, ctx.slot = "seed", 0, 1
+    model = PlayModel(ctx, send=sent.extend, history_path=tmp_path / "history.jsonl", clock=lambda: 0.0)
+    model.connecting()
+    model.pump([(STATE, None)])
+    return ctx, model
+
+
+def _checks(sent):
+    return [msg["locations"] for msg in sent if msg["cmd"] == "LocationChecks"]
+
+
+def test_checks_lost_with_the_connection_are_resent_on_reconnect(tmp_path):
+    sent = []
+    ctx, model = _model(tmp_path, sent)
+    assert model.complete(1) is None and model.complete(2) is None
+    assert _checks(sent) == [[920_001, 910_001], [920_002, 910_002]]
+
+    model.pump([(DISCONNECTED, None)])
+    assert model.connection_state == "disconnected"
+    assert 1 in model.inflight and 2 in model.inflight
+
+    # task 2's check made it before the drop; task 1's didn't
+    sent.clear()
+    ctx.checked_locations_set = {920_002, 910_002}
+    model.connecting()
+    model.pump([(STATE, None)])
+    assert _checks(sent) == [[920_001, 910_001]]
+    assert 1 in model.inflight and 2 not in model.inflight
+    assert model.inflight.get(1).attempts == 1
+
+
+def test_hanging_up_or_another_slot_drops_unconfirmed_checks(tmp_path):
+    sent = []
+    ctx, model = _model(tmp_path, sent)
+    model.complete(0)
+    model.disconnected()
+    assert len(model.inflight) == 0
+
+    model.connecting()
+    model.pump([(STATE, None)])
+    model.complete(0)
+    model.pump([(DISCONNECTED, None)])
+    sent.clear()
+    ctx.slot = 2
+    model.connecting()
+    model.pump([(STATE, None)])
+    assert len(model.inflight) == 0 and _checks(sent) == []
@@ -0,0 +1,88 @@
+import pytest
+
+from ..ingest import detect_format, iter_checklist, iter_delimited, read_task_file, shift_records
+from ..task_table import FILLER_TOKEN
+
+
+def _rows(records):
+    return [(r.task, r.reward, r.reward_type, r.prereqs, r.reward_prereqs) for r in records]
+
+
+def test_csv_with_header_matches_columns_by_name():
+    lines = [
+        "Name,Depends On,Reward,Reward_Type\n",
+        "Read chapter 1,,Pizza,progression\n",
+        'Exercises,"1; 1",Cake,BOGUS\n',
+        ",,,\n",
+    ]
+    assert _rows(iter_delimited(lines)) == [
+        ("Read chapter 1", "Pizza", "progression", "", ""),
+        ("Exercises", "Cake", "useful", "1,1", ""),  # unknown reward type falls back
+    ]
+
+
+def test_positional_tsv_with_offset():
+    lines = ["Wash car\tIce cream\t\t\t\n", "Vacuum\t\tjunk\t1\t1 x\n"]
+    assert _rows(iter_delimited(lines, "\t", offset=10)) == [
+        ("Wash car", "Ice cream", "useful", "", ""),
+        ("Vacuum", "", "junk", "11", "11,x"),  # non-numbers are left for the validator
+    ]
+
+
+def test_filler_column_and_token():
+    recs = list(iter_delimited(["task,reward,filler\n", "A,,yes\n", f'B,"{FILLER_TOKEN}",\n']))
+    assert [r.filler for r in recs] == [True, True]
+    assert [r.reward for r in recs] == [FILLER_TOKEN, FILLER_TOKEN]
+
+
+def test_markdown_nesting_becomes_prereqs():
+    lines = [
+        "# Syllabus\n",
+        "- [ ] Chapter 1 -> Pizza night\n",
+        "  - [x] Exercises 1.1-1.5\n",
+        "    * [ ] Hard problem\n",
+        "  - [ ] Exercises 1.6-1.9\n",
+        "Some prose in between\n",
+        "+ [ ] Chapter 2\n",
+        "\t- [ ] Chapter 2 quiz → Movie\n",
+    ]
+    assert _rows(iter_checklist(lines, offset=3)) == [
+        ("Chapter 1", "Pizza night", "useful", "", ""),
+        ("Exercises 1.1-1.5", "", "useful", "4", ""),
+        ("Hard problem", "", "useful", "5", ""),
+        ("Exercises 1.6-1.9", "", "useful", "4", ""),
+        ("Chapter 2", "", "useful", "", ""),
+        ("Chapter 2 quiz", "Movie", "useful", "8", ""),
+    ]
+
+
+def test_detect_format():
+    assert detect_format("tasks.CSV") == "csv"
+    assert detect_format("tasks.tab") == "tsv"
+    assert detect_format("notes.txt", ["# Todo\n", "\n", "- [ ] thing\n"]) == "markdown"
+    assert detect_format("tasks.txt", ["a\tb\n"]) == "tsv"
+    assert detect_format("tasks", ["a,b\n"]) == "csv"
+
+
+def test_read_task_file(tmp_path):
+    path = tmp_path / "list.txt"
+    path.write_text("﻿- [ ] One\n  - [ ] Two\n", encoding="utf-8")
+    assert _rows(read_task_file(str(path))) == [("One", "", "useful", "", ""), ("Two", "", "useful", "1", "")]
+    assert _rows(read_task_file(str(path), offset=2))[1][3] == "3"
+
+    empty = tmp_path / "empty.md"
+    empty.write_text("# nothing to do\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="No tasks found in empty.md"):
+        read_task_file(str(empty))
+
+    bad = tmp_path / "bad.csv"
+    bad.write_bytes(b"\xff\xfe\x00task")
+    with pytest.raises(ValueError, match="Failed to read bad.csv"):
+        read_task_file(str(bad))
+
+
+def test_shift_records_rebases_parsed_rows():
+    recs = list(iter_delimited(["A,,,,\n", "B,,,1,1\n", "C,,,1;2,lbl\n"]))
+    shift_records(recs, 5)
+    assert [(r.prereqs, r.reward_prereqs) for r in recs] == [("", ""), ("6", "6"), ("6,7", "lbl")]
+    assert shift_records(recs, 0) is recs and recs[1].prereqs == "6"
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from .. import BASE_COMPLETE_LOC_ID, BASE_REWARD_LOC_ID
+from .. import sessions as sessions_mod
+from ..mockserver import MockConfig, MockRoom, _DirectConnection
+from ..notifications import NotificationHistory
+from ..sessions import SessionManager
+
+
+async def _wait_for(cond, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the mock room")
+        await asyncio.sleep(0.01)
+
+
+def _run_session(tmp_path, monkeypatch, cfg: MockConfig, body):
+    room = MockRoom(cfg)
+
+    async def direct_loop(ctx, _address):
+        await _DirectConnection(room, ctx).serve()
+
+    monkeypatch.setattr(sessions_mod, "server_loop", direct_loop)
+
+    async def main():
+        events = []
+        manager = SessionManager(on_event=lambda _s, event: events.append(event))
+        try:
+            session = manager.add("mock", "Tester", connect=False)
+            session.ctx._notify_state_path = tmp_path / "notify_state.json"
+            session.history = NotificationHistory(tmp_path / "history.jsonl")
+            session.connect()
+            manager.start()
+            await _wait_for(lambda: session.connection_state == "connected" and session.task_states())
+            await body(room, session, events)
+        finally:
+            await manager.shutdown()
+
+    asyncio.run(main())
+
+
+def test_completed_task_is_checked_and_echoed(tmp_path, monkeypatch):
+    async def body(room, session, events):
+        available = [st.index for st in session.task_states() if st.status == "available"]
+        i = available[0]
+        assert session.complete(i) is None
+        assert session.task_state(i).status == "pending"
+
+        await _wait_for(lambda: {"event": "completed", "task": i + 1} in events)
+
+        # the room saw both checks, and the client's checked set has them back
+        slot = room.slot_for("Tester")
+        assert {BASE_COMPLETE_LOC_ID + i, BASE_REWARD_LOC_ID + i} <= slot.checked
+        assert BASE_REWARD_LOC_ID + i in session.ctx.checked_locations_set
+        assert session.task_state(i).status == "completed"
+        assert len(session.inflight) == 0
+        assert session.status()["completed"] == 1
+
+    _run_session(tmp_path, monkeypatch, MockConfig(tasks=20, seed=1), body)
+
+
+def test_items_reach_the_client(tmp_path, monkeypatch):
+    cfg = MockConfig(tasks=20, initial_items=3, items_per_second=50.0, item_batch=4, seed=2)
+
+    async def body(room, session, events):
+        slot = room.slot_for("Tester")
+        # what was there at connect time, then at least one pushed batch
+        await _wait_for(lambda: len(session.ctx.items_received) >= 3 + cfg.item_batch)
+        received = [tuple(it[:3]) for it in session.ctx.items_received]  # NetworkItem is a NamedTuple
+        sent = [tuple(it[:3]) for it in slot.items]
+        assert received == sent[:len(received)]
+
+    _run_session(tmp_path, monkeypatch, cfg, body)
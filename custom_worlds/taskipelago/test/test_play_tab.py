@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+from ..client import TaskipelagoApp
+from ..play_model import PlayModel
+from ..search import TaskSearchIndex
+
+
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class _Cards:
+    """Stands in for the play tab's card list; just keeps the specs it was given."""
+
+    def __init__(self):
+        self.specs = {}
+
+    def clear(self):
+        self.specs = {}
+
+    def append_card(self, spec):
+        assert spec.key not in self.specs
+        self.specs[spec.key] = spec
+
+    def update_card(self, spec):
+        assert spec.key in self.specs
+        self.specs[spec.key] = spec
+
+    def set_filter(self, keys):
+        pass
+
+    def set_visible(self, key, visible):
+        pass
+
+    def set_order(self, keys):
+        self.order = list(keys)
+
+
+class _PlayTab:
+    """The play tab's side of TaskipelagoApp without a Tk root."""
+
+    _play_tab_job = TaskipelagoApp._play_tab_job
+    _task_state = TaskipelagoApp._task_state
+    _rank_tasks = TaskipelagoApp._rank_tasks
+    _task_card_spec = TaskipelagoApp._task_card_spec
+    _set_task_status = TaskipelagoApp._set_task_status
+    _apply_play_sort = TaskipelagoApp._apply_play_sort
+
+    def __init__(self, ctx, tmp_path):
+        self.ctx = ctx
+        self.play = PlayModel(ctx, history_path=tmp_path / "history.jsonl")
+        self.play_cards = _Cards()
+        self.play_search_var, self.play_state_var, self.play_sort_var = _Var(""), _Var("All"), _Var("Best next")
+        self._search_index = TaskSearchIndex()
+        self._play_tasks_key = None
+        self._task_specs = []
+        self._task_status = []
+        self._analysis = None
+        self._play_order = None
+        self._best_next = set()
+        self._graph_built = False
+
+    def _update_play_showing(self):
+        pass
+
+    def _refresh_graph(self):
+        pass
+
+
+def _ctx(n):
+    return SimpleNamespace(
+        tasks=[f"Task {i + 1}" for i in range(n)], rewards=[""] * n,
+        task_prereqs=[""] + [str(i) for i in range(1, n)], reward_prereqs=[""] * n,
+        base_reward_location_id=1000, base_complete_location_id=2000, lock_prereqs=True,
+        checked_locations_set=set(), items_received=[],
+    )
+
+
+def test_replacing_a_half_finished_rebuild_starts_it_over(tmp_path):
+    ctx = _ctx(50)
+    app = _PlayTab(ctx, tmp_path)
+
+    first = app._play_tab_job()
+    for _ in range(20):
+        next(first)
+    first.close()  # what RenderScheduler.schedule does to the job it replaces
+    assert len(app._task_specs) < 50
+
+    ctx.checked_locations_set = {2000}
+    for _ in app._play_tab_job():
+        pass
+    assert len(app._task_specs) == len(app._task_status) == len(app.play_cards.specs) == 50
+    assert app._task_status[:3] == ["completed", "available", "locked"]
+    assert app.play_cards.specs[1].meta.startswith("★ Best next · Unlocks 48 tasks")
+    assert app.play_cards.order[0] == 1
+
+    # and a plain state update on the finished table still takes the cheap path
+    ctx.checked_locations_set = {2000, 2001}
+    for _ in app._play_tab_job():
+        pass
+    assert app._task_status[:3] == ["completed", "completed", "available"]
@@ -0,0 +1,81 @@
+import asyncio
+
+from ..mockserver import MockConfig, MockConnection, MockRoom
+from ..replay import PacketRecorder, read_recording, replay
+
+ITEM_BATCHES = 40
+DEATHLINKS = 5
+
+# generous ceilings: these catch an accidental O(n^2), not a slow CI box
+MAX_P95_MS = 50.0
+MAX_WALL_S = 10.0
+
+
+def _record_trace(path, tasks: int = 300):
+    """A fixed session against MockRoom: connect, item floods, a completed task, DeathLinks, a drop."""
+    room = MockRoom(MockConfig(tasks=tasks, initial_items=50, item_batch=25, seed=1234))
+    conn = MockConnection(room)
+    rec = PacketRecorder(path, "mock", "Replayer")
+    try:
+        rec.mark("connect")
+        rec.record(room.room_info())
+        for msg in room.handle(conn, {"cmd": "Connect", "name": "Replayer"}):
+            rec.record(msg)
+        for msg in room.handle(conn, {"cmd": "GetDataPackage", "games": ["Taskipelago", "Mock Game"]}):
+            rec.record(msg)
+        for i in range(ITEM_BATCHES):
+            rec.record(room.item_flood(conn))
+            if i == ITEM_BATCHES // 2:
+                for msg in room.handle(conn, {"cmd": "LocationChecks", "locations": [920_000, 910_000]}):
+                    rec.record(msg)
+        for _ in range(DEATHLINKS):
+            rec.record(room.deathlink())
+        rec.mark("disconnect")
+    finally:
+        rec.close()
+
+
+def _replay(path):
+    return asyncio.run(replay(path))
+
+
+def test_recording_reads_back_in_order(tmp_path):
+    path = tmp_path / "trace.jsonl.gz"
+    _record_trace(path)
+    header, records = read_recording(path)
+    assert header["slot"] == "Replayer"
+    records = list(records)
+    assert records[0][2] == "connect" and records[-1][2] == "disconnect"
+    cmds = [m["cmd"] for _t, m, _e in records if m is not None]
+    assert cmds[:4] == ["RoomInfo", "Connected", "ReceivedItems", "DataPackage"]
+    assert cmds.count("ReceivedItems") == 1 + ITEM_BATCHES
+    assert cmds.count("Bounced") == DEATHLINKS
+
+
+def test_replay_counts_are_deterministic(tmp_path):
+    path = tmp_path / "trace.jsonl.gz"
+    _record_trace(path)
+    first = _replay(path)
+    second = _replay(path)
+
+    counts = {cmd: p["n"] for cmd, p in first["handling"].items()}
+    assert counts == {"Bounced": DEATHLINKS, "Connected": 1, "DataPackage": 1,
+                      "ReceivedItems": 1 + ITEM_BATCHES, "RoomInfo": 1, "RoomUpdate": 1}
+    assert first["commands"] == sum(counts.values())
+
+    # same trace, same work: any drift here means replay (or the client) stopped being deterministic
+    for key in ("commands", "notifications", "client_messages_sent"):
+        assert first[key] == second[key], key
+    assert {cmd: p["n"] for cmd, p in second["handling"].items()} == counts
+    assert first["notifications"] > 0
+
+
+def test_replay_timings_stay_bounded(tmp_path):
+    path = tmp_path / "trace.jsonl.gz"
+    _record_trace(path, tasks=2000)
+    report = _replay(path)
+
+    assert report["wall_s"] < MAX_WALL_S
+    for cmd, p in report["handling"].items():
+        assert p["p95_ms"] < MAX_P95_MS, (cmd, p)
+    assert report["pump"]["p95_ms"] < MAX_P95_MS
@@ -0,0 +1,58 @@
+from ..search import TaskSearchIndex, filter_active, filter_keys, task_matches, tokenize
+
+
+def _index():
+    index = TaskSearchIndex()
+    index.set(0, "Defeat the dragon boss", "Pizza night")
+    index.set(1, "Draw a dragon", "")
+    index.set(2, "Do the dishes", "Dragée")
+    index.set(3, "Read chapter 1", "Boss rush")
+    return index
+
+
+def test_tokenize_casefolds_and_splits_on_non_words():
+    assert tokenize("Défi: DRAGON-boss #2") == ["défi", "dragon", "boss", "2"]
+    assert tokenize(None) == []
+
+
+def test_prefix_lookup():
+    index = _index()
+    assert index.prefix("dra") == {0, 1, 2}
+    assert index.prefix("dragon") == {0, 1}
+    assert index.prefix("bos") == {0, 3}
+    assert index.prefix("zzz") == set()
+
+
+def test_every_query_word_must_prefix_a_token():
+    index = _index()
+    assert index.search("dra bos") == {0}
+    assert index.search("BOSS") == {0, 3}
+    assert index.search("dragon pizza") == {0}
+    assert index.search("dragon chapter") == set()
+    assert index.search("  ") is None
+
+
+def test_set_reindexes_and_remove_forgets():
+    index = _index()
+    index.set(1, "Paint a wyvern")
+    assert index.prefix("dragon") == {0}
+    assert index.search("wyv") == {1}
+
+    index.remove(0)
+    assert index.prefix("dragon") == set()
+    assert index.prefix("dr") == {2}  # "dragée" is still there
+    assert len(index) == 3
+    assert index.matches(1, "pai wyv") and not index.matches(1, "dragon")
+
+
+def test_state_filters():
+    index = _index()
+    statuses = ["available", "locked", "completed", "pending"]
+    assert filter_keys(index, "", statuses, "All") is None
+    assert filter_keys(index, "", statuses, "Not completed") == {0, 1, 3}
+    assert filter_keys(index, "dra", statuses, "Available") == {0}
+    assert filter_keys(index, "boss", statuses, "Completed") == set()
+
+    assert task_matches(index, 3, "boss", "pending", "Pending")
+    assert not task_matches(index, 3, "boss", "pending", "Available")
+    assert filter_active("", "Locked") and filter_active("x", "All") and not filter_active(" ", "All")
@@ -0,0 +1,86 @@
+from ..task_table import TaskRecord, TaskTable, label_key, split_refs
+from ..validation import parse_index_list, resolve_refs
+
+
+def _table(*rows):
+    """rows: (task, prereqs, reward_prereqs[, label])"""
+    return TaskTable(TaskRecord(task=r[0], prereqs=r[1], reward_prereqs=r[2],
+                                label=r[3] if len(r) > 3 else "") for r in rows)
+
+
+def _prereqs(table):
+    return [(rec.task, rec.prereqs, rec.reward_prereqs) for rec in table]
+
+
+def test_split_refs_and_label_key():
+    assert split_refs(" 1, ch2 ,,3 ") == ["1", "ch2", "3"]
+    assert label_key("  Ch2 ") == "ch2"
+
+
+def test_insert_shifts_numbers_past_the_new_row():
+    t = _table(("A", "", ""), ("B", "1", ""), ("C", "1,2,ch1", "2"))
+    events = []
+    t.add_listener(lambda kind, i: events.append((kind, i)))
+    assert t.insert(1, TaskRecord(task="new")) == 1
+    assert _prereqs(t) == [("A", "", ""), ("new", "", ""), ("B", "1", ""), ("C", "1,3,ch1", "3")]
+    assert events == [("insert", 1)]
+
+
+def test_insert_past_the_end_appends_without_renumbering():
+    t = _table(("A", "", ""), ("B", "1", ""))
+    assert t.insert(99) == 2
+    assert _prereqs(t) == [("A", "", ""), ("B", "1", ""), ("", "", "")]
+
+
+def test_remove_drops_refs_to_the_row_and_shifts_later_ones():
+    t = _table(("A", "", ""), ("B", "1", ""), ("C", "1,2,9,x", "2"), ("D", "3", "1, 3"))
+    t.remove(1)
+    # 9 never pointed at a row and x is a label, so both stay as typed
+    assert _prereqs(t) == [("A", "", ""), ("C", "1,9,x", ""), ("D", "2", "1,2")]
+
+
+def test_move_follows_the_moved_rows():
+    t = _table(("A", "", ""), ("B", "1", ""), ("C", "2", ""), ("D", "1,3", ""))
+    t.move(0, 2)  # B, C, A, D
+    assert _prereqs(t) == [("B", "3", ""), ("C", "1", ""), ("A", "", ""), ("D", "3,2", "")]
+    t.move(2, 0)  # back to A, B, C, D
+    assert _prereqs(t) == [("A", "", ""), ("B", "1", ""), ("C", "2", ""), ("D", "1,3", "")]
+
+
+def test_untouched_text_keeps_its_spacing():
+    t = _table(("A", "", ""), ("B", "1 ,  ch", ""), ("C", "", ""))
+    t.remove(2)
+    assert t[1].prereqs == "1 ,  ch"
+
+
+def test_row_of_follows_structural_changes():
+    t = _table(("A", "", ""), ("B", "", ""))
+    uid_b = t[1].uid
+    assert t.row_of(uid_b) == 1
+    t.insert(0)
+    assert t.row_of(uid_b) == 2
+    t.remove(2)
+    assert t.row_of(uid_b) is None
+
+
+def test_labels_first_row_wins():
+    t = _table(("A", "", "", "Ch1"), ("B", "", "", " "), ("C", "", "", "ch1"), ("D", "", "", "end"))
+    assert t.labels() == {"ch1": 0, "end": 3}
+
+
+def test_export_rows_resolves_labels_and_compacts_blank_rows():
+    t = _table(("A", "", "", "start"), ("", "", ""), ("C", "START, 1", "x, 9", "mid"), ("D", "Mid, 3, 1", "1, start"))
+    rows = [(rec.task, p, rp) for rec, p, rp in t.export_rows()]
+    # row 3 is exported second; unknown refs are passed through for generate_early to reject
+    assert rows == [("A", "", ""), ("C", "1,1", "x,9"), ("D", "2,2,1", "1,1")]
+
+
+def test_export_rows_check_out_the_same_as_the_editor():
+    t = _table(("A", "", "", "start"), ("B", "start, 1", "1, START", "b"), ("C", "b, 2, start", "b, b"))
+    exported = t.export_rows()
+    labels = t.labels()
+    for row, (rec, prereqs, reward_prereqs) in enumerate(exported):
+        for kind, typed, written in (("prereq", rec.prereqs, prereqs), ("reward prereq", rec.reward_prereqs, reward_prereqs)):
+            assert parse_index_list(written, row, len(exported), kind) == resolve_refs(typed, row, len(t), labels, kind)
+    assert [p for _rec, p, _rp in exported] == ["", "1,1", "2,2,1"]
+    assert [rp for _rec, _p, rp in exported] == ["", "1,1", "2,2"]
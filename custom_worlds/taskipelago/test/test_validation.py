@@ -0,0 +1,148 @@
+import random
+
+from ..task_table import TaskRecord, TaskTable
+from ..validation import (
+    CYCLE_MESSAGE, MISSING_REWARD_MESSAGE, GeneratorValidator, PrereqGraph, find_cycle, parse_index_list,
+)
+
+
+def _consistent(graph: PrereqGraph) -> bool:
+    return all(graph.ord[r] < graph.ord[t] for t in range(graph.n) for r in graph.prereqs[t])
+
+
+def test_parse_index_list():
+    assert parse_index_list("1, 3,,3", 4, 5) == ([0, 2], None)
+    assert parse_index_list("2,2", 0, 5, "reward prereq") == ([1, 1], None)
+    assert parse_index_list("x", 0, 5)[1] == "invalid prereq 'x' on task 1. Use comma-separated integers like '1,2'."
+    assert parse_index_list("6", 1, 5)[1] == "prereq '6' on task 2 is out of range (1..5)."
+    assert parse_index_list("3", 2, 5)[1] == "task 3 cannot require itself."
+
+
+def test_find_cycle():
+    assert find_cycle([[], [0], [1]]) is None
+    assert find_cycle([[2], [0], [1]]) == [0, 2, 1]
+
+
+def test_graph_reorders_edges_against_the_order():
+    graph = PrereqGraph(3)
+    graph.set_prereqs(0, [2])  # 3 must come before 1: against the initial order
+    assert graph.rejected == {}
+    assert graph.ord[2] < graph.ord[0]
+    assert _consistent(graph)
+
+
+def test_graph_rejects_the_closing_edge_and_retries_it():
+    graph = PrereqGraph(4)
+    graph.set_prereqs(1, [0])
+    graph.set_prereqs(2, [1])
+    graph.set_prereqs(0, [2])  # 0 -> 1 -> 2 -> 0
+    assert list(graph.rejected) == [(2, 0)]
+    assert graph.cycle_tasks() == {0, 1, 2}
+    assert 2 not in graph.prereqs[0]
+    assert _consistent(graph)
+
+    graph.set_prereqs(1, [])  # break the cycle elsewhere: the kept-aside edge goes in
+    assert graph.rejected == {}
+    assert graph.prereqs[0] == {2}
+    assert _consistent(graph)
+
+
+def test_graph_agrees_with_find_cycle():
+    rng = random.Random(7)
+    for _ in range(200):
+        n = rng.randint(2, 12)
+        graph = PrereqGraph(n)
+        reqs = [set() for _ in range(n)]
+        for _ in range(rng.randint(1, 30)):
+            task = rng.randrange(n)
+            reqs[task] = {r for r in rng.sample(range(n), rng.randint(0, min(3, n))) if r != task}
+            graph.set_prereqs(task, reqs[task])
+            assert _consistent(graph)
+            assert bool(graph.rejected) == (find_cycle([sorted(r) for r in reqs]) is not None)
+
+
+def _table(*rows):
+    return TaskTable(TaskRecord(task=t, reward="r", prereqs=p, label=label) for t, p, label in rows)
+
+
+def test_validator_row_errors_and_cycles():
+    table = _table(("A", "3", ""), ("B", "1", ""), ("C", "2", ""))
+    table[1].reward = ""
+    v = GeneratorValidator(table)
+    assert v.row_errors(1)["reward"] == MISSING_REWARD_MESSAGE
+    assert v.row_errors(0)["prereqs"] == "task 1 is part of a prereq cycle (2 -> 1 -> 3 -> 2). Fix your prereqs."
+    assert len(v.problems()) == 4  # the missing reward + three cycle members
+
+    v.set_lock_prereqs(False)  # generate_early only checks cycles with lock_prereqs on
+    assert v.problems() == [MISSING_REWARD_MESSAGE]
+    v.set_lock_prereqs(True)
+
+    table[0].prereqs = ""
+    table.updated(0)
+    assert v.problems() == [MISSING_REWARD_MESSAGE]
+    assert CYCLE_MESSAGE not in v.problems()
+
+
+def test_label_edits_recheck_only_the_rows_that_name_it():
+    table = _table(("A", "", "intro"), ("B", "boss", ""), ("C", "1", ""), ("D", "", "boss"))
+    table[3].label = ""
+    v = GeneratorValidator(table)
+    seen = []
+    v.add_listener(seen.append)
+    assert v.row_errors(1)["prereqs"] == "unknown task label 'boss' in the prereqs of task 2."
+
+    table[0].label = "Boss"  # row 1 only changes through the label on row 0
+    table.updated(0)
+    assert seen == [{1}]  # no full rebuild, and row 2 (a plain number ref) isn't touched
+    assert v.row_errors(1) == {}
+    assert v.graph.prereqs[1] == {0}
+
+    table[3].label = "boss"  # a duplicate: only the later row is wrong
+    table.updated(3)
+    assert v.row_errors(3)["label"] == "label 'boss' on task 4 is already used by task 1."
+    table[0].label = "intro"  # row 3 now owns it, and row 1 follows it there
+    table.updated(0)
+    assert v.row_errors(3) == {}
+    assert v.graph.prereqs[1] == {3}
+
+
+def test_validator_rechecks_refs_when_a_row_goes_blank():
+    table = _table(("A", "", "first"), ("B", "1", ""), ("C", "first", ""))
+    v = GeneratorValidator(table)
+    assert v.row_errors(1) == {}
+
+    table[0].task = ""
+    table.updated(0)
+    assert v.row_errors(1)["prereqs"] == "prereq '1' on task 2 points at an empty row."
+    assert v.row_errors(2)["prereqs"] == "prereq '1' on task 3 points at an empty row."
+
+    table[0].task = "A again"
+    table.updated(0)
+    assert v.row_errors(1) == {} and v.row_errors(2) == {}
+
+
+def test_incremental_edits_match_a_fresh_validator():
+    rng = random.Random(3)
+    labels = ["", "", "a", "b", "c"]
+    n = 12
+    table = _table(*[(f"T{i}", "", "") for i in range(n)])
+    v = GeneratorValidator(table)
+    for _ in range(600):
+        row = rng.randrange(n)
+        rec = table[row]
+        what = rng.randrange(4)
+        if what == 0:
+            rec.label = rng.choice(labels)
+        elif what == 1:
+            rec.task = "" if rec.task and rng.random() < 0.3 else f"T{row}"
+        elif what == 2:
+            refs = rng.sample(labels[2:] + [str(k) for k in range(1, n + 1)], rng.randrange(3))
+            rec.prereqs = ", ".join(refs)
+        else:
+            rec.reward_prereqs = rng.choice(["", "a", "1", "b, 2"])
+        table.updated(row)
+
+        fresh = GeneratorValidator(TaskTable(table.records))
+        assert v.problems() == fresh.problems()
+        assert [v.row_errors(r) for r in range(n)] == [fresh.row_errors(r) for r in range(n)]
+        assert v.graph.prereqs == fresh.graph.prereqs
@@ -0,0 +1,413 @@
+"""
+The checks generate_early runs on a Taskipelago block, shared with the YAML Generator.
+
+The world module calls parse_index_list/find_cycle and raises on the first problem. The
+generator keeps a GeneratorValidator on its TaskTable instead: every edit re-checks just the
+edited row (plus the rows naming it, when its label changes or it goes blank), and task prereqs live in a PrereqGraph that keeps a topological order as edges
+come and go (Pearce-Kelly), so a cycle shows up the moment the edge that closes it is typed
+instead of after a full walk over every task.
+
+Messages have no "Taskipelago: " prefix; generate_early adds it. The generator also takes task
+labels in prereq fields (resolve_refs); the exported YAML only ever has numbers.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .task_table import label_key, ref_number, split_refs
+
+MAX_TASKS = 1000
+
+CYCLE_MESSAGE = "prereq graph contains a cycle. Fix your prereqs."
+MISSING_REWARD_MESSAGE = "Each task must have a reward or be marked Filler."
+CYCLE_SHOWN = 8  # tasks of a cycle named in its message
+
+
+def too_many_tasks_message(n: int) -> Optional[str]:
+    if n > MAX_TASKS:
+        return f"too many tasks ({n}). Max supported is {MAX_TASKS}."
+    return None
+
+
+def parse_index_list(txt: str, row: int, n: int, kind: str = "prereq") -> Tuple[List[int], Optional[str]]:
+    """
+    "1, 3" on task row (0-based) -> ([0, 2], None), or ([], message) for the first bad entry.
+    kind is "prereq" (no self-references, de-duped) or "reward prereq" (taken as written).
+    """
+    txt = str(txt).strip()
+    if not txt:
+        return [], None
+    reqs: List[int] = []
+    for p in (p.strip() for p in txt.split(",")):
+        if not p:
+            continue
+        try:
+            idx_1 = int(p)
+        except ValueError:
+            return [], (f"invalid {kind} '{p}' on task {row + 1}. "
+                        f"Use comma-separated integers like '1,2'.")
+        if idx_1 < 1 or idx_1 > n:
+            return [], f"{kind} '{idx_1}' on task {row + 1} is out of range (1..{n})."
+        if kind == "prereq" and idx_1 == row + 1:
+            return [], f"task {row + 1} cannot require itself."
+        reqs.append(idx_1 - 1)
+
+    if kind == "prereq":
+        # de-dupe while preserving order
+        seen = set()
+        reqs = [x for x in reqs if not (x in seen or seen.add(x))]
+    return reqs, None
+
+
+def resolve_refs(txt: str, row: int, n: int, labels: Dict[str, int], kind: str = "prereq",
+                 is_blank: Optional[Callable[[int], bool]] = None) -> Tuple[List[int], Optional[str]]:
+    """parse_index_list for the generator: refs can also be labels (labels: label_key -> row)."""
+    numbers = []
+    for ref in split_refs(txt):
+        if ref_number(ref) is None:
+            target = labels.get(label_key(ref))
+            if target is None:
+                return [], f"unknown task label '{ref}' in the {kind}s of task {row + 1}."
+            ref = str(target + 1)
+        numbers.append(ref)
+    reqs, err = parse_index_list(",".join(numbers), row, n, kind)
+    if err is None and is_blank is not None:
+        for r in reqs:
+            if is_blank(r):
+                # blank rows aren't exported, so there'd be nothing to point at
+                return [], f"{kind} '{r + 1}' on task {row + 1} points at an empty row."
+    return reqs, err
+
+
+def label_error(label: str, row: int, labels: Dict[str, int]) -> Optional[str]:
+    label = label.strip()
+    if not label:
+        return None
+    if ref_number(label) is not None:
+        return f"label '{label}' on task {row + 1} can't be a number."
+    if "," in label:
+        return f"label '{label}' on task {row + 1} can't contain a comma."
+    first = labels.get(label_key(label), row)
+    if first != row:
+        return f"label '{label}' on task {row + 1} is already used by task {first + 1}."
+    return None
+
+
+def find_cycle(prereqs: List[List[int]]) -> Optional[List[int]]:
+    """Some cycle in the task -> prereq graph as a list of task indices, or None."""
+    WHITE, GREY, BLACK = 0, 1, 2
+    color = [WHITE] * len(prereqs)
+    for start in range(len(prereqs)):
+        if color[start] != WHITE:
+            continue
+        # iterative so a 1000-task chain doesn't hit the recursion limit
+        path = [start]
+        iters = [iter(prereqs[start])]
+        color[start] = GREY
+        while iters:
+            nxt = next(iters[-1], None)
+            if nxt is None:
+                color[path.pop()] = BLACK
+                iters.pop()
+            elif color[nxt] == GREY:
+                return path[path.index(nxt):]
+            elif color[nxt] == WHITE:
+                color[nxt] = GREY
+                path.append(nxt)
+                iters.append(iter(prereqs[nxt]))
+    return None
+
+
+# ----------------------------
+# Incremental prereq graph
+# ----------------------------
+class PrereqGraph:
+    """
+    Task prereqs as edges prereq -> task, kept acyclic with a maintained topological order.
+
+    Adding an edge that already agrees with the order is O(1); otherwise only the tasks
+    between the two positions are searched and reordered. An edge that would close a cycle
+    isn't added; it's kept aside with the cycle it would make, and tried again whenever
+    an edge is removed.
+    """
+
+    def __init__(self, n: int = 0):
+        self.n = n
+        self.dependents: List[Set[int]] = [set() for _ in range(n)]
+        self.prereqs: List[Set[int]] = [set() for _ in range(n)]
+        self.ord = list(range(n))  # position of each task in the topological order
+        self.rejected: Dict[Tuple[int, int], List[int]] = {}  # (prereq, task) -> cycle
+
+    def set_prereqs(self, task: int, reqs: Iterable[int]):
+        reqs = set(reqs)
+        removed = False
+        for r in list(self.prereqs[task] - reqs):
+            self.prereqs[task].discard(r)
+            self.dependents[r].discard(task)
+            removed = True
+        for key in [k for k in self.rejected if k[1] == task and k[0] not in reqs]:
+            del self.rejected[key]
+        for r in reqs - self.prereqs[task]:
+            if (r, task) not in self.rejected:
+                self._add(r, task)
+        if removed and self.rejected:
+            self._retry_rejected()
+
+    def cycle_tasks(self) -> Set[int]:
+        out = set()
+        for cycle in self.rejected.values():
+            out.update(cycle)
+        return out
+
+    def _retry_rejected(self):
+        pending = list(self.rejected)
+        self.rejected.clear()
+        for r, task in pending:
+            self._add(r, task)
+
+    def _add(self, r: int, task: int):
+        lo, hi = self.ord[r], self.ord[task]
+        if lo < hi:
+            self.prereqs[task].add(r)
+            self.dependents[r].add(task)
+            return
+
+        # forward from task over positions <= ord[r]; reaching r means task already leads to r
+        forward, parent = [], {task: None}
+        stack = [task]
+        while stack:
+            v = stack.pop()
+            forward.append(v)
+            for w in self.dependents[v]:
+                if w == r:
+                    cycle = [r]
+                    while v is not None:
+                        cycle.append(v)
+                        v = parent[v]
+                    self.rejected[(r, task)] = cycle
+                    return
+                if w not in parent and self.ord[w] < lo:
+                    parent[w] = v
+                    stack.append(w)
+
+        # backward from r over positions > ord[task]
+        backward, seen = [], {r}
+        stack = [r]
+        while stack:
+            v = stack.pop()
+            backward.append(v)
+            for w in self.prereqs[v]:
+                if w not in seen and self.ord[w] > hi:
+                    seen.add(w)
+                    stack.append(w)
+
+        # r's side goes first, then task's, reusing the same slots
+        backward.sort(key=self.ord.__getitem__)
+        forward.sort(key=self.ord.__getitem__)
+        slots = sorted(self.ord[v] for v in backward + forward)
+        for v, slot in zip(backward + forward, slots):
+            self.ord[v] = slot
+
+        self.prereqs[task].add(r)
+        self.dependents[r].add(task)
+
+
+# ----------------------------
+# YAML Generator validator
+# ----------------------------
+class GeneratorValidator:
+    """
+    Per-row problems for a TaskTable, kept current from its change notifications.
+
+    errors[row] maps a field ("label", "reward", "prereqs", "reward_prereqs") to a message.
+    Listeners get fn(rows) with the rows whose problems changed (None: could be any).
+    Cycles only count while lock_prereqs is on, same as generate_early.
+    """
+
+    def __init__(self, table, lock_prereqs: bool = True):
+        self.table = table
+        self.lock_prereqs = lock_prereqs
+        self.errors: Dict[int, Dict[str, str]] = {}
+        self.graph = PrereqGraph()
+        # (prereqs, reward_prereqs, label key, blank) per row as last checked
+        self._seen: List[tuple] = []
+        self._labels: Dict[str, int] = {}
+        self._label_rows: Dict[str, Set[int]] = {}  # label key -> every row carrying it
+        # who points at what: label key or row number (0-based) -> rows whose prereq fields name it
+        self._referrers: Dict[object, Set[int]] = {}
+        self._row_refs: List[Set[object]] = []
+        self._cycle_rows: Set[int] = set()
+        self._listeners: List[Callable[[Optional[Set[int]]], None]] = []
+        self.rebuild()
+        table.add_listener(self._on_table_change)
+
+    def add_listener(self, fn: Callable[[Optional[Set[int]]], None]):
+        self._listeners.append(fn)
+
+    def _notify(self, rows: Optional[Set[int]]):
+        for fn in list(self._listeners):
+            fn(rows)
+
+    # ---------- queries ----------
+    def row_errors(self, row: int) -> Dict[str, str]:
+        errs = self.errors.get(row, {})
+        if self.lock_prereqs and row in self._cycle_rows and "prereqs" not in errs:
+            errs = dict(errs)
+            errs["prereqs"] = self._cycle_message(row)
+        return errs
+
+    def problems(self) -> List[str]:
+        """Everything wrong, first row first, in generate_early's wording."""
+        out = []
+        n = sum(1 for rec in self.table if rec.task.strip())
+        too_many = too_many_tasks_message(n)
+        if too_many:
+            out.append(too_many)
+        rows = set(self.errors)
+        if self.lock_prereqs:
+            rows |= self._cycle_rows
+        for row in sorted(rows):
+            out.extend(self.row_errors(row).values())
+        return out
+
+    def _cycle_message(self, row: int) -> str:
+        for cycle in self.graph.rejected.values():
+            if row in cycle:
+                # each task in the chain needs the next one
+                shown = cycle + cycle[:1] if len(cycle) <= CYCLE_SHOWN else cycle[:CYCLE_SHOWN]
+                chain = " -> ".join(str(i + 1) for i in shown) + (" -> ..." if len(cycle) > CYCLE_SHOWN else "")
+                return f"task {row + 1} is part of a prereq cycle ({chain}). Fix your prereqs."
+        return CYCLE_MESSAGE
+
+    def set_lock_prereqs(self, on: bool):
+        if on != self.lock_prereqs:
+            self.lock_prereqs = on
+            self._notify(set(self._cycle_rows))
+
+    # ---------- updates ----------
+    def _on_table_change(self, kind: str, index: int):
+        if kind == "update":
+            self.update_row(index)
+        else:
+            # inserts/removes/moves renumber every row after them
+            self.rebuild()
+
+    def rebuild(self):
+        n = len(self.table)
+        self.errors = {}
+        self.graph = PrereqGraph(n)
+        self._seen = [("", "", "", True)] * n
+        self._labels = self.table.labels()
+        self._label_rows = {}
+        for row, rec in enumerate(self.table):
+            if label_key(rec.label):
+                self._label_rows.setdefault(label_key(rec.label), set()).add(row)
+        self._referrers = {}
+        self._row_refs = [set() for _ in range(n)]
+        for row in range(n):
+            self._check_row(row)
+        self._cycle_rows = self.graph.cycle_tasks()
+        self._notify(None)
+
+    def update_row(self, row: int):
+        if not (0 <= row < len(self.table)):
+            return
+        rec = self.table[row]
+        rows = {row}
+        old_label, old_blank = self._seen[row][2:]
+        new_label, new_blank = label_key(rec.label), not rec.task.strip()
+        if new_label != old_label:
+            # rows naming either label resolve differently now, and duplicates may have moved
+            self._move_label(row, old_label, new_label)
+            for key in (old_label, new_label):
+                if key:
+                    rows |= self._referrers.get(key, set()) | self._label_rows.get(key, set())
+        if new_blank != old_blank:
+            rows |= self._referrers.get(row, set())
+            if new_label:
+                rows |= self._referrers.get(new_label, set())
+
+        before = {r: self.row_errors(r) for r in rows}
+        old_cycle = self._cycle_rows
+        moved = (new_label, new_blank) != (old_label, old_blank)
+        for r in sorted(rows):
+            # their text didn't change but what it resolves to may have
+            self._check_row(r, force=moved)
+        self._cycle_rows = self.graph.cycle_tasks()
+
+        changed = old_cycle ^ self._cycle_rows
+        changed |= {r for r in rows if self.row_errors(r) != before[r]}
+        # cycle messages name their members, so a cycle that changed shape redraws them all
+        if old_cycle != self._cycle_rows:
+            changed |= self._cycle_rows
+        if changed:
+            self._notify(changed)
+
+    def _move_label(self, row: int, old: str, new: str):
+        for key, add in ((old, False), (new, True)):
+            if not key:
+                continue
+            holders = self._label_rows.setdefault(key, set())
+            if add:
+                holders.add(row)
+            else:
+                holders.discard(row)
+            if holders:
+                self._labels[key] = min(holders)  # first row wins, like TaskTable.labels()
+            else:
+                del self._label_rows[key]
+                self._labels.pop(key, None)
+
+    def _index_refs(self, row: int, refs: Set[object]):
+        old = self._row_refs[row]
+        for ref in old - refs:
+            rows = self._referrers[ref]
+            rows.discard(row)
+            if not rows:
+                del self._referrers[ref]
+        for ref in refs - old:
+            self._referrers.setdefault(ref, set()).add(row)
+        self._row_refs[row] = refs
+
+    def _check_row(self, row: int, force: bool = False):
+        rec = self.table[row]
+        n = len(self.table)
+        errs: Dict[str, str] = {}
+
+        if not rec.task.strip():
+            # blank rows aren't exported; nothing to check and nothing for others to need
+            self._seen[row] = ("", "", label_key(rec.label), True)
+            self._index_refs(row, set())
+            self.graph.set_prereqs(row, ())
+            self.errors.pop(row, None)
+            return
+
+        if not rec.filler and not rec.reward.strip():
+            errs["reward"] = MISSING_REWARD_MESSAGE
+        err = label_error(rec.label, row, self._labels)
+        if err:
+            errs["label"] = err
+
+        def is_blank(r: int) -> bool:
+            return not self.table[r].task.strip()
+
+        key = (rec.prereqs.strip(), rec.reward_prereqs.strip(), label_key(rec.label), False)
+        if key[:2] != self._seen[row][:2]:
+            refs = set()
+            for ref in split_refs(key[0]) + split_refs(key[1]):
+                k = ref_number(ref)
+                refs.add(k - 1 if k is not None else label_key(ref))
+            self._index_refs(row, refs)
+        reqs, err = resolve_refs(key[0], row, n, self._labels, "prereq", is_blank)
+        if err:
+            errs["prereqs"] = err
+        _r, err = resolve_refs(key[1], row, n, self._labels, "reward prereq", is_blank)
+        if err:
+            errs["reward_prereqs"] = err
+
+        if force or key[0] != self._seen[row][0]:
+            self.graph.set_prereqs(row, reqs)
+        self._seen[row] = key
+
+        if errs:
+            self.errors[row] = errs
+        else:
+            self.errors.pop(row, None)
@@ -0,0 +1,180 @@
+"""
+Reading and writing generator YAMLs, without Tk.
+
+Everything here is safe to run on a worker thread: the client parses and builds the whole
+row model off the Tk thread and only swaps it into the TaskTable at the end. libyaml's
+C loader/dumper are used when PyYAML was built with them; the pure-Python ones otherwise.
+"""
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .task_table import FILLER_TOKEN, REWARD_TYPE_VALUES, TaskRecord
+
+MISSING_BLOCK_MESSAGE = (
+    "Could not find a 'Taskipelago' section in this YAML.\n"
+    "Expected either:\n"
+    "  - root: { name: ..., Taskipelago: {...} }\n"
+    "  - or a player entry: { <player>: { Taskipelago: {...} } }"
+)
+
+
+class Progress:
+    """Written by the worker, read by the Tk thread's poll; plain attribute stores only."""
+
+    def __init__(self):
+        self.phase = ""
+        self.done = 0
+        self.total = 0  # 0 while the size isn't known (parsing)
+
+
+def _loader():
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _dumper():
+    import yaml
+
+    return getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def using_libyaml() -> bool:
+    import yaml
+
+    return hasattr(yaml, "CSafeLoader")
+
+
+def load(path) -> object:
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_loader())
+
+
+def dump(data: dict, path):
+    import yaml
+
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.dump(data, f, Dumper=_dumper(), sort_keys=False, allow_unicode=True)
+
+
+def extract_taskipelago_block(doc) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Supports:
+      A) Your generator format (root has 'name' + 'Taskipelago')
+      B) Common AP format-ish (root has a player name key; inside has 'Taskipelago')
+    Returns: (player_name: str|None, block: dict|None)
+    """
+    if not isinstance(doc, dict):
+        return None, None
+
+    # A) direct
+    if isinstance(doc.get("Taskipelago"), dict):
+        player_name = doc.get("name")
+        if isinstance(player_name, str):
+            player_name = player_name.strip()
+        else:
+            player_name = None
+        return player_name, doc["Taskipelago"]
+
+    # B) nested: find any mapping that contains a Taskipelago dict
+    # e.g. { "Barret": { "Taskipelago": {...}} }
+    for k, v in doc.items():
+        if isinstance(v, dict) and isinstance(v.get("Taskipelago"), dict):
+            player_name = k if isinstance(k, str) else None
+            return player_name, v["Taskipelago"]
+
+    return None, None
+
+
+def _text(v, default: str = "") -> str:
+    return str(v).strip() if v is not None else default
+
+
+def records_from_block(block: dict, progress: Optional[Progress] = None) -> List[TaskRecord]:
+    """The Tasks table for a Taskipelago block, built in one pass."""
+    tasks = list(block.get("tasks", []) or [])
+    rewards = list(block.get("rewards", []) or [])
+    prereqs = list(block.get("task_prereqs", []) or [])
+    reward_prereqs = list(block.get("reward_prereqs", []) or [])
+    reward_types = list(block.get("reward_types", []) or [])
+
+    # Normalize lengths
+    n = max(len(tasks), len(rewards), len(prereqs))
+    tasks += [""] * (n - len(tasks))
+    rewards += [""] * (n - len(rewards))
+    prereqs += [""] * (n - len(prereqs))
+    reward_prereqs += [""] * (n - len(reward_prereqs))
+    reward_types += ["useful"] * (n - len(reward_types))
+
+    if progress is not None:
+        progress.phase = "Building rows"
+        progress.total = n
+
+    records = []
+    for i, (t, rw, pr, rpr, rt) in enumerate(zip(tasks, rewards, prereqs, reward_prereqs, reward_types)):
+        rw = _text(rw)
+        rt = _text(rt, "useful").lower()
+        # Clamp reward type
+        if rt not in REWARD_TYPE_VALUES:
+            rt = "useful"
+
+        if rw == FILLER_TOKEN:
+            # what set_filler(True) leaves on a fresh record
+            rec = TaskRecord(task=_text(t), reward=FILLER_TOKEN, prereqs=_text(pr), reward_prereqs=_text(rpr),
+                             filler=True, reward_type="junk", saved_reward_type=rt)
+        else:
+            rec = TaskRecord(task=_text(t), reward=rw, prereqs=_text(pr), reward_prereqs=_text(rpr),
+                             reward_type=rt, saved_reward_type=rt)
+        records.append(rec)
+        if progress is not None and i % 500 == 0:
+            progress.done = i
+    if progress is not None:
+        progress.done = n
+    return records
+
+
+def deathlink_rows_from_block(block: dict) -> List[Tuple[str, str]]:
+    """(task text, weight text) pairs, blanks dropped, weights defaulting to "1"."""
+    pool = list(block.get("death_link_pool", []) or [])
+    weights = list(block.get("death_link_weights", []) or [])
+
+    # Normalize weights to pool length (default "1")
+    if len(weights) < len(pool):
+        weights += ["1"] * (len(pool) - len(weights))
+
+    rows = []
+    for txt, w in zip(pool, weights):
+        s = _text(txt)
+        if s:
+            rows.append((s, _text(w, "1") or "1"))
+    return rows
+
+
+class ImportedYaml:
+    __slots__ = ("path", "player_name", "block", "records", "deathlink_rows")
+
+    def __init__(self, path, player_name, block, records, deathlink_rows):
+        self.path = path
+        self.player_name = player_name
+        self.block = block
+        self.records = records
+        self.deathlink_rows = deathlink_rows
+
+
+def read_generator_yaml(path, progress: Optional[Progress] = None) -> ImportedYaml:
+    """Parse + build rows. Raises ValueError with a user-facing message."""
+    if progress is not None:
+        progress.phase = f"Reading {Path(path).name}"
+    try:
+        doc = load(path)
+    except Exception as e:
+        raise ValueError(f"Failed to read YAML:\n{e}") from e
+
+    player_name, block = extract_taskipelago_block(doc)
+    if not isinstance(block, dict):
+        raise ValueError(MISSING_BLOCK_MESSAGE)
+
+    records = records_from_block(block, progress)
+    return ImportedYaml(path, player_name, block, records, deathlink_rows_from_block(block))